@@ -4,20 +4,29 @@ FastAPI server for AI Travel Planner frontend
 WHY: Provides REST API endpoint for the React frontend with conversation memory
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
 from typing import Optional, AsyncGenerator
 from travel_planner.agent.agent_workflow import GraphBuilder
-from travel_planner.core.validators import validate_user_input, validate_agent_output
+from travel_planner.agent.context_manager import SUMMARY_TAG
+from travel_planner.core.validators import StreamingOutputValidator, validate_user_input, validate_agent_output
 from travel_planner.utils.logger import setup_logger
+from travel_planner.utils.http_client import aclose_clients
+from travel_planner.utils.checkpoint_retention import get_retention_settings, retention_loop
+from travel_planner.utils.session_manager import SessionManager
+from travel_planner.utils.response_cache import get_response_cache
+from travel_planner.utils.metrics import CHAT_REQUEST_SECONDS, CONTENT_TYPE, get_metrics_settings, render as render_metrics
+from travel_planner.utils.tracing import span, start_trace
 from dotenv import load_dotenv
 import os
 import time
 import uuid
 import json
 import asyncio
+import hashlib
 
 # Load environment variables
 load_dotenv()
@@ -48,27 +57,99 @@ app.add_middleware(
 graph_builder = None
 graph = None
 session_manager = None
+retention_task = None
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the AI agent on server startup"""
-    global graph_builder, graph
+    global graph_builder, graph, session_manager, retention_task
     
     logger.info("Initializing AI Travel Planner Agent")
-    graph_builder = GraphBuilder(model_provider="gemini")
+    # WHY: use_async runs LLM calls, tools and checkpointing natively async,
+    # so one slow turn doesn't block every other request on this worker
+    # LLM_PROVIDER=stub runs the scripted offline model (load tests, CI)
+    graph_builder = GraphBuilder(model_provider=os.getenv("LLM_PROVIDER", "gemini"), use_async=True)
     graph = graph_builder()
     logger.info("Agent initialized successfully")
+    
+    # WHY: Creating the manager backfills the sessions index once (blocking SQLite work)
+    session_manager = await asyncio.to_thread(SessionManager)
+    
+    # WHY: Prune old checkpoints periodically so checkpoints.db stays small
+    if get_retention_settings()["enabled"]:
+        retention_task = asyncio.create_task(retention_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background jobs, close the checkpoint connection and HTTP pools on server shutdown"""
+    if retention_task is not None:
+        retention_task.cancel()
+    if graph_builder is not None:
+        await graph_builder.aclose()
+    if session_manager is not None:
+        session_manager.close()
+    await aclose_clients()
+
+def _content_to_text(content) -> str:
+    """
+    Flatten message content to plain text.
+    
+    WHY: Gemini returns a list of content objects instead of a string
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        text = ""
+        for item in content:
+            if isinstance(item, dict) and 'text' in item:
+                text += item['text']
+            elif isinstance(item, str):
+                text += item
+        return text
+    return str(content)
 
 # Request/Response models
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None  # WHY: Track conversation sessions
+    stream_tokens: bool = False  # WHY: Opt-in token deltas on /api/chat/stream
 
 class ChatResponse(BaseModel):
     success: bool
     response: str = None
     session_id: str = None  # WHY: Return session ID to frontend
     error: str = None
+    cached: bool = False  # WHY: Answer replayed from the response cache
+
+async def _is_first_turn(request: ChatRequest) -> bool:
+    """
+    True if the request starts a conversation (nothing to remember yet).
+    
+    WHY: Only stateless queries may use the response cache; a follow-up's
+    answer depends on the conversation so far
+    """
+    if not request.session_id:
+        return True
+    if session_manager is None:
+        return False
+    session = await asyncio.to_thread(session_manager.get_session, request.session_id)
+    return session is None or session["message_count"] == 0
+
+async def _cached_response(user_message: str, config: dict) -> Optional[str]:
+    """
+    Replay a cached answer for a first-turn query, recording the turn in the session.
+    
+    WHY: The turn is written to the checkpoint as if the agent had answered,
+    so a follow-up in the same session still has the plan as context
+    """
+    response = await get_response_cache().lookup(user_message)
+    if response is not None:
+        await graph.aupdate_state(
+            config,
+            {"messages": [HumanMessage(content=user_message), AIMessage(content=response)]},
+            as_node="agent",
+        )
+    return response
 
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
@@ -109,88 +190,99 @@ async def chat(request: ChatRequest):
     start_time = time.time()
     tools_used = []
     
-    try:
-        logger.info("Processing user query", extra={"query": user_message, "session_id": session_id})
-        
-        # Create messages list for this request
-        # WHY: With memory enabled, we only pass current message
-        # Agent automatically loads previous messages from checkpointer via thread_id
-        messages = [("user", user_message)]
-        initial_state = {"messages": messages}
-        
-        # Invoke the agent with session config
-        # WHY: thread_id tells checkpointer which conversation to load/save
-        config = {"configurable": {"thread_id": session_id}}
-        result = graph.invoke(initial_state, config=config)
-        
-        # Extract response
-        last_message = result['messages'][-1]
-        response_content = last_message.content
-        
-        # Handle Gemini's response format
-        if isinstance(response_content, list):
-            # Gemini returns list of content objects
-            text_content = ""
-            for item in response_content:
-                if isinstance(item, dict) and 'text' in item:
-                    text_content += item['text']
-                elif isinstance(item, str):
-                    text_content += item
-            response_content = text_content
-        elif not isinstance(response_content, str):
-            response_content = str(response_content)
-        
-        # Track which tools were used
-        for msg in result['messages']:
-            if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                tools_used.extend([tc['name'] for tc in msg.tool_calls])
-        
-        # Output validation
-        output_validation = validate_agent_output(response_content, user_message)
-        
-        # Calculate latency
-        latency_ms = int((time.time() - start_time) * 1000)
-        
-        # Log success
-        logger.info(
-            "Successfully processed query",
-            extra={
-                "query": user_message[:100],
-                "tools_used": list(set(tools_used)),
-                "latency_ms": latency_ms,
-                "success": True,
-                "output_score": output_validation["score"],
-                "session_id": session_id
-            }
-        )
-        
-        return ChatResponse(
-            success=True,
-            response=response_content,
-            session_id=session_id
-        )
-        
-    except Exception as e:
-        latency_ms = int((time.time() - start_time) * 1000)
-        error_msg = str(e)
-        
-        logger.error(
-            "Error processing query",
-            extra={
-                "query": user_message[:100],
-                "tools_used": list(set(tools_used)),
-                "errors": [error_msg],
-                "latency_ms": latency_ms,
-                "success": False,
-                "session_id": session_id
-            }
-        )
-        
-        return ChatResponse(
-            success=False,
-            error=f"An error occurred: {error_msg}",
-            session_id=session_id
-        )
+    # WHY: One trace per turn; log lines inside carry its trace and session ids
+    with start_trace("POST /api/chat", session_id=session_id):
+        try:
+            logger.info("Processing user query", extra={"query": user_message, "session_id": session_id})
+            
+            # Create messages list for this request
+            # WHY: With memory enabled, we only pass current message
+            # Agent automatically loads previous messages from checkpointer via thread_id
+            messages = [("user", user_message)]
+            initial_state = {"messages": messages}
+            
+            # Invoke the agent with session config
+            # WHY: thread_id tells checkpointer which conversation to load/save
+            config = {"configurable": {"thread_id": session_id}}
+            
+            # WHY: A repeated opening question is answered in milliseconds instead of a full agent run
+            first_turn = get_response_cache().enabled and await _is_first_turn(request)
+            cached_response = await _cached_response(user_message, config) if first_turn else None
+            if cached_response is not None:
+                logger.info(
+                    "Served cached response",
+                    extra={
+                        "query": user_message[:100],
+                        "latency_ms": int((time.time() - start_time) * 1000),
+                        "success": True,
+                        "session_id": session_id
+                    }
+                )
+                CHAT_REQUEST_SECONDS.observe(time.time() - start_time, "chat", "cached")
+                return ChatResponse(success=True, response=cached_response, session_id=session_id, cached=True)
+            
+            with span("graph.run"):
+                result = await graph.ainvoke(initial_state, config=config)
+            
+            # Extract response
+            last_message = result['messages'][-1]
+            response_content = _content_to_text(last_message.content)
+            
+            # Track which tools were used
+            for msg in result['messages']:
+                if hasattr(msg, 'tool_calls') and msg.tool_calls:
+                    tools_used.extend([tc['name'] for tc in msg.tool_calls])
+            
+            # Output validation
+            output_validation = validate_agent_output(response_content, user_message)
+            if first_turn and output_validation["valid"]:
+                await get_response_cache().store(user_message, response_content, output_validation["score"])
+            
+            # Calculate latency
+            latency_ms = int((time.time() - start_time) * 1000)
+            CHAT_REQUEST_SECONDS.observe(latency_ms / 1000, "chat", "success")
+            
+            # Log success
+            logger.info(
+                "Successfully processed query",
+                extra={
+                    "query": user_message[:100],
+                    "tools_used": list(set(tools_used)),
+                    "latency_ms": latency_ms,
+                    "success": True,
+                    "output_score": output_validation["score"],
+                    "session_id": session_id
+                }
+            )
+            
+            return ChatResponse(
+                success=True,
+                response=response_content,
+                session_id=session_id
+            )
+            
+        except Exception as e:
+            latency_ms = int((time.time() - start_time) * 1000)
+            CHAT_REQUEST_SECONDS.observe(latency_ms / 1000, "chat", "error")
+            error_msg = str(e)
+            
+            logger.error(
+                "Error processing query",
+                extra={
+                    "query": user_message[:100],
+                    "tools_used": list(set(tools_used)),
+                    "errors": [error_msg],
+                    "latency_ms": latency_ms,
+                    "success": False,
+                    "session_id": session_id
+                }
+            )
+            
+            return ChatResponse(
+                success=False,
+                error=f"An error occurred: {error_msg}",
+                session_id=session_id
+            )
 
 @app.post("/api/chat/stream")
 async def chat_stream(request: ChatRequest):
@@ -214,79 +306,223 @@ async def chat_stream(request: ChatRequest):
     
     async def event_generator() -> AsyncGenerator[str, None]:
         """Generate SSE events as agent processes"""
-        try:
-            # Send initial thinking event
-            yield f"data: {json.dumps({'type': 'thinking', 'message': 'Starting to process your request...', 'session_id': session_id})}\n\n"
-            await asyncio.sleep(0.1)  # Small delay for UX
-            
-            # Create messages and config
-            messages = [("user", user_message)]
-            initial_state = {"messages": messages}
-            config = {"configurable": {"thread_id": session_id}}
-            
-            # Stream events as the agent runs
-            # LangGraph's .stream() yields intermediate results
-            final_response = None
-            tool_names = {
-                'get_weather': 'Checking weather',
-                'search_hotels': 'Searching for hotels',
-                'search_restaurants': 'Finding restaurants',
-                'search_attractions': 'Discovering attractions',
-                'search_activities': 'Looking for activities',
-                'calculator': 'Calculating costs',
-                'validate_budget': 'Validating budget',
-                'format_response': 'Formatting response'
-            }
-            
-            for event in graph.stream(initial_state, config=config):
-                if 'agent' in event:
-                    # Agent is thinking or has a response
-                    agent_msg = event['agent']['messages'][-1]
-                    
-                    # Check if agent is calling tools
-                    if hasattr(agent_msg, 'tool_calls') and agent_msg.tool_calls:
-                        for tool_call in agent_msg.tool_calls:
-                            tool_name = tool_call.get('name', 'unknown')
-                            friendly_name = tool_names.get(tool_name, f"Using {tool_name}")
+        # WHY: Started inside the generator, which outlives the endpoint function
+        with start_trace("POST /api/chat/stream", session_id=session_id):
+            start_time = time.time()
+            outcome = "error"
+            try:
+                # Send initial thinking event
+                yield f"data: {json.dumps({'type': 'thinking', 'message': 'Starting to process your request...', 'session_id': session_id})}\n\n"
+                await asyncio.sleep(0.1)  # Small delay for UX
+                
+                # Create messages and config
+                messages = [("user", user_message)]
+                initial_state = {"messages": messages}
+                config = {"configurable": {"thread_id": session_id}}
+                
+                first_turn = get_response_cache().enabled and await _is_first_turn(request)
+                cached_response = await _cached_response(user_message, config) if first_turn else None
+                if cached_response is not None:
+                    outcome = "cached"
+                    yield f"data: {json.dumps({'type': 'complete', 'response': cached_response, 'session_id': session_id, 'cached': True})}\n\n"
+                    return
+                
+                # Stream events as the agent runs
+                # LangGraph's .astream() yields intermediate results
+                final_response = None
+                tool_names = {
+                    'get_destination_bundle': 'Gathering destination overview',
+                    'get_weather': 'Checking weather',
+                    'search_hotels': 'Searching for hotels',
+                    'search_restaurants': 'Finding restaurants',
+                    'search_attractions': 'Discovering attractions',
+                    'search_activities': 'Looking for activities',
+                    'calculator': 'Calculating costs',
+                    'plan_budget': 'Fitting plan to budget',
+                    'format_response': 'Formatting response'
+                }
+                
+                # WHY: "messages" mode forwards LLM token deltas as they are generated,
+                # so time-to-first-token no longer equals total latency.
+                # "updates" mode still drives the tool_start/tool_end events.
+                stream_mode = ["updates", "messages"] if request.stream_tokens else ["updates"]
+                # WHY: Validates the answer as its tokens stream, so no rescan at the end
+                # (models that don't stream tokens fall back to validate_agent_output)
+                validator = StreamingOutputValidator() if first_turn and request.stream_tokens else None
+                
+                with span("graph.run"):
+                    async for mode, payload in graph.astream(initial_state, config=config, stream_mode=stream_mode):
+                        if mode == "messages":
+                            chunk, metadata = payload
+                            # Only the agent node talks to the LLM; skip tool messages
+                            # and the context manager's history-summary call
+                            if metadata.get('langgraph_node') != 'agent' or not isinstance(chunk, AIMessageChunk):
+                                continue
+                            if SUMMARY_TAG in metadata.get('tags', []):
+                                continue
+                            token = _content_to_text(chunk.content)
+                            if token:
+                                if validator:
+                                    validator.feed(token)
+                                yield f"data: {json.dumps({'type': 'token', 'content': token})}\n\n"
+                            continue
+                        
+                        event = payload
+                        if 'agent' in event:
+                            # Agent is thinking or has a response
+                            agent_msg = event['agent']['messages'][-1]
+                            
+                            # Check if agent is calling tools
+                            if hasattr(agent_msg, 'tool_calls') and agent_msg.tool_calls:
+                                if validator:
+                                    validator.reset()  # The answer is a later message
+                                for tool_call in agent_msg.tool_calls:
+                                    tool_name = tool_call.get('name', 'unknown')
+                                    friendly_name = tool_names.get(tool_name, f"Using {tool_name}")
+                                    
+                                    # Send tool_start event
+                                    yield f"data: {json.dumps({'type': 'tool_start', 'tool': tool_name, 'message': friendly_name})}\n\n"
+                                    await asyncio.sleep(0.05)
                             
-                            # Send tool_start event
-                            yield f"data: {json.dumps({'type': 'tool_start', 'tool': tool_name, 'message': friendly_name})}\n\n"
+                            # Check if this is the final response
+                            if hasattr(agent_msg, 'content') and agent_msg.content:
+                                final_response = _content_to_text(agent_msg.content)
+                        
+                        elif 'tools' in event:
+                            # Tool execution completed
+                            yield f"data: {json.dumps({'type': 'tool_end', 'message': 'Completed'})}\n\n"
                             await asyncio.sleep(0.05)
-                    
-                    # Check if this is the final response
-                    if hasattr(agent_msg, 'content') and agent_msg.content:
-                        # Extract text from Gemini's response format
-                        content = agent_msg.content
-                        if isinstance(content, list):
-                            # Gemini returns list of content objects
-                            final_response = ""
-                            for item in content:
-                                if isinstance(item, dict) and 'text' in item:
-                                    final_response += item['text']
-                                elif isinstance(item, str):
-                                    final_response += item
-                        elif isinstance(content, str):
-                            final_response = content
-                        else:
-                            final_response = str(content)
                 
-                elif 'tools' in event:
-                    # Tool execution completed
-                    yield f"data: {json.dumps({'type': 'tool_end', 'message': 'Completed'})}\n\n"
-                    await asyncio.sleep(0.05)
-            
-            # Send final response
-            if final_response:
-                yield f"data: {json.dumps({'type': 'complete', 'response': final_response, 'session_id': session_id})}\n\n"
-            else:
-                yield f"data: {json.dumps({'type': 'error', 'message': 'No response generated'})}\n\n"
-                
-        except Exception as e:
-            logger.error(f"Streaming error: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+                # Send final response
+                if final_response:
+                    outcome = "success"
+                    yield f"data: {json.dumps({'type': 'complete', 'response': final_response, 'session_id': session_id})}\n\n"
+                    if first_turn:
+                        output_validation = (
+                            validator.result() if validator and validator.fed
+                            else validate_agent_output(final_response, user_message)
+                        )
+                        if output_validation["valid"]:
+                            await get_response_cache().store(user_message, final_response, output_validation["score"])
+                else:
+                    yield f"data: {json.dumps({'type': 'error', 'message': 'No response generated'})}\n\n"
+                    
+            except Exception as e:
+                logger.error(f"Streaming error: {e}")
+                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            finally:
+                # WHY: Also runs when the client disconnects mid-stream
+                CHAT_REQUEST_SECONDS.observe(time.time() - start_time, "stream", outcome)
     
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
+# ---- SESSION ENDPOINTS ---- #
+def _etag(payload) -> str:
+    """Weak ETag over the JSON a response would send"""
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True if the client's If-None-Match already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # WHY: If-None-Match uses weak comparison, so W/"x" and "x" are the same
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in tags
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def _json_with_etag(payload, etag: str) -> JSONResponse:
+    # WHY: no-cache makes the browser revalidate every poll, getting a cheap 304 when unchanged
+    return JSONResponse(payload, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def _require_session_manager() -> SessionManager:
+    if not session_manager:
+        raise HTTPException(status_code=500, detail="Session manager not initialized")
+    return session_manager
+
+@app.get("/api/sessions")
+async def list_sessions(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    """
+    List sessions, most recently updated first.
+    
+    WHY: Cursor pagination over the sessions index keeps each call O(page size);
+    the ETag lets sidebar polling get 304s while nothing changed.
+    """
+    manager = _require_session_manager()
+    try:
+        sessions, next_cursor = await asyncio.to_thread(manager.get_sessions_page, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    payload = {"sessions": sessions, "next_cursor": next_cursor}
+    etag = _etag(payload)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    return _json_with_etag(payload, etag)
+
+@app.get("/api/sessions/{session_id}/messages")
+async def get_session_messages(
+    request: Request,
+    session_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+):
+    """
+    Get a session's messages: newest first (optionally `before` a position),
+    or only those `after` a position, oldest first.
+    
+    WHY: The ETag comes from the session's index row (updated_at, message_count),
+    so an unchanged conversation answers 304 without reading its history at all.
+    """
+    manager = _require_session_manager()
+    session = await asyncio.to_thread(manager.get_session, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    etag = _etag([session["updated_at"], session["message_count"], session_id, limit, before, after])
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    
+    try:
+        if after is not None:
+            messages, next_cursor = await asyncio.to_thread(manager.get_messages_since, session_id, after, limit)
+        else:
+            messages, next_cursor = await asyncio.to_thread(manager.get_messages_page, session_id, limit, before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _json_with_etag({"session_id": session_id, "messages": messages, "next_cursor": next_cursor}, etag)
+
+@app.delete("/api/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str):
+    """Delete a session and its checkpoints"""
+    manager = _require_session_manager()
+    if not await asyncio.to_thread(manager.delete_session, session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return Response(status_code=204)
+
+# ---- METRICS ---- #
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics for this worker process
+    
+    WHY: Latency histograms per node, tool, LLM call, external API and
+    checkpoint write show where a slow turn spends its time
+    """
+    if not get_metrics_settings()["enabled"]:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
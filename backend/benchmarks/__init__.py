@@ -0,0 +1 @@
+# Benchmarks for the travel planner backend (run from the backend directory)
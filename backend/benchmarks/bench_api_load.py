@@ -0,0 +1,329 @@
+"""
+End-to-End Load Benchmark for the FastAPI Server
+
+WHY: Sizing workers and catching regressions needs numbers for the whole
+server path (HTTP, graph, tools, checkpointer), not just single components.
+This starts api.py under uvicorn in a subprocess with the offline stub LLM
+(LLM_PROVIDER=stub) and the stub places/weather servers, then drives
+/api/chat and /api/chat/stream with concurrent simulated users. Each user
+holds a multi-turn conversation.
+
+Reported per endpoint: throughput, p50/p95/p99 latency, error count and, for
+SSE, time to the first event. Also reported: checkpoint DB growth and server
+memory per session. Results are written as JSON (with the git commit) so runs
+can be compared across commits with --compare.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_api_load --users 50 --turns 3 --llm-latency 0.5
+    python -m benchmarks.bench_api_load --compare benchmarks/results/<baseline>.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from travel_planner.utils.stub_servers import stub_servers
+
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+DESTINATIONS = ["Goa", "Jaipur", "Manali", "Kochi", "Rishikesh", "Udaipur", "Pondicherry", "Shimla"]
+FIRST_TURNS = [
+    "Plan {days} days in {destination} under ₹{budget}",
+    "What is the weather in {destination}?",
+    "Plan a trip to {destination}",
+]
+FOLLOW_UPS = [
+    "What is the weather in {destination} this week?",
+    "Make it a {days} day trip in {destination} with budget {budget}",
+    "Suggest restaurants in {destination}",
+]
+
+# Metrics compared by --compare; True means higher is better
+COMPARED = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "ttfe_p50_ms": False,
+    "ttfe_p95_ms": False,
+}
+
+
+# ------------------ SERVER ------------------ #
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+    return children + [grandchild for child in children for grandchild in _children(child)]
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Resident memory of a process and its workers (Linux /proc; None elsewhere)."""
+    total = 0
+    for proc in [pid] + _children(pid):
+        try:
+            with open(f"/proc/{proc}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            if proc == pid:
+                return None
+    return total
+
+
+def _db_bytes(db_path: str) -> int:
+    return sum(os.path.getsize(p) for p in (db_path, db_path + "-wal") if os.path.exists(p))
+
+
+def start_api(port: int, workers: int, env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    """Run api.py under uvicorn; its output goes to log_path (shown if it fails to start)."""
+    with open(log_path, "w") as log:
+        return subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env={**os.environ, **env},
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+
+
+async def wait_ready(client: httpx.AsyncClient, server: subprocess.Popen, log_path: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            if (await client.get("/api/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    with open(log_path) as log:
+        raise RuntimeError(f"API server did not become ready:\n{log.read()[-2000:]}")
+
+
+# ------------------ LOAD ------------------ #
+def _message(templates: List[str], rng: random.Random, destination: str) -> str:
+    return rng.choice(templates).format(
+        days=rng.randint(2, 6), destination=destination, budget=rng.choice([8000, 15000, 30000])
+    )
+
+
+async def _chat(client: httpx.AsyncClient, message: str, session_id: Optional[str], samples: Dict) -> Optional[str]:
+    started = time.perf_counter()
+    try:
+        response = await client.post("/api/chat", json={"message": message, "session_id": session_id})
+        data = response.json()
+        ok = response.status_code == 200 and data.get("success")
+    except (httpx.HTTPError, ValueError):
+        data, ok = {}, False
+    samples["latency"].append(time.perf_counter() - started)
+    samples["errors"] += 0 if ok else 1
+    return data.get("session_id", session_id)
+
+
+async def _stream(client: httpx.AsyncClient, message: str, session_id: Optional[str], samples: Dict) -> Optional[str]:
+    started = time.perf_counter()
+    first_event, ok = None, False
+    try:
+        async with client.stream("POST", "/api/chat/stream",
+                                 json={"message": message, "session_id": session_id}) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                if first_event is None:
+                    first_event = time.perf_counter() - started
+                event = json.loads(line[6:])
+                session_id = event.get("session_id", session_id)
+                if event.get("type") == "complete":
+                    ok = True
+                elif event.get("type") == "error":
+                    break
+    except (httpx.HTTPError, ValueError):
+        pass
+    samples["latency"].append(time.perf_counter() - started)
+    if first_event is not None:
+        samples["ttfe"].append(first_event)
+    samples["errors"] += 0 if ok else 1
+    return session_id
+
+
+async def simulate_user(client: httpx.AsyncClient, endpoint: str, user: int, turns: int,
+                        think_time: float, samples: Dict, seed: int):
+    """One conversation: a first turn without a session, then follow-ups in it."""
+    rng = random.Random(seed + user)
+    destination = rng.choice(DESTINATIONS)
+    send = _stream if endpoint == "stream" else _chat
+    session_id = None
+    for turn in range(turns):
+        templates = FIRST_TURNS if turn == 0 else FOLLOW_UPS
+        session_id = await send(client, _message(templates, rng, destination), session_id, samples)
+        if think_time:
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    # Nearest-rank percentile
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index] * 1000, 1)
+
+
+async def run_endpoint(base_url: str, endpoint: str, args, pid: int, db_path: str) -> Dict:
+    samples = {"latency": [], "ttfe": [], "errors": 0}
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        rss_before, db_before = _rss_bytes(pid), _db_bytes(db_path)
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            simulate_user(client, endpoint, user, args.turns, args.think_time, samples, args.seed)
+            for user in range(args.users)
+        ))
+        elapsed = time.perf_counter() - started
+        rss_after, db_after = _rss_bytes(pid), _db_bytes(db_path)
+
+    requests = len(samples["latency"])
+    result = {
+        "endpoint": f"/api/chat{'/stream' if endpoint == 'stream' else ''}",
+        "sessions": args.users,
+        "requests": requests,
+        "errors": samples["errors"],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_ms": _percentile(samples["latency"], 50),
+        "p95_ms": _percentile(samples["latency"], 95),
+        "p99_ms": _percentile(samples["latency"], 99),
+        "db_growth_bytes": db_after - db_before,
+        "db_bytes_per_session": round((db_after - db_before) / args.users),
+    }
+    if endpoint == "stream":
+        result["ttfe_p50_ms"] = _percentile(samples["ttfe"], 50)
+        result["ttfe_p95_ms"] = _percentile(samples["ttfe"], 95)
+        result["ttfe_p99_ms"] = _percentile(samples["ttfe"], 99)
+    if rss_before is not None and rss_after is not None:
+        result["rss_growth_bytes"] = rss_after - rss_before
+        result["rss_bytes_per_session"] = round((rss_after - rss_before) / args.users)
+    return result
+
+
+# ------------------ RESULTS ------------------ #
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, baseline: Dict):
+    """Print the change of each compared metric against a baseline run."""
+    base = {r["endpoint"]: r for r in baseline["results"]}
+    print(f"\nvs {baseline.get('commit')} ({baseline.get('timestamp')})")
+    for result in current["results"]:
+        previous = base.get(result["endpoint"])
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            better = change > 0 if higher_is_better else change < 0
+            print(f"  {result['endpoint']:<20}{metric:<16}{old:>10} -> {new:<10}"
+                  f"{change:+.1f}% {'better' if better else 'worse'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50, help="Concurrent simulated users (one session each)")
+    parser.add_argument("--turns", type=int, default=3, help="Messages per session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's turns (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Median stub LLM latency per call (s)")
+    parser.add_argument("--tool-latency", type=float, default=0.05, help="Median stub API latency (s)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--endpoints", default="chat,stream", help="Comma-separated: chat, stream")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Results JSON path (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            stub_servers({"mean_s": args.tool_latency}, args.seed) as env:
+        db_path = os.path.join(tmp, "checkpoints.db")
+        log_path = os.path.join(tmp, "server.log")
+        port = _free_port()
+        server = start_api(port, args.workers, log_path=log_path, env={
+            **env,
+            "LLM_PROVIDER": "stub",
+            "STUB_LLM_LATENCY_S": str(args.llm_latency),
+            "CHECKPOINT_DB_PATH": db_path,
+        })
+        base_url = f"http://127.0.0.1:{port}"
+
+        async def run() -> List[Dict]:
+            async with httpx.AsyncClient(base_url=base_url) as client:
+                await wait_ready(client, server, log_path)
+            return [
+                await run_endpoint(base_url, endpoint.strip(), args, server.pid, db_path)
+                for endpoint in args.endpoints.split(",")
+            ]
+
+        try:
+            results = asyncio.run(run())
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "results": results,
+    }
+
+    columns = ["requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms",
+               "ttfe_p50_ms", "db_bytes_per_session", "rss_bytes_per_session"]
+    print(f"{'endpoint':<20}" + "".join(f"{c:>22}" for c in columns))
+    for r in results:
+        print(f"{r['endpoint']:<20}" + "".join(f"{str(r.get(c, '-')):>22}" for c in columns))
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{report['commit'] or 'nogit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
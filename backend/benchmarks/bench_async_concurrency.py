@@ -0,0 +1,126 @@
+"""
+Concurrency Benchmark for the Async Agent Path
+
+WHY: Proves that graph.ainvoke lets a single worker serve many conversations
+at once, while calling the sync graph.invoke inside an async handler
+serializes every request behind the slowest LLM turn.
+
+The LLM is replaced by a stub that sleeps for a fixed latency and scripts one
+calculator tool call per conversation, so no API keys or network are needed.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_async_concurrency --users 200 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from unittest.mock import patch
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from travel_planner.agent.agent_workflow import GraphBuilder
+from travel_planner.utils.model_loader import ModelLoader
+
+
+class SleepyChatModel(BaseChatModel):
+    """Stub chat model: one calculator call, then a final answer."""
+
+    latency: float = 0.5
+
+    @property
+    def _llm_type(self) -> str:
+        return "sleepy-stub"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages) -> ChatResult:
+        if isinstance(messages[-1], ToolMessage):
+            message = AIMessage(content=f"Your trip costs ₹{messages[-1].content}.")
+        else:
+            message = AIMessage(
+                content="",
+                tool_calls=[{
+                    "name": "calculator",
+                    "args": {"expression": "2500 + 1200 + 800"},
+                    "id": f"call_{uuid.uuid4().hex[:8]}",
+                }],
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._reply(messages)
+
+
+def _build(use_async: bool, db_path: str, latency: float):
+    with patch.object(ModelLoader, "load_llm", lambda self: SleepyChatModel(latency=latency)):
+        builder = GraphBuilder(model_provider="gemini", use_async=use_async, db_path=db_path)
+    return builder, builder()
+
+
+async def _run(mode: str, users: int, latency: float, db_path: str) -> dict:
+    builder, graph = _build(mode == "async", db_path, latency)
+
+    async def blocking_handler(message: str):
+        # Mirrors the old api.chat: sync graph.invoke inside an async def
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        return graph.invoke({"messages": [("user", message)]}, config=config)
+
+    async def async_handler(message: str):
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        return await graph.ainvoke({"messages": [("user", message)]}, config=config)
+
+    handler = async_handler if mode == "async" else blocking_handler
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(f"Plan trip {i} to Goa") for i in range(users)))
+    elapsed = time.perf_counter() - start
+
+    await builder.aclose()
+
+    # Each conversation is two LLM turns, so its ideal latency is 2 * latency
+    ideal = 2 * latency
+    return {
+        "mode": mode,
+        "users": users,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(users / elapsed, 2),
+        "effective_concurrency": round(users * ideal / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200, help="Concurrent conversations")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub LLM latency (s)")
+    parser.add_argument("--blocking-users", type=int, default=10,
+                        help="Conversations for the blocking baseline (it runs serially)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            asyncio.run(_run("blocking", args.blocking_users, args.latency,
+                             os.path.join(tmp, "blocking.db"))),
+            asyncio.run(_run("async", args.users, args.latency,
+                             os.path.join(tmp, "async.db"))),
+        ]
+
+    print(f"{'mode':<10}{'users':>8}{'elapsed_s':>12}{'rps':>10}{'concurrency':>14}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['users']:>8}{r['elapsed_s']:>12}"
+              f"{r['throughput_rps']:>10}{r['effective_concurrency']:>14}")
+
+
+if __name__ == "__main__":
+    main()
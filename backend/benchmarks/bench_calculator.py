@@ -0,0 +1,60 @@
+"""
+Calculator Micro-Benchmark
+
+WHY: Compares the old eval()-based calculator with the AST evaluator in
+tools/calculator.py, both uncached (first sight of an expression) and cached
+(the same expression again, which is common when the model re-checks totals).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_calculator --iterations 20000
+"""
+
+import argparse
+import timeit
+
+from travel_planner.tools.calculator import compile_expression, evaluate
+
+
+EXPRESSIONS = [
+    "2500 + 1200 + 800",
+    "(1800 * 3) + (450 * 6) + 1200",
+    "sum([1500, 2200, 900, 650])",
+    "max(1200, 950) - min(300, 450)",
+    "4500 / 3 * 1.18",
+]
+
+
+def _eval(expression: str):
+    # The previous implementation
+    allowed_names = {"sum": sum, "min": min, "max": max}
+    return eval(expression, {"__builtins__": None}, allowed_names)
+
+
+def _uncached(expression: str):
+    compile_expression.cache_clear()
+    return evaluate(expression)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000, help="Calls per expression")
+    args = parser.parse_args()
+
+    for expression in EXPRESSIONS:
+        assert abs(_eval(expression) - evaluate(expression)) < 1e-9, expression
+
+    rows = []
+    for name, func in (("eval", _eval), ("ast (uncached)", _uncached), ("ast (cached)", evaluate)):
+        seconds = sum(
+            timeit.timeit(lambda e=e: func(e), number=args.iterations) for e in EXPRESSIONS
+        )
+        rows.append((name, seconds / (args.iterations * len(EXPRESSIONS)) * 1e6))
+
+    baseline = rows[0][1]
+    print(f"{'evaluator':<18}{'µs/call':>10}{'vs eval':>10}")
+    for name, micros in rows:
+        print(f"{name:<18}{micros:>10.2f}{baseline / micros:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
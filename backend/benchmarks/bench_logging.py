@@ -0,0 +1,160 @@
+"""
+Logging Throughput Benchmark
+
+WHY: Compares the old logging setup (FileHandler + StreamHandler on the
+caller's thread, dict + json.dumps per record) with the queue pipeline in
+utils/logger (the caller only enqueues; a listener thread formats, encodes
+and writes). Reports records/sec as seen by the caller, the caller's p99
+time per log call, and records/sec until everything is on disk.
+
+The console handler writes to /dev/null so terminal speed doesn't skew runs.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_logging --records 50000 --threads 4
+"""
+
+import argparse
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from travel_planner.utils.logger import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SuccessSamplingFilter,
+    TraceContextFilter,
+)
+
+
+class LegacyJsonFormatter(logging.Formatter):
+    """The formatter before the queue pipeline (datetime.utcnow + json.dumps)."""
+
+    def format(self, record):
+        log_data = {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for field in ('query', 'tools_used', 'errors', 'latency_ms', 'success'):
+            if hasattr(record, field):
+                log_data[field] = getattr(record, field)
+        return json.dumps(log_data)
+
+
+def _console(devnull) -> logging.Handler:
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    return handler
+
+
+def _legacy(name: str, path: str, devnull):
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    file_handler = logging.FileHandler(path)
+    file_handler.setFormatter(LegacyJsonFormatter())
+    logger.addHandler(file_handler)
+    logger.addHandler(_console(devnull))
+    return logger, None
+
+
+def _queued(name: str, path: str, devnull, sample_rate: float):
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=0)
+    file_handler.setFormatter(JsonFormatter())
+    queue_handler = NonBlockingQueueHandler(queue.Queue())
+    queue_handler.addFilter(SuccessSamplingFilter(sample_rate))
+    queue_handler.addFilter(TraceContextFilter())
+    logger.addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(queue_handler.queue, file_handler, _console(devnull))
+    listener.start()
+    return logger, listener
+
+
+def _emit(logger: logging.Logger, count: int, timings: list):
+    for i in range(count):
+        started = time.perf_counter()
+        logger.info(
+            "Successfully processed query",
+            extra={
+                "query": f"Plan a {i % 7 + 1} day trip to Goa under 20000 INR",
+                "tools_used": ["get_destination_bundle", "plan_budget"],
+                "latency_ms": 1800 + i % 400,
+                "success": True,
+                "session_id": f"session-{i % 100}",
+            },
+        )
+        timings.append(time.perf_counter() - started)
+
+
+def _run(mode: str, records: int, threads: int, sample_rate: float, tmp: str) -> dict:
+    path = os.path.join(tmp, f"{mode}.log")
+    with open(os.devnull, "w") as devnull:
+        if mode == "legacy":
+            logger, listener = _legacy(f"bench.{mode}", path, devnull)
+        else:
+            logger, listener = _queued(f"bench.{mode}", path, devnull, sample_rate)
+
+        per_thread = records // threads
+        timings = [[] for _ in range(threads)]
+        workers = [
+            threading.Thread(target=_emit, args=(logger, per_thread, timings[i])) for i in range(threads)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        emitted = time.perf_counter() - start
+        if listener is not None:
+            listener.stop()  # WHY: Waits until the writer thread has drained the queue
+        drained = time.perf_counter() - start
+
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
+
+    calls = sorted(t for thread_timings in timings for t in thread_timings)
+    with open(path) as f:
+        written = sum(1 for _ in f)
+    return {
+        "mode": mode,
+        "records": len(calls),
+        "written": written,
+        "caller_rps": round(len(calls) / emitted),
+        "caller_p99_us": round(calls[int(len(calls) * 0.99) - 1] * 1e6, 1),
+        "end_to_end_rps": round(len(calls) / drained),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=50000, help="Log calls in total")
+    parser.add_argument("--threads", type=int, default=4, help="Threads logging concurrently")
+    parser.add_argument("--sample-rate", type=float, default=0.1,
+                        help="success_sample_rate for the sampled run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            _run("legacy", args.records, args.threads, 1.0, tmp),
+            _run("queued", args.records, args.threads, 1.0, tmp),
+            _run("sampled", args.records, args.threads, args.sample_rate, tmp),
+        ]
+
+    print(f"{'mode':<10}{'records':>9}{'written':>9}{'caller_rps':>12}{'p99_us':>9}{'e2e_rps':>10}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['records']:>9}{r['written']:>9}{r['caller_rps']:>12}"
+              f"{r['caller_p99_us']:>9}{r['end_to_end_rps']:>10}")
+
+
+if __name__ == "__main__":
+    main()
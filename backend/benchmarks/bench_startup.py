@@ -0,0 +1,119 @@
+"""
+Server Startup Benchmark
+
+WHY: Autoscaled containers that scale from zero serve their first request
+only after Python has imported api.py and the startup hook has built the
+graph, so cold start is user-facing latency. This measures, over several
+fresh processes:
+
+    import_s   time to `import api` (interpreter start excluded)
+    ready_s    time from launching uvicorn to the first /api/health answer
+               with agent_ready=true
+
+and lists the slowest imports (python -X importtime) to show where the
+remaining time goes. The stub LLM needs no key; --provider gemini/openai/groq
+measures that provider's SDK import with a dummy key (no network calls).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --provider gemini
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.bench_api_load import BACKEND_DIR, _free_port, start_api
+
+
+DUMMY_KEYS = {"gemini": "GEMINI_API_KEY", "openai": "OPENAI_API_KEY", "groq": "GROQ_API_KEY"}
+
+
+def _env(provider: str, tmp: str) -> Dict[str, str]:
+    env = {"LLM_PROVIDER": provider, "CHECKPOINT_DB_PATH": os.path.join(tmp, "checkpoints.db")}
+    if provider in DUMMY_KEYS and not os.getenv(DUMMY_KEYS[provider]):
+        env[DUMMY_KEYS[provider]] = "dummy"
+    return env
+
+
+def import_time(env: Dict[str, str]) -> float:
+    """Seconds to import api in a fresh interpreter."""
+    code = "import time; t = time.perf_counter(); import api; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env={**os.environ, **env},
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: Dict[str, str], top: int) -> List[Tuple[str, float]]:
+    """Top-level imports of api by cumulative import time (seconds)."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import api"], cwd=BACKEND_DIR,
+                         env={**os.environ, **env}, capture_output=True, text=True, check=True)
+    entries = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # WHY: Two spaces of indent are imports made directly by api (or the interpreter)
+        if name.startswith("   ") and not name.startswith("    "):
+            entries.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+
+
+def ready_time(env: Dict[str, str], tmp: str, timeout: float = 120.0) -> float:
+    """Seconds from launching uvicorn until /api/health reports the agent ready."""
+    port = _free_port()
+    log_path = os.path.join(tmp, "server.log")
+    started = time.perf_counter()
+    server = start_api(port, 1, env, log_path)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while time.perf_counter() - started < timeout and server.poll() is None:
+                try:
+                    response = client.get("/api/health")
+                    if response.status_code == 200 and response.json().get("agent_ready"):
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        with open(log_path) as log:
+            raise RuntimeError(f"API server did not become ready:\n{log.read()[-2000:]}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _summary(values: List[float]) -> str:
+    return (f"median {statistics.median(values):.3f}s  "
+            f"min {min(values):.3f}s  max {max(values):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument("--provider", default="stub", choices=["stub", "gemini", "openai", "groq"])
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(args.provider, tmp)
+        imports = [import_time(env) for _ in range(args.runs)]
+        ready = [ready_time(env, tmp) for _ in range(args.runs)]
+        slowest = slowest_imports(env, args.top)
+
+    print(f"provider {args.provider}, {args.runs} runs")
+    print(f"import api        {_summary(imports)}")
+    print(f"first healthy     {_summary(ready)}")
+    print("slowest imports of api (cumulative):")
+    for name, seconds in slowest:
+        print(f"  {seconds:>7.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Tool Output Token Benchmark
+
+WHY: Measures how many prompt tokens a tool message costs with the old verbose
+pydantic repr versus the compact rendering (tools/rendering.py), for realistic
+Geoapify-shaped results. Every tool message is re-sent on later turns, so these
+savings compound over a conversation.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_tool_output --results 20
+"""
+
+import argparse
+import random
+
+from langchain_core.messages import ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.prebuilt.tool_node import msg_content_output
+
+from travel_planner.tools.destination_bundle import DestinationBundleOutput
+from travel_planner.tools.iternaryplaces import PlaceResult, PlaceSearchOutput
+from travel_planner.tools.rendering import render_bundle, render_places
+from travel_planner.tools.weather import WeatherOutputSchema
+
+
+AREAS = ["Calangute", "Candolim", "Baga", "Anjuna", "Panaji", "Vagator", "Colva"]
+CATEGORIES = {
+    "hotels": "accommodation.hotel",
+    "restaurants": "catering.restaurant",
+    "attractions": "tourism.sights.place_of_worship",
+    "activities": "entertainment.culture",
+}
+
+
+def _places(kind: str, n: int, rng: random.Random):
+    results = []
+    for i in range(n):
+        area = rng.choice(AREAS)
+        name = f"{area} {kind[:-1].title()} {i}"
+        address = f"{name}, Beach Road {i}, {area}, Bardez - 4035{i % 10:02d}, Goa, India"
+        results.append(PlaceResult(name=name, category=CATEGORIES[kind], address=address))
+        if i % 5 == 0:
+            # Geoapify often returns the same place twice (node + building)
+            results.append(PlaceResult(name=name, category=CATEGORIES[kind], address=address))
+    return results
+
+
+def _tokens(content) -> int:
+    return count_tokens_approximately([ToolMessage(content=content, tool_call_id="call_1")])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--results", type=int, default=20, help="Places per search")
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    rows = []
+    for kind in CATEGORIES:
+        results = _places(kind, args.results, rng)
+        # WHY: msg_content_output is what ToolNode does with a tool's return value
+        verbose = msg_content_output(PlaceSearchOutput(results=results))
+        compact = render_places(kind.capitalize(), "Goa", results, f"search_{kind}")
+        rows.append((f"search_{kind}", _tokens(verbose), _tokens(compact)))
+
+    bundle = DestinationBundleOutput(
+        place="Goa",
+        weather=WeatherOutputSchema(temperature=29.5, condition="scattered clouds", humidity=74),
+        **{kind: _places(kind, 5, rng) for kind in CATEGORIES},
+    )
+    rows.append(("get_destination_bundle", _tokens(msg_content_output(bundle)), _tokens(render_bundle(bundle))))
+
+    print(f"{'tool':<26}{'verbose':>10}{'compact':>10}{'saved':>8}")
+    for name, verbose, compact in rows:
+        print(f"{name:<26}{verbose:>10}{compact:>10}{1 - compact / verbose:>8.0%}")
+    total_v = sum(r[1] for r in rows)
+    total_c = sum(r[2] for r in rows)
+    print(f"{'total':<26}{total_v:>10}{total_c:>10}{1 - total_c / total_v:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
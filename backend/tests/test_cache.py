@@ -0,0 +1,225 @@
+"""Tests for the tool result cache backends and ToolCache (utils/cache.py)."""
+
+import asyncio
+
+import pytest
+
+from travel_planner.utils import cache as cache_module
+from travel_planner.utils.cache import (
+    DEFAULT_CACHE_SETTINGS,
+    MISSING,
+    MemoryCache,
+    RedisCache,
+    SQLiteCache,
+    ToolCache,
+    cached,
+    set_tool_cache,
+)
+
+
+class FakeClock:
+    """Stands in for the `time` module inside utils/cache."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache(max_entries=100)
+    if request.param == "sqlite":
+        return SQLiteCache(str(tmp_path / "cache.db"), max_entries=100)
+    return RedisCache("fake://")
+
+
+@pytest.fixture
+def tool_cache(backend):
+    settings = {**DEFAULT_CACHE_SETTINGS, "ttl": {"geocode": 500}, "default_ttl": 100, "negative_ttl": 10}
+    tool_cache = ToolCache(backend, settings)
+    set_tool_cache(tool_cache)
+    yield tool_cache
+    set_tool_cache(None)
+
+
+# ------------------ BACKEND PARITY ------------------ #
+def test_get_set_expire(backend, clock):
+    assert backend.get("k") is MISSING
+    backend.set("k", {"lat": 1.5, "names": ["a", "b"]}, 60)
+    assert backend.get("k") == {"lat": 1.5, "names": ["a", "b"]}
+    clock.now += 59
+    assert backend.get("k") == {"lat": 1.5, "names": ["a", "b"]}
+    clock.now += 1
+    assert backend.get("k") is MISSING
+
+
+def test_falsy_values_are_hits(backend, clock):
+    for key, value in [("none", None), ("zero", 0), ("empty", []), ("blank", "")]:
+        backend.set(key, value, 60)
+        assert backend.get(key) == value
+
+
+def test_delete_and_clear(backend, clock):
+    backend.set("a", 1, 60)
+    backend.set("b", 2, 60)
+    backend.delete("a")
+    assert backend.get("a") is MISSING
+    assert backend.get("b") == 2
+    backend.clear()
+    assert backend.get("b") is MISSING
+
+
+def test_returned_values_are_copies(backend, clock):
+    backend.set("k", {"results": [1, 2]}, 60)
+    backend.get("k")["results"].append(3)
+    assert backend.get("k") == {"results": [1, 2]}
+
+
+def test_values_come_back_as_json(backend, clock):
+    backend.set("k", (1.5, 2.5), 60)
+    assert backend.get("k") == [1.5, 2.5]
+
+
+def test_zero_ttl_is_never_served(backend, clock):
+    backend.set("k", "v", 0)
+    assert backend.get("k") is MISSING
+
+
+# ------------------ TOOL CACHE ------------------ #
+def test_namespace_ttls(tool_cache, clock):
+    tool_cache.set("geocode", "goa", [15.3, 74.1])
+    tool_cache.set("weather", "goa", {"temp": 30})
+    clock.now += 100
+    assert tool_cache.get("weather", "goa") is MISSING
+    assert tool_cache.get("geocode", "goa") == [15.3, 74.1]
+
+
+def test_explicit_ttl_overrides_namespace(tool_cache, clock):
+    tool_cache.set("geocode", "goa", [15.3, 74.1], ttl=5)
+    clock.now += 5
+    assert tool_cache.get("geocode", "goa") is MISSING
+
+
+def test_explicit_zero_ttl_is_not_the_default(tool_cache, clock):
+    tool_cache.set("geocode", "goa", [15.3, 74.1], ttl=0)
+    assert tool_cache.get("geocode", "goa") is MISSING
+
+
+def test_negative_hit(tool_cache, clock):
+    calls = []
+
+    @cached("geocode", key=lambda place: place.strip().lower(), is_negative=lambda value: value is None)
+    def lookup(place):
+        calls.append(place)
+        return None
+
+    assert lookup("Atlantis") is None
+    assert lookup(" atlantis ") is None
+    assert calls == ["Atlantis"]
+    stats = tool_cache.stats()["geocode"]
+    assert (stats["misses"], stats["negative_hits"], stats["hits"]) == (1, 1, 0)
+
+    # WHY: Negative answers use negative_ttl (10s), not the namespace TTL (500s)
+    clock.now += 10
+    assert lookup("atlantis") is None
+    assert calls == ["Atlantis", "atlantis"]
+
+
+def test_async_cached_with_decode(tool_cache, clock):
+    calls = []
+
+    @cached("geocode", key=lambda place: place.lower(), decode=tuple)
+    async def lookup(place):
+        calls.append(place)
+        return (15.3, 74.1)
+
+    async def run():
+        return await lookup("Goa"), await lookup("goa")
+
+    assert asyncio.run(run()) == ((15.3, 74.1), (15.3, 74.1))
+    assert calls == ["Goa"]
+    assert tool_cache.stats()["geocode"]["hits"] == 1
+
+
+def test_exceptions_are_not_cached(tool_cache, clock):
+    calls = []
+
+    @cached("weather", key=lambda city: city)
+    def forecast(city):
+        calls.append(city)
+        if len(calls) == 1:
+            raise RuntimeError("API down")
+        return {"temp": 30}
+
+    with pytest.raises(RuntimeError):
+        forecast("goa")
+    assert forecast("goa") == {"temp": 30}
+    assert forecast("goa") == {"temp": 30}
+    assert calls == ["goa", "goa"]
+
+
+# ------------------ EVICTION ------------------ #
+def test_memory_evicts_least_recently_used(clock):
+    backend = MemoryCache(max_entries=2)
+    backend.set("a", 1, 60)
+    backend.set("b", 2, 60)
+    backend.get("a")
+    backend.set("c", 3, 60)
+    assert backend.get("b") is MISSING
+    assert (backend.get("a"), backend.get("c"), backend.evictions) == (1, 3, 1)
+
+
+def test_sqlite_evicts_once_estimate_passes_max_entries(tmp_path, clock):
+    backend = SQLiteCache(str(tmp_path / "cache.db"), max_entries=3)
+    for i in range(5):
+        backend.set(f"k{i}", i, 60 + i)
+    # WHY: The entries closest to expiry go first
+    assert [backend.get(f"k{i}") for i in range(5)] == [MISSING, MISSING, 2, 3, 4]
+    assert backend.evictions == 2
+    assert backend._rows == 3
+
+
+def test_sqlite_eviction_drops_expired_rows_first(tmp_path, clock):
+    backend = SQLiteCache(str(tmp_path / "cache.db"), max_entries=3)
+    backend.set("old", 0, 10)
+    backend.set("a", 1, 60)
+    backend.set("b", 2, 60)
+    clock.now += 10
+    backend.set("c", 3, 60)
+    assert [backend.get(k) for k in ("a", "b", "c")] == [1, 2, 3]
+    assert backend.evictions == 0
+
+
+def test_sqlite_picks_up_rows_from_other_workers(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    worker_a = SQLiteCache(path, max_entries=4)
+    worker_b = SQLiteCache(path, max_entries=4)
+    worker_b.EVICT_EVERY = 3
+    for i in range(4):
+        worker_a.set(f"a{i}", i, 60 + i)
+    # WHY: worker_b's own estimate (2 rows) is under the limit; the periodic
+    # check on its 3rd write sees worker_a's rows too
+    worker_b.set("b0", 0, 100)
+    worker_b.set("b1", 1, 100)
+    assert worker_b.evictions == 0
+    worker_b.set("b2", 2, 100)
+    assert worker_b.evictions == 3
+    assert [worker_b.get(f"a{i}") for i in range(4)] == [MISSING, MISSING, MISSING, 3]
+
+
+def test_sqlite_row_estimate_survives_restart(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    first = SQLiteCache(path, max_entries=10)
+    for i in range(4):
+        first.set(f"k{i}", i, 60)
+    assert SQLiteCache(path, max_entries=10)._rows == 4
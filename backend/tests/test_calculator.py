@@ -0,0 +1,133 @@
+"""Tests for the safe calculator tool (tools/calculator.py)."""
+
+import pytest
+
+from travel_planner.tools.calculator import calculator, evaluate
+
+
+# ------------------ THOUSANDS SEPARATORS ------------------ #
+@pytest.mark.parametrize("expression, expected", [
+    ("2 * (3,500 + 1,200)", 9400),
+    ("₹1,600 + (2 × ₹500)", 2600),
+    ("1,600 + max(1, 2)", 1602),
+    ("1,250,000 / 1,000", 1250),
+])
+def test_thousands_separators_outside_calls(expression, expected):
+    assert evaluate(expression) == expected
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("min(1,200)", 1),
+    ("max(1,600)", 600),
+    ("max(0,500)", 500),
+    ("max(1,600,2)", 600),
+    ("sum(1,600,2,000)", 603),
+    ("round(1234.567,2)", 1234.57),
+    ("round(2,500)", 2),
+    ("max(1, 600)", 600),
+])
+def test_commas_inside_calls_are_arguments(expression, expected):
+    assert evaluate(expression) == expected
+
+
+@pytest.mark.parametrize("expression", ["max(1,600, 2)", "sum(1,600, 2,000)", "sum([1,200, 300])"])
+def test_mixed_commas_in_calls_are_rejected(expression):
+    with pytest.raises(ValueError, match="Ambiguous commas"):
+        evaluate(expression)
+
+
+# ------------------ WHITELIST ------------------ #
+@pytest.mark.parametrize("expression, message", [
+    ("().__class__", "Attribute"),
+    ("(1).real", "Attribute"),
+    ("__import__('os')", "Call"),
+    ("open('f')", "Call"),
+    ("(lambda: 1)()", "Call"),
+    ("lambda: 1", "Lambda"),
+    ("x", "Unknown name 'x'"),
+    ("sum", "Unknown name 'sum'"),
+    ("sum(1, start=2)", "Call"),
+    ("'a' * 3", "Constant"),
+    ("[i for i in (1, 2)]", "ListComp"),
+    ("2 if 1 else 3", "IfExp"),
+    ("1 < 2", "Compare"),
+])
+def test_rejected_syntax(expression, message):
+    with pytest.raises(ValueError, match=message):
+        evaluate(expression)
+
+
+@pytest.mark.parametrize("expression", ["[1, 2] * 3", "[0] * 10**9", "(1, 2)", "1, 600", "sum([[1, 2]])"])
+def test_lists_only_as_call_arguments(expression):
+    with pytest.raises(ValueError, match="Lists are only allowed"):
+        evaluate(expression)
+
+
+def test_overlong_expression_rejected():
+    with pytest.raises(ValueError, match="longer than"):
+        evaluate("1+" * 300 + "1")
+
+
+# ------------------ BOUNDS ------------------ #
+@pytest.mark.parametrize("expression, message", [
+    ("9**9**9", "Exponent .* is too large"),
+    ("2**101", "Exponent 101 is too large"),
+    ("10**100", "Result is too large"),
+    ("(10**50)**50", "Result is too large"),
+    ("10**70 * 10**70", "Result is too large"),
+    ("1e308 * 10", "Result is too large"),
+    ("10.0**100 * 1e300", "Result is too large"),
+    ("(-8)**0.5", "did not produce a number"),
+    ("1 / 0", "Division by zero"),
+    ("5 % 0", "Division by zero"),
+])
+def test_bounds(expression, message):
+    with pytest.raises(ValueError, match=message):
+        evaluate(expression)
+
+
+def test_large_but_bounded_results_are_allowed():
+    assert evaluate("2**100") == 2 ** 100
+    assert evaluate("10**70 * 10") == 10 ** 71
+
+
+# ------------------ NORMALIZATION ------------------ #
+@pytest.mark.parametrize("expression, expected", [
+    ("18% of 2000", 360),
+    ("2000 * 18%", 360),
+    ("200 * 18% + 5", 41),
+    ("10 % 3", 1),
+    ("10 % (4)", 2),
+    ("₹200 + $300 + €50 + £5", 555),
+    ("Rs. 450 + INR 50 + USD 10 + EUR 5", 515),
+    ("6 × 7 ÷ 2 − 1", 20),
+    ("2^3", 8),
+])
+def test_normalization(expression, expected):
+    assert evaluate(expression) == expected
+
+
+# ------------------ TOOL ------------------ #
+def test_single_expression_returns_bare_number():
+    assert calculator.invoke({"expression": "₹1,600 + ₹400"}) == "2000"
+    assert calculator.invoke({"expression": "10 / 4"}) == "2.5"
+    assert calculator.invoke({"expression": "x"}).startswith("Error calculating: Unknown name")
+
+
+def test_batch_expressions():
+    result = calculator.invoke({"expressions": ["1 + 1", "bad x", "18% of 2000", "10**100"]})
+    assert result.splitlines() == [
+        "1 + 1 = 2",
+        "bad x = Error calculating: Invalid expression: invalid syntax",
+        "18% of 2000 = 360",
+        "10**100 = Error calculating: Result is too large",
+    ]
+
+
+def test_expression_and_batch_are_combined():
+    result = calculator.invoke({"expression": "2 * 3", "expressions": ["4 + 4"]})
+    assert result.splitlines() == ["2 * 3 = 6", "4 + 4 = 8"]
+
+
+def test_no_expression():
+    assert calculator.invoke({}) == "Error calculating: no expression given"
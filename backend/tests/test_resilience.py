@@ -0,0 +1,251 @@
+"""Tests for the circuit breaker, token bucket (utils/resilience.py) and retry_on_error (utils/decorators.py)."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from travel_planner.utils import decorators, http_client, resilience
+from travel_planner.utils.decorators import retry_on_error
+from travel_planner.utils.resilience import (
+    DEFAULT_PROVIDER_SETTINGS,
+    CircuitBreaker,
+    CircuitOpenError,
+    ProviderGuard,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when a test advances it."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def _status_error(status_code: int, headers=None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.example.com/v1")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status_code}", request=request, response=response)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("api.example.com", failure_threshold=3, recovery_timeout=30.0, clock=clock)
+
+
+# ------------------ CIRCUIT BREAKER ------------------ #
+def test_closed_open_half_open_closed(breaker, clock):
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert (breaker.state, breaker.opened_count) == (CircuitBreaker.OPEN, 1)
+
+    clock.advance(29.9)
+    with pytest.raises(CircuitOpenError, match="circuit open"):
+        breaker.before_call()
+
+    clock.advance(0.1)
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # WHY: Only one trial call goes out while half-open
+    with pytest.raises(CircuitOpenError, match="half-open"):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert (breaker.state, breaker.failures, breaker.rejected) == (CircuitBreaker.CLOSED, 0, 2)
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_for_a_full_timeout(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(30)
+    breaker.before_call()
+    breaker.record_failure()
+    assert (breaker.state, breaker.opened_count) == (CircuitBreaker.OPEN, 2)
+
+    clock.advance(29)
+    with pytest.raises(CircuitOpenError, match="circuit open"):
+        breaker.before_call()
+    clock.advance(1)
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_success_resets_consecutive_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_releases_half_open_slot(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(30)
+    breaker.before_call()
+    breaker.cancel_trial()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError, match="half-open"):
+        breaker.before_call()
+
+
+def test_cancelled_request_releases_half_open_slot(monkeypatch, clock):
+    settings = {**DEFAULT_PROVIDER_SETTINGS, "failure_threshold": 1, "recovery_timeout": 30.0}
+    guard = ProviderGuard("api.example.com", settings)
+    guard.breaker = CircuitBreaker("api.example.com", 1, 30.0, clock=clock)
+    # WHY: An empty bucket refilling at 1 token/min parks the trial call in aacquire()
+    guard.limiter = TokenBucket(rate_per_sec=1 / 60, burst=1, clock=clock)
+    guard.limiter.tokens = 0.0
+    monkeypatch.setitem(resilience._guards, "api.example.com", guard)
+
+    guard.breaker.record_failure()
+    clock.advance(30)
+
+    async def run():
+        trial = asyncio.create_task(http_client.ahttp_get("https://api.example.com/v1"))
+        await asyncio.sleep(0)
+        assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(run())
+    assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+    guard.breaker.before_call()
+
+
+def test_only_transient_failures_count():
+    guard = ProviderGuard("api.example.com", {**DEFAULT_PROVIDER_SETTINGS, "failure_threshold": 1})
+    guard.record(_status_error(404))
+    guard.record(CircuitOpenError("open"))
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+    guard.record(_status_error(503))
+    assert guard.breaker.state == CircuitBreaker.OPEN
+
+
+# ------------------ TOKEN BUCKET ------------------ #
+def test_token_bucket_burst_then_rate(clock):
+    bucket = TokenBucket(rate_per_sec=2, burst=3, clock=clock)
+    assert [bucket._reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket._reserve() == 0.5
+    # WHY: Each waiter reserves its own slot, so the next one queues behind it
+    assert bucket._reserve() == 1.0
+    assert (bucket.throttled, bucket.waited_s) == (2, 1.5)
+
+    clock.advance(10)
+    assert bucket.tokens == -2
+    assert [bucket._reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_token_bucket_async_waits_without_blocking(monkeypatch, clock):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(rate_per_sec=4, burst=1, clock=clock)
+
+    async def run():
+        await bucket.aacquire()
+        await bucket.aacquire()
+
+    asyncio.run(run())
+    assert slept == [0.25]
+
+
+# ------------------ RETRY ------------------ #
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(decorators.time, "sleep", recorded.append)
+    return recorded
+
+
+def _flaky(errors):
+    """A function that raises each error in turn, then returns "ok"."""
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    return call, calls
+
+
+def test_retry_honors_retry_after(sleeps):
+    func, calls = _flaky([_status_error(429, {"Retry-After": "7"})])
+    assert retry_on_error(max_attempts=2, delay=1.0)(func)() == "ok"
+    assert (sleeps, len(calls)) == ([7.0], 2)
+
+
+def test_retry_after_is_capped_by_max_delay(sleeps):
+    func, _ = _flaky([_status_error(503, {"Retry-After": "120"})])
+    retry_on_error(max_attempts=2, delay=1.0, max_delay=10.0)(func)()
+    assert sleeps == [10.0]
+
+
+def test_retry_after_never_shortens_backoff(sleeps):
+    func, _ = _flaky([_status_error(503, {"Retry-After": "1"})] * 2)
+    retry_on_error(max_attempts=3, delay=2.0, backoff=2.0, jitter=False)(func)()
+    assert sleeps == [2.0, 4.0]
+
+
+def test_retry_after_in_wrapped_error(sleeps):
+    # WHY: Tool helpers re-raise httpx errors as ValueError(...) from e
+    wrapped = ValueError("Weather lookup failed")
+    wrapped.__cause__ = _status_error(429, {"Retry-After": "3"})
+    func, _ = _flaky([wrapped])
+    assert retry_on_error(max_attempts=2)(func)() == "ok"
+    assert sleeps == [3.0]
+
+
+def test_permanent_failures_and_open_circuits_are_not_retried(sleeps):
+    for error in (_status_error(404), CircuitOpenError("open"), KeyError("x")):
+        func, calls = _flaky([error])
+        with pytest.raises(type(error)):
+            retry_on_error(max_attempts=3)(func)()
+        assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_async_retry_honors_retry_after(monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(decorators.asyncio, "sleep", fake_sleep)
+    attempts = []
+
+    @retry_on_error(max_attempts=3, delay=1.0)
+    async def fetch():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _status_error(429, {"Retry-After": "5"})
+        return "ok"
+
+    assert asyncio.run(fetch()) == "ok"
+    assert slept == [5.0, 5.0]
@@ -1,27 +1,80 @@
 from travel_planner.utils.model_loader import ModelLoader
 from travel_planner.prompts.prompt_templates import SYSTEM_PROMPT
-from langgraph.graph import StateGraph, MessagesState, END, START
+from travel_planner.agent.context_manager import AgentState, ContextManager
+from langgraph.graph import StateGraph, END, START
 from langgraph.prebuilt import ToolNode, tools_condition
 from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableLambda
 from travel_planner.tools.weather import get_weather
 from travel_planner.tools.iternaryplaces import search_attractions, search_restaurants, search_hotels, search_activities
+from travel_planner.tools.destination_bundle import get_destination_bundle
 from travel_planner.tools.calculator import calculator
 from travel_planner.tools.formatting import format_response
-from travel_planner.tools.budget_validator import validate_budget
-from langgraph.checkpoint.sqlite import SqliteSaver
-import sqlite3
-import os
+from travel_planner.tools.budget_engine import plan_budget
+from travel_planner.utils.checkpoint_store import create_checkpointer, close_checkpointer
+from travel_planner.utils.metrics import NODE_SECONDS, atime_tool_call, record_llm_usage, time_tool_call
+from travel_planner.utils.tracing import span
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from typing import Optional
+import time
+
+
+def _tool_call(request, execute):
+    """wrap_tool_call hook: a span and a latency sample per tool call"""
+    name = request.tool_call["name"]
+    with span(f"tool:{name}", tool=name):
+        return time_tool_call(request, execute)
+
+
+async def _atool_call(request, execute):
+    """awrap_tool_call hook: async version of _tool_call"""
+    name = request.tool_call["name"]
+    with span(f"tool:{name}", tool=name):
+        return await atime_tool_call(request, execute)
+
+
+class TimedToolNode(ToolNode):
+    """
+    ToolNode that records the node's latency and span; per-tool latency
+    and spans come from the wrap_tool_call hooks above.
+    
+    WHY: Tools run in parallel, so the node time is the slowest call plus overhead
+    """
+    
+    def __init__(self, tools):
+        super().__init__(tools=tools, wrap_tool_call=_tool_call, awrap_tool_call=_atool_call)
+    
+    def _func(self, input, config, runtime):
+        with NODE_SECONDS.time("tools"), span("tools"):
+            return super()._func(input, config, runtime)
+    
+    async def _afunc(self, input, config, runtime):
+        with NODE_SECONDS.time("tools"), span("tools"):
+            return await super()._afunc(input, config, runtime)
+
 
 class GraphBuilder():
-    def __init__(self, model_provider: str = "groq"):
+    def __init__(self, model_provider: str = "groq", use_async: bool = False, db_path: Optional[str] = None):
+        """
+        Args:
+            model_provider: LLM provider name (see ModelLoader)
+            use_async: Use AsyncSqliteSaver so the graph can run with ainvoke/astream.
+                Must be constructed inside a running event loop (e.g. FastAPI startup).
+            db_path: Checkpoint database path (defaults to checkpoints.path in config.yaml)
+        """
+        self.use_async = use_async
+        self.db_path = db_path
+        self.model_provider = model_provider
         self.model_loader = ModelLoader(provider=model_provider)
         self.llm = self.model_loader.load_llm()
         
         # WHY: All available tools for the agent
         # Calculator: for budget calculations and cost summation
         # Formatter: for creating beautiful, emoji-rich responses
-        # Budget Validator: CRITICAL for enforcing budget constraints
+        # Budget Engine: CRITICAL - totals, validates and fits the plan to the budget in one call
+        # Destination Bundle: weather + all place categories in one round-trip
         self.tools = [
+            get_destination_bundle,
             get_weather,
             search_attractions,
             search_restaurants,
@@ -29,7 +82,7 @@ class GraphBuilder():
             search_activities,
             calculator,           # Budget calculations
             format_response,      # Beautiful output formatting
-            validate_budget       # Budget enforcement - MUST use when user gives budget!
+            plan_budget           # Budget enforcement - MUST use when user gives budget!
         ]
         
         # WHY: LangGraph's ToolNode automatically executes tools in parallel when possible
@@ -45,34 +98,75 @@ class GraphBuilder():
         self.graph = None
         
         self.system_prompt = SystemMessage(content=SYSTEM_PROMPT)
+        
+        # WHY: Trim/compact history before each LLM call so long sessions
+        # don't grow prompt size (and latency) linearly
+        self.context_manager = ContextManager(self.model_loader.config.get("context"))
     
     def _setup_memory(self):
-        """Setup persistent conversation memory using SqliteSaver"""
-        # Create data directory if it doesn't exist
-        # WHY: Store checkpoints in organized location
-        data_dir = os.path.join(os.path.dirname(__file__), '../../data')
-        os.makedirs(data_dir, exist_ok=True)
-        
-        # Initialize SqliteSaver with database file
-        # WHY: Persistent storage allows conversations to survive restarts
-        db_path = os.path.join(data_dir, 'checkpoints.db')
-        
-        # Create a connection and initialize the saver
-        # This is the correct way to use SqliteSaver
-        conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.memory = SqliteSaver(conn)
+        """Setup persistent conversation memory (tuned SQLite checkpointer)"""
+        # WHY: WAL, synchronous=NORMAL, busy timeout and a connection per thread
+        # (see utils/checkpoint_store) keep checkpoint writes from serializing
+        # concurrent turns. Settings come from the "checkpoints" section of config.yaml.
+        self.memory = create_checkpointer(use_async=self.use_async, db_path=self.db_path)
     
-    def agent_function(self, state: MessagesState):
+    def close(self):
+        """Close the sync checkpoint connections"""
+        close_checkpointer(self.memory)
+    
+    async def aclose(self):
+        """Close the checkpoint connection(s) (call on server shutdown)"""
+        if isinstance(self.memory, AsyncSqliteSaver):
+            await self.memory.conn.close()
+        else:
+            self.close()
+    
+    def _build_input(self, state: AgentState, context, update):
+        """System prompt (+ rolling summary) followed by the selected messages"""
+        summary = update.get("summary", state.get("summary"))
+        if not summary:
+            return [self.system_prompt] + context
+        # WHY: Single system message - some providers reject a second one mid-list
+        system = SystemMessage(content=f"{SYSTEM_PROMPT}\n\nSummary of the earlier conversation:\n{summary}")
+        return [system] + context
+    
+    def agent_function(self, state: AgentState):
         """Main agent function"""
-        user_question = state["messages"]
-        input_question = [self.system_prompt] + user_question
-        response = self.llm_with_tools.invoke(input_question)
-        return {"messages": [response]}
+        with NODE_SECONDS.time("agent"), span("agent"):
+            context, start = self.context_manager.select(state["messages"])
+            update = self.context_manager.summarize(self.llm, state, start)
+            input_question = self._build_input(state, context, update)
+            started = time.perf_counter()
+            with span("llm.call", provider=self.model_provider) as current:
+                response = self.llm_with_tools.invoke(input_question)
+                if current and response.usage_metadata:
+                    current.set(input_tokens=response.usage_metadata.get("input_tokens", 0),
+                                output_tokens=response.usage_metadata.get("output_tokens", 0))
+            record_llm_usage(self.model_provider, response, time.perf_counter() - started)
+            return {"messages": [response], **update}
+    
+    async def aagent_function(self, state: AgentState):
+        """Async agent function used by graph.ainvoke / graph.astream"""
+        with NODE_SECONDS.time("agent"), span("agent"):
+            context, start = self.context_manager.select(state["messages"])
+            update = await self.context_manager.asummarize(self.llm, state, start)
+            input_question = self._build_input(state, context, update)
+            started = time.perf_counter()
+            with span("llm.call", provider=self.model_provider) as current:
+                response = await self.llm_with_tools.ainvoke(input_question)
+                if current and response.usage_metadata:
+                    current.set(input_tokens=response.usage_metadata.get("input_tokens", 0),
+                                output_tokens=response.usage_metadata.get("output_tokens", 0))
+            record_llm_usage(self.model_provider, response, time.perf_counter() - started)
+            return {"messages": [response], **update}
 
     def build_graph(self):
-        graph_builder = StateGraph(MessagesState)
-        graph_builder.add_node("agent", self.agent_function)
-        graph_builder.add_node("tools", ToolNode(tools=self.tools))
+        graph_builder = StateGraph(AgentState)
+        # WHY: Sync and async implementations let the same graph serve
+        # graph.invoke (CLI) and graph.ainvoke/astream (API) without blocking
+        graph_builder.add_node("agent", RunnableLambda(self.agent_function, afunc=self.aagent_function))
+        # WHY: Records node and per-tool latency for GET /metrics, plus their spans
+        graph_builder.add_node("tools", TimedToolNode(tools=self.tools))
         graph_builder.add_edge(START, "agent")
         graph_builder.add_conditional_edges("agent", tools_condition)
         graph_builder.add_edge("tools", "agent")
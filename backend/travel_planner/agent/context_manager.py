@@ -0,0 +1,148 @@
+"""
+Conversation Context Management
+
+WHY: The agent used to send [system_prompt] + the entire checkpointed history
+on every turn, including every verbose place-search tool output, so prompt size
+and latency grew linearly with the conversation. Before each LLM call we now:
+
+1. Compact old tool outputs (from earlier user turns) into short digests
+2. Trim the history to a token budget, always keeping the current user turn
+3. Optionally fold the dropped messages into a rolling summary kept in state
+
+The checkpoint still stores the full history; only what is sent to the LLM shrinks.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from typing_extensions import NotRequired
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+    trim_messages,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.graph import MessagesState
+
+
+DEFAULT_CONTEXT_SETTINGS = {
+    "max_tokens": 12000,            # Budget for history + current turn (excl. system prompt)
+    "keep_recent_tool_turns": 1,    # Tool outputs of the last N user turns stay verbatim
+    "tool_digest_chars": 300,       # Length of compacted tool outputs
+    "summarize": False,             # Fold trimmed messages into a rolling summary (extra LLM call)
+    "summary_max_words": 150,
+}
+
+# WHY: Tag on the summary LLM call so token streaming can skip its output
+SUMMARY_TAG = "context_summary"
+
+SUMMARY_INSTRUCTIONS = """You maintain a running summary of a travel-planning conversation.
+Merge the existing summary with the new messages. Keep destinations, dates, trip length,
+budgets and currency, traveller preferences, and any hotels/restaurants/prices already chosen.
+Drop pleasantries and raw search listings. Reply with the summary only, at most {max_words} words."""
+
+
+class AgentState(MessagesState):
+    """Graph state: messages plus an optional rolling summary of trimmed history."""
+    summary: NotRequired[str]
+    # Number of leading messages already folded into `summary`
+    summary_upto: NotRequired[int]
+
+
+def _text(content) -> str:
+    """Flatten message content (Gemini returns a list of parts) to text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            item.get("text", "") if isinstance(item, dict) else str(item)
+            for item in content
+        )
+    return str(content)
+
+
+class ContextManager:
+    """Selects the messages sent to the LLM for one agent turn."""
+
+    def __init__(self, settings: Optional[Dict] = None):
+        self.settings = {**DEFAULT_CONTEXT_SETTINGS, **(settings or {})}
+
+    # ------------------ COMPACTION ------------------ #
+    def _digest(self, message: ToolMessage) -> ToolMessage:
+        text = _text(message.content)
+        limit = self.settings["tool_digest_chars"]
+        if len(text) <= limit:
+            return message
+        digest = f"{text[:limit]} …[compacted, {len(text)} chars]"
+        # WHY: Keep tool_call_id so the AI tool call still has its matching result
+        return message.model_copy(update={"content": digest})
+
+    def compact(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Replace tool outputs older than the last N user turns with digests."""
+        human_indexes = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+        keep = self.settings["keep_recent_tool_turns"]
+        if len(human_indexes) <= keep:
+            return list(messages)
+        boundary = human_indexes[-keep] if keep > 0 else len(messages)
+        return [
+            self._digest(m) if i < boundary and isinstance(m, ToolMessage) else m
+            for i, m in enumerate(messages)
+        ]
+
+    # ------------------ TRIMMING ------------------ #
+    def select(self, messages: List[BaseMessage]) -> Tuple[List[BaseMessage], int]:
+        """
+        Return (messages to send, index in `messages` where they start).
+
+        WHY: The current user turn (last human message onwards, including this
+        turn's tool calls) is always kept; older history fills what is left of
+        the budget, newest first, starting on a user message so tool calls and
+        their results are never split.
+        """
+        compacted = self.compact(messages)
+        current_start = max(
+            (i for i, m in enumerate(compacted) if isinstance(m, HumanMessage)),
+            default=0,
+        )
+        history, current = compacted[:current_start], compacted[current_start:]
+
+        budget = self.settings["max_tokens"] - count_tokens_approximately(current)
+        kept = []
+        if history and budget > 0:
+            kept = trim_messages(
+                history,
+                max_tokens=budget,
+                token_counter=count_tokens_approximately,
+                strategy="last",
+                start_on="human",
+            )
+        return kept + current, current_start - len(kept)
+
+    # ------------------ SUMMARY ------------------ #
+    def _summary_request(self, state: AgentState, start: int) -> Optional[List[BaseMessage]]:
+        """Prompt that folds newly trimmed messages into the summary, or None."""
+        upto = state.get("summary_upto", 0)
+        if not self.settings["summarize"] or start <= upto:
+            return None
+        dropped = self.compact(state["messages"])[upto:start]
+        transcript = "\n".join(f"{m.type}: {_text(m.content)}" for m in dropped)
+        return [
+            SystemMessage(content=SUMMARY_INSTRUCTIONS.format(max_words=self.settings["summary_max_words"])),
+            HumanMessage(content=f"Existing summary:\n{state.get('summary') or '(none)'}\n\nNew messages:\n{transcript}"),
+        ]
+
+    def summarize(self, llm, state: AgentState, start: int) -> Dict:
+        """State update with the refreshed summary ({} if nothing new was trimmed)."""
+        request = self._summary_request(state, start)
+        if request is None:
+            return {}
+        response = llm.invoke(request, config={"tags": [SUMMARY_TAG]})
+        return {"summary": _text(response.content), "summary_upto": start}
+
+    async def asummarize(self, llm, state: AgentState, start: int) -> Dict:
+        """Async version of summarize."""
+        request = self._summary_request(state, start)
+        if request is None:
+            return {}
+        response = await llm.ainvoke(request, config={"tags": [SUMMARY_TAG]})
+        return {"summary": _text(response.content), "summary_upto": start}
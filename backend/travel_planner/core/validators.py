@@ -4,12 +4,203 @@ Input and Output Validation Module
 Implements production-grade validation for:
 - User input sanitization (prevent prompt injection)
 - Agent output quality checks (prevent hallucination artifacts)
+
+WHY: Each check used to loop over its pattern strings and call re.search
+once per pattern, so a multi-kilobyte response was scanned six times per
+turn, mostly by slow case-insensitive searches. Rules are now compiled once
+with the literal text each one requires; a scan lowercases the text once
+and runs a rule's regex only if that literal occurs (see CompiledRules).
+Rule sets are plain data (built in below, extended or replaced from
+config.yaml), and StreamingOutputValidator checks a response chunk by chunk
+as it streams.
+
+Settings live under "validation" in config.yaml.
 """
 
 import re
-from typing import Dict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+from travel_planner.utils.config_loader import load_config
+
+
+# WHY: Built-in rule sets; config.yaml can add sets, or replace/disable (null) one by name
+DEFAULT_RULE_SETS = {
+    "input": {
+        # WHY: Attackers try to override system prompts with these patterns
+        "injection": {
+            "message": "Invalid query: contains suspicious patterns",
+            "patterns": [
+                r"ignore\s+(previous|above|all)\s+instructions",
+                r"disregard\s+(previous|above|all)",
+                r"forget\s+(previous|above|everything)",
+                r"system\s*:\s*you\s+are",
+                r"<\s*system\s*>",
+                r"print\s+your\s+(instructions|prompt)",
+            ],
+        },
+    },
+    "output": {
+        # WHY: LLMs sometimes generate templates with placeholders instead of real content
+        "placeholders": {
+            "issue": "Contains placeholder pattern: {pattern}",
+            "patterns": [
+                r"\[insert\s+\w+\]",
+                r"\[your\s+\w+\]",
+                r"\{\{\s*\w+\s*\}\}",
+                r"TODO:",
+                r"PLACEHOLDER",
+            ],
+        },
+        # WHY: Sometimes LLMs leak internal formatting or function call syntax
+        "artifacts": {
+            "issue": "Contains XML/code artifacts",
+            "patterns": [r"<(function|tool|system|assistant|user)[\s>]"],
+        },
+    },
+}
+
+DEFAULT_VALIDATION_SETTINGS = {
+    "min_query_chars": 3,
+    "max_query_chars": 2000,
+    "min_response_chars": 10,
+    "stream_overlap": 128,   # Chars re-scanned across batch boundaries (longest match found across one)
+    "stream_scan_chars": 512,  # Streamed text is scanned once this much has arrived
+    "input": {},             # Extra/overriding input rule sets
+    "output": {},            # Extra/overriding output rule sets
+}
+
+# WHY: re.IGNORECASE matches these to ASCII letters, str.lower() doesn't;
+# without them "ignore previous inſtructions" would slip past the prefilter
+_CASE_ALIASES = {"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"}
+
+_settings: Optional[Dict] = None
+_input_rules: Optional["CompiledRules"] = None
+_output_rules: Optional["CompiledRules"] = None
+
+
+def get_validation_settings() -> Dict:
+    """Return validation settings from config.yaml merged over the defaults."""
+    global _settings
+    if _settings is None:
+        _settings = {**DEFAULT_VALIDATION_SETTINGS, **(load_config().get("validation") or {})}
+    return _settings
+
+
+# ------------------ RULE ENGINE ------------------ #
+def required_literal(pattern: str) -> Optional[str]:
+    """
+    Longest run of plain characters every match of `pattern` must contain
+    (lowercased), or None if there is none.
+
+    WHY: `"todo:" in text.lower()` runs at memchr speed, while a
+    case-insensitive regex search steps through the text a character at a time
+    """
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error:
+        return None
+    best, run = "", []
+    # WHY: Only top-level literals are required; anything inside a group or repeat may be skipped
+    for op, value in list(parsed) + [(None, None)]:
+        if op is sre_parse.LITERAL and value < 128:
+            run.append(chr(value))
+            continue
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+    return best.lower() or None
+
+
+def _fold(text: str) -> str:
+    """Lowercase text so required literals can be found with `in`."""
+    if not text.isascii():
+        for alias, letter in _CASE_ALIASES.items():
+            if alias in text:
+                text = text.replace(alias, letter)
+    return text.lower()
+
+
+class Rule:
+    """One pattern of a rule set and the issue text it produces."""
+    
+    __slots__ = ("rule_set", "pattern", "issue", "regex", "literal")
 
+    def __init__(self, rule_set: str, pattern: str, issue: str):
+        self.rule_set = rule_set
+        self.pattern = pattern
+        self.issue = issue
+        self.regex = re.compile(pattern, re.IGNORECASE)
+        self.literal = required_literal(pattern)
 
+
+class CompiledRules:
+    """
+    The precompiled rules of one check.
+
+    Scanning lowercases the text once, skips every rule whose required
+    literal is absent (a C-speed substring test), and runs the full regex
+    only for the rest. On normal travel answers that leaves almost no regex
+    work; a single combined alternation was slower with Python's re, which
+    tries every branch at every position.
+    """
+
+    def __init__(self, rule_sets: Dict[str, Optional[Dict]]):
+        self.rules: List[Rule] = []
+        for name, rule_set in rule_sets.items():
+            if not rule_set:
+                continue
+            issue = rule_set.get("issue") or rule_set.get("message") or f"Matched rule set {name}"
+            for pattern in rule_set.get("patterns") or []:
+                self.rules.append(Rule(name, pattern, issue.format(pattern=pattern)))
+
+    def _candidates(self, text: str) -> Iterator[Tuple[int, Rule]]:
+        lowered = _fold(text)
+        for index, rule in enumerate(self.rules):
+            if rule.literal is None or rule.literal in lowered:
+                yield index, rule
+
+    def first(self, text: str) -> Optional[Rule]:
+        """The first rule (in definition order) that matches, or None."""
+        for _, rule in self._candidates(text):
+            if rule.regex.search(text):
+                return rule
+        return None
+
+    def matches(self, text: str) -> set:
+        """Indexes of all rules that match text."""
+        return {index for index, rule in self._candidates(text) if rule.regex.search(text)}
+
+    def issues(self, matched: set) -> List[str]:
+        """Issue texts for the matched rule indexes, in rule order and deduplicated."""
+        return list(dict.fromkeys(self.rules[i].issue for i in sorted(matched)))
+
+
+def _rule_sets(kind: str) -> Dict[str, Optional[Dict]]:
+    return {**DEFAULT_RULE_SETS[kind], **(get_validation_settings().get(kind) or {})}
+
+
+def get_input_rules() -> CompiledRules:
+    """Return the compiled input rules (built once from config)."""
+    global _input_rules
+    if _input_rules is None:
+        _input_rules = CompiledRules(_rule_sets("input"))
+    return _input_rules
+
+
+def get_output_rules() -> CompiledRules:
+    """Return the compiled output rules (built once from config)."""
+    global _output_rules
+    if _output_rules is None:
+        _output_rules = CompiledRules(_rule_sets("output"))
+    return _output_rules
+
+
+# ------------------ VALIDATORS ------------------ #
 def validate_user_input(query: str) -> Dict[str, any]:
     """
     Validate user input before processing by the agent.
@@ -27,39 +218,50 @@ def validate_user_input(query: str) -> Dict[str, any]:
     if not query or not isinstance(query, str):
         return {"valid": False, "error_message": "Query must be a non-empty string"}
     
+    cfg = get_validation_settings()
+    
     # Strip whitespace for length check
     query = query.strip()
     
-    # Check length constraints (3-2000 chars)
+    # Check length constraints (3-2000 chars by default)
     # WHY: Too short = likely not meaningful, too long = potential abuse
-    if len(query) < 3:
-        return {"valid": False, "error_message": "Query too short (minimum 3 characters)"}
-    
-    if len(query) > 2000:
-        return {"valid": False, "error_message": "Query too long (maximum 2000 characters)"}
-    
-    # Check for prompt injection patterns
-    # WHY: Attackers try to override system prompts with these patterns
-    injection_patterns = [
-        r"ignore\s+(previous|above|all)\s+instructions",
-        r"disregard\s+(previous|above|all)",
-        r"forget\s+(previous|above|everything)",
-        r"system\s*:\s*you\s+are",
-        r"<\s*system\s*>",
-        r"print\s+your\s+(instructions|prompt)",
-    ]
-    
-    for pattern in injection_patterns:
-        if re.search(pattern, query, re.IGNORECASE):
-            return {
-                "valid": False, 
-                "error_message": "Invalid query: contains suspicious patterns"
-            }
+    if len(query) < cfg["min_query_chars"]:
+        return {"valid": False, "error_message": f"Query too short (minimum {cfg['min_query_chars']} characters)"}
+    
+    if len(query) > cfg["max_query_chars"]:
+        return {"valid": False, "error_message": f"Query too long (maximum {cfg['max_query_chars']} characters)"}
+    
+    # Check for prompt injection (and any configured) patterns in one pass
+    rule = get_input_rules().first(query)
+    if rule is not None:
+        return {"valid": False, "error_message": rule.issue}
     
     # All checks passed
     return {"valid": True, "error_message": ""}
 
 
+def _output_result(length: int, matched: set) -> Dict[str, any]:
+    issues = []
+    
+    # Check minimum response length
+    # WHY: Very short responses are likely errors or incomplete
+    min_chars = get_validation_settings()["min_response_chars"]
+    if length < min_chars:
+        issues.append(f"Response too short (less than {min_chars} characters)")
+    issues.extend(get_output_rules().issues(matched))
+    
+    # Calculate quality score (0-100)
+    score = 100
+    score -= len(issues) * 20  # Deduct 20 points per issue
+    score = max(0, min(100, score))  # Clamp to 0-100
+    
+    return {
+        "valid": len(issues) == 0,
+        "issues": issues,
+        "score": score
+    }
+
+
 def validate_agent_output(response: str, query: str = "") -> Dict[str, any]:
     """
     Validate agent's response before returning to user.
@@ -74,45 +276,73 @@ def validate_agent_output(response: str, query: str = "") -> Dict[str, any]:
     Returns:
         {"valid": bool, "issues": list, "score": int}
     """
-    issues = []
-    
     # Check if response exists
     if not response or not isinstance(response, str):
         return {"valid": False, "issues": ["Empty or invalid response"], "score": 0}
     
     response = response.strip()
+    return _output_result(len(response), get_output_rules().matches(response))
+
+
+class StreamingOutputValidator:
+    """
+    Validates a response incrementally as its chunks arrive.
     
-    # Check minimum response length
-    # WHY: Very short responses are likely errors or incomplete
-    if len(response) < 10:
-        issues.append("Response too short (less than 10 characters)")
-    
-    # Check for common placeholder patterns
-    # WHY: LLMs sometimes generate templates with placeholders instead of real content
-    placeholder_patterns = [
-        r"\[insert\s+\w+\]",
-        r"\[your\s+\w+\]",
-        r"\{\{\s*\w+\s*\}\}",
-        r"TODO:",
-        r"PLACEHOLDER",
-    ]
-    
-    for pattern in placeholder_patterns:
-        if re.search(pattern, response, re.IGNORECASE):
-            issues.append(f"Contains placeholder pattern: {pattern}")
-    
-    # Check for XML/HTML tags that shouldn't be in natural language
-    # WHY: Sometimes LLMs leak internal formatting or function call syntax
-    if re.search(r"<(function|tool|system|assistant|user)[\s>]", response, re.IGNORECASE):
-        issues.append("Contains XML/code artifacts")
-    
-    # Calculate quality score (0-100)
-    score = 100
-    score -= len(issues) * 20  # Deduct 20 points per issue
-    score = max(0, min(100, score))  # Clamp to 0-100
+    WHY: With token streaming the verdict is ready when the last token is,
+    without a final scan of the whole response. Chunks are scanned in
+    batches of `stream_scan_chars`, each together with the last
+    `stream_overlap` characters before it, so a match split across batches
+    is still found (up to that length).
     
-    return {
-        "valid": len(issues) == 0,
-        "issues": issues,
-        "score": score
-    }
+    Usage:
+        validator = StreamingOutputValidator()
+        for chunk in chunks:
+            validator.feed(chunk)
+        result = validator.result()   # same shape as validate_agent_output
+    """
+
+    def __init__(self, overlap: Optional[int] = None, scan_chars: Optional[int] = None):
+        cfg = get_validation_settings()
+        self.overlap = overlap if overlap is not None else cfg["stream_overlap"]
+        self.scan_chars = scan_chars if scan_chars is not None else cfg["stream_scan_chars"]
+        self.reset()
+
+    def reset(self):
+        """Forget everything fed so far (e.g. when a new message starts)."""
+        self._tail = ""
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self.fed = False       # Any (even whitespace-only) text seen
+        self._length = 0       # Chars after leading whitespace
+        self._trailing = 0     # Whitespace chars at the current end
+        self._matched: set = set()
+
+    def feed(self, chunk: str):
+        if not chunk:
+            return
+        self.fed = True
+        if not self._length:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+        self._length += len(chunk)
+        stripped = chunk.rstrip()
+        self._trailing = len(chunk) - len(stripped) + (self._trailing if not stripped else 0)
+        
+        self._pending.append(chunk)
+        self._pending_chars += len(chunk)
+        if self._pending_chars >= self.scan_chars:
+            self._scan()
+
+    def _scan(self):
+        window = self._tail + "".join(self._pending)
+        self._matched |= get_output_rules().matches(window)
+        self._tail = window[-self.overlap:] if self.overlap else ""
+        self._pending, self._pending_chars = [], 0
+
+    def result(self) -> Dict[str, any]:
+        if not self.fed:
+            return {"valid": False, "issues": ["Empty or invalid response"], "score": 0}
+        if self._pending:
+            self._scan()
+        return _output_result(self._length - self._trailing, self._matched)
@@ -1,4 +1,5 @@
 from .weather import get_weather
 from .iternaryplaces import search_attractions,search_restaurants,search_hotels,search_activities
+from .destination_bundle import get_destination_bundle
 
-TOOLS = [get_weather,search_attractions,search_restaurants,search_hotels,search_activities]
\ No newline at end of file
+TOOLS = [get_destination_bundle,get_weather,search_attractions,search_restaurants,search_hotels,search_activities]
\ No newline at end of file
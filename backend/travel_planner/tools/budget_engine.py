@@ -0,0 +1,145 @@
+"""
+Deterministic Budget Engine
+
+WHY: The budget workflow used to push the model through calculator ->
+validate_budget -> adjust -> recalculate cycles, each a full LLM round-trip
+(4-8 per budget-constrained request). Here the model submits a line-itemized
+plan once, with cheaper alternatives it knows of for each item, and the engine
+sums it, checks it against the limit, applies the cheapest set of swaps/drops
+needed to fit, and returns the finished breakdown.
+
+Note: Geoapify results carry no prices, so swap candidates come from the
+alternatives the model submits (plus dropping items marked optional).
+"""
+
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field
+from langchain_core.tools import tool
+
+
+# --------------------- SCHEMAS --------------------- #
+class BudgetAlternative(BaseModel):
+    name: str = Field(..., description="Cheaper option, e.g. a budget hotel")
+    unit_cost: float = Field(..., description="Cost per unit of this option")
+
+
+class BudgetItem(BaseModel):
+    category: str = Field(..., description="hotel, food, activity, transport or other")
+    name: str = Field(..., description="What is being paid for")
+    unit_cost: float = Field(..., description="Cost per unit (per night, meal, ticket...)")
+    quantity: float = Field(1, description="Number of units, e.g. nights or meals")
+    optional: bool = Field(False, description="True if it can be dropped to fit the budget (e.g. paid activities)")
+    alternatives: List[BudgetAlternative] = Field(
+        default_factory=list, description="Cheaper options that could replace this item"
+    )
+
+    @property
+    def subtotal(self) -> float:
+        return self.unit_cost * self.quantity
+
+
+class BudgetPlanInput(BaseModel):
+    items: List[BudgetItem] = Field(..., description="Every cost line of the trip plan")
+    budget_limit: float = Field(..., description="The user's maximum total budget")
+    currency: str = Field("₹", description="Currency symbol for the breakdown")
+
+
+# ------------------ ENGINE ------------------ #
+def _moves(items: List[BudgetItem]) -> List[Tuple[float, int, Optional[BudgetAlternative]]]:
+    """Every possible single change as (saving, item index, alternative or None for drop)."""
+    moves = []
+    for i, item in enumerate(items):
+        for alt in item.alternatives:
+            saving = (item.unit_cost - alt.unit_cost) * item.quantity
+            if saving > 0:
+                moves.append((saving, i, alt))
+        if item.optional and item.subtotal > 0:
+            moves.append((item.subtotal, i, None))
+    return moves
+
+
+def _pick(moves, gap: float):
+    """
+    Choose the next change.
+
+    WHY: The smallest change that closes the gap disturbs the plan least;
+    if none closes it, take the biggest saving and keep going. Swaps are
+    preferred over dropping items.
+    """
+    swaps = [m for m in moves if m[2] is not None]
+    for pool in (swaps, moves):
+        closing = [m for m in pool if m[0] >= gap]
+        if closing:
+            return min(closing, key=lambda m: m[0])
+    pool = swaps or moves
+    return max(pool, key=lambda m: m[0])
+
+
+def balance_plan(items: List[BudgetItem], budget_limit: float) -> Tuple[List[BudgetItem], List[str], bool]:
+    """
+    Apply swaps/drops until the plan fits the budget.
+
+    Returns:
+        (final items, human-readable list of changes, fits)
+    """
+    items = [item.model_copy(deep=True) for item in items]
+    changes = []
+    total = sum(item.subtotal for item in items)
+    while total > budget_limit:
+        moves = _moves(items)
+        if not moves:
+            return items, changes, False
+        saving, i, alt = _pick(moves, total - budget_limit)
+        item = items[i]
+        if alt is None:
+            changes.append(f"Dropped {item.name} (saves {saving:,.0f})")
+            items.pop(i)
+        else:
+            changes.append(f"Swapped {item.name} for {alt.name} (saves {saving:,.0f})")
+            remaining = [a for a in item.alternatives if a.unit_cost < alt.unit_cost]
+            items[i] = item.model_copy(update={"name": alt.name, "unit_cost": alt.unit_cost, "alternatives": remaining})
+        total -= saving
+    return items, changes, True
+
+
+def render_breakdown(items: List[BudgetItem], budget_limit: float, currency: str,
+                     changes: List[str], fits: bool) -> str:
+    """Markdown breakdown table plus verdict for the model to present."""
+    total = sum(item.subtotal for item in items)
+    lines = [
+        "| Category | Item | Qty | Unit | Subtotal |",
+        "|---|---|---|---|---|",
+    ]
+    for item in items:
+        lines.append(
+            f"| {item.category} | {item.name} | {item.quantity:g} | "
+            f"{currency}{item.unit_cost:,.0f} | {currency}{item.subtotal:,.0f} |"
+        )
+    lines.append(f"| **Total** | | | | **{currency}{total:,.0f}** |")
+
+    if fits:
+        verdict = (f"✅ BUDGET VALID: Total {currency}{total:,.0f} is within {currency}{budget_limit:,.0f} "
+                   f"(remaining {currency}{budget_limit - total:,.0f}). Present this plan and breakdown to the user.")
+    else:
+        verdict = (f"❌ CANNOT FIT: Even with every listed alternative and optional item removed the total is "
+                   f"{currency}{total:,.0f}, {currency}{total - budget_limit:,.0f} over {currency}{budget_limit:,.0f}. "
+                   f"Tell the user and suggest fewer days, or submit a plan with cheaper alternatives.")
+    parts = [verdict]
+    if changes:
+        parts.append("Changes made to fit the budget:\n" + "\n".join(f"- {c}" for c in changes))
+    parts.append("\n".join(lines))
+    return "\n\n".join(parts)
+
+
+# --------------------- TOOL --------------------- #
+@tool(args_schema=BudgetPlanInput)
+def plan_budget(items: List[BudgetItem], budget_limit: float, currency: str = "₹") -> str:
+    """
+    Total a line-itemized trip plan, check it against the budget and, if it is
+    over, automatically apply the cheapest swaps (from each item's alternatives)
+    and drop optional items until it fits. Returns the final breakdown table.
+    Call it ONCE with the full plan rather than totalling and adjusting the plan step by step.
+    """
+    items = [BudgetItem.model_validate(i) if isinstance(i, dict) else i for i in items]
+    final_items, changes, fits = balance_plan(items, budget_limit)
+    return render_breakdown(final_items, budget_limit, currency, changes, fits)
@@ -1,16 +1,239 @@
+"""
+Safe Arithmetic Calculator Tool
+
+WHY: The calculator used to eval() model-generated strings. Even with
+__builtins__ removed, eval is a known sandbox-escape vector, and it compiles
+the string on every call. Expressions are now parsed with the ast module,
+checked against a small whitelist (numbers, + - * / // % **, parentheses,
+sum/min/max/round) and compiled into plain Python closures that are cached, so a
+repeated expression costs one dict lookup.
+
+Model-friendly input is normalized first: currency symbols (₹ € $),
+thousands separators (outside function calls), ×/÷/− and percentages ("18%" -> 0.18, "18% of 2000").
+"""
+
+import ast
+import math
+import operator
+import re
+from functools import lru_cache
+from typing import Callable, List, Optional
+
 from langchain_core.tools import tool
 
+
+MAX_EXPRESSION_CHARS = 500
+MAX_EXPONENT = 100
+MAX_INT_BITS = 256  # ~1e77; far beyond any budget, small enough to stay cheap
+
+_CURRENCY = re.compile(r"(?:₹|€|\$|£|\bRs\.?|\bINR\b|\bEUR\b|\bUSD\b)", re.IGNORECASE)
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+_CALL_NAME = re.compile(r"[A-Za-z_]\w*\s*$")
+_PERCENT_OF = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*of\b", re.IGNORECASE)
+# WHY: "18%" and "18% + 5" are percentages, "10 % 3" is modulo
+_PERCENT = re.compile(r"(\d+(?:\.\d+)?)\s*%(?!\s*[\w.(])")
+_SYMBOLS = str.maketrans({"×": "*", "÷": "/", "−": "-", "–": "-", "^": "**"})
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+def _flatten(args) -> List[float]:
+    values = []
+    for arg in args:
+        if isinstance(arg, list):
+            values.extend(arg)
+        else:
+            values.append(arg)
+    return values
+
+
+# WHY: Accept both sum(1, 2, 3) and sum([1, 2, 3]), which models write interchangeably
+_FUNCTIONS = {
+    "sum": lambda *args: sum(_flatten(args)),
+    "min": lambda *args: min(_flatten(args)),
+    "max": lambda *args: max(_flatten(args)),
+    "round": lambda value, digits=None: round(value, None if digits is None else int(digits)),
+}
+
+
+class _Group:
+    """One open ( or [ while scanning for thousands separators."""
+
+    __slots__ = ("in_call", "tight", "spaced")
+
+    def __init__(self, in_call: bool):
+        self.in_call = in_call
+        self.tight = False   # "1,600"-style comma seen
+        self.spaced = False  # ", "-style argument separator seen
+
+
+def _strip_thousands(text: str) -> str:
+    """
+    Remove thousands separators outside function calls.
+
+    WHY: Outside a call, "2 * (3,500 + 1,200)" can only mean thousands. Inside
+    one, "min(1,200)" is two arguments, so commas are left alone; an argument
+    list mixing "1,600" with ", " ("sum(1,600, 2,000)") could mean either and
+    is rejected instead of guessed.
+    """
+    out: List[str] = []
+    stack: List[_Group] = []
+    for i, ch in enumerate(text):
+        if ch in "([":
+            is_call = ch == "(" and _CALL_NAME.search(text, 0, i) is not None
+            stack.append(_Group(is_call or bool(stack and stack[-1].in_call)))
+        elif ch in ")]" and stack:
+            group = stack.pop()
+            if group.tight and group.spaced:
+                raise ValueError(
+                    "Ambiguous commas in function arguments; write thousands without separators (1600, not 1,600)"
+                )
+        elif ch == ",":
+            thousands = _THOUSANDS.match(text, i) is not None
+            if not (stack and stack[-1].in_call):
+                if thousands:
+                    continue
+            elif thousands:
+                stack[-1].tight = True
+            elif text[i + 1:i + 2].isspace():
+                stack[-1].spaced = True
+        out.append(ch)
+    return "".join(out)
+
+
+def normalize(expression: str) -> str:
+    """Rewrite currency, separators, unicode operators and percentages into Python syntax."""
+    text = _CURRENCY.sub("", expression).translate(_SYMBOLS)
+    text = _strip_thousands(text)
+    text = _PERCENT_OF.sub(r"(\1/100)*", text)
+    return _PERCENT.sub(r"(\1/100)", text).strip()
+
+
+def _bounded(value):
+    # WHY: Chained products and powers of huge ints ((10**100)**100**...) would
+    # exhaust the worker's CPU and memory long before any useful answer
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise ValueError("Result is too large")
+    return value
+
+
+def _pow(base, exponent):
+    # WHY: 9**9**9 would hang the worker; travel math never needs huge powers
+    if abs(exponent) > MAX_EXPONENT:
+        raise ValueError(f"Exponent {exponent} is too large")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if (abs(base).bit_length() - 1) * exponent > MAX_INT_BITS:
+            raise ValueError("Result is too large")
+    return base ** exponent
+
+
+def _compile_args(args: List[ast.AST]) -> List[Callable[[], object]]:
+    """Compile call arguments; a list/tuple literal is allowed only here (sum([1, 2]))."""
+    compiled = []
+    for arg in args:
+        if isinstance(arg, (ast.List, ast.Tuple)):
+            items = [_compile_node(e) for e in arg.elts]
+            compiled.append(lambda items=items: [item() for item in items])
+        else:
+            compiled.append(_compile_node(arg))
+    return compiled
+
+
+def _compile_node(node: ast.AST) -> Callable[[], object]:
+    """Turn a whitelisted AST node into a zero-argument closure."""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda: value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        op = _pow if isinstance(node.op, ast.Pow) else _BINARY_OPS[type(node.op)]
+        left, right = _compile_node(node.left), _compile_node(node.right)
+        return lambda: _bounded(op(left(), right()))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        op, operand = _UNARY_OPS[type(node.op)], _compile_node(node.operand)
+        return lambda: op(operand())
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in _FUNCTIONS and not node.keywords):
+        func = _FUNCTIONS[node.func.id]
+        args = _compile_args(node.args)
+        return lambda: func(*(arg() for arg in args))
+    if isinstance(node, (ast.List, ast.Tuple)):
+        raise ValueError("Lists are only allowed as arguments of sum, min, max and round")
+    if isinstance(node, ast.Name):
+        raise ValueError(f"Unknown name '{node.id}' (only sum, min, max and round are allowed)")
+    raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> Callable[[], object]:
+    """
+    Parse and compile an expression once; later calls hit the cache.
+
+    Raises:
+        ValueError: If the expression is too long or uses anything outside the whitelist
+    """
+    if len(expression) > MAX_EXPRESSION_CHARS:
+        raise ValueError(f"Expression longer than {MAX_EXPRESSION_CHARS} characters")
+    try:
+        tree = ast.parse(normalize(expression), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}") from e
+    return _compile_node(tree.body)
+
+
+def evaluate(expression: str) -> float:
+    """Evaluate an arithmetic expression safely."""
+    try:
+        result = compile_expression(expression)()
+    except ZeroDivisionError as e:
+        raise ValueError("Division by zero") from e
+    except OverflowError as e:
+        raise ValueError("Result is too large") from e
+    # WHY: Anything but a real number (e.g. complex from (-8)**0.5) is a wrong answer, not a result
+    if type(result) not in (int, float):
+        raise ValueError(f"Expression did not produce a number ({type(result).__name__})")
+    if not math.isfinite(result):
+        raise ValueError("Result is too large")
+    return result
+
+
+def format_number(value) -> str:
+    """Render a result without float noise: 2600.0 -> '2600', at most 2 decimals."""
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+    return str(value)
+
+
 @tool
-def calculator(expression: str) -> str:
+def calculator(expression: str = "", expressions: Optional[List[str]] = None) -> str:
     """
     Calculate the result of a mathematical expression.
     Useful for summing up costs or calculating budgets.
-    Input should be a valid mathematical expression string (e.g., "200 + 500 + 300").
+    Input should be a valid mathematical expression string (e.g., "₹200 + ₹500 + 18% of 300").
+    Supports + - × ÷, parentheses, percentages, currency symbols and sum/min/max/round.
+    Pass several sums at once in `expressions` instead of calling the tool repeatedly.
     """
-    try:
-        # Use eval with restricted globals/locals for safety, though simple arithmetic is the goal
-        allowed_names = {"sum": sum, "min": min, "max": max}
-        result = eval(expression, {"__builtins__": None}, allowed_names)
-        return str(result)
-    except Exception as e:
-        return f"Error calculating: {e}"
+    # WHY: A single expression keeps the old bare-number output
+    if expression and not expressions:
+        try:
+            return format_number(evaluate(expression))
+        except Exception as e:
+            return f"Error calculating: {e}"
+
+    lines = []
+    for expr in ([expression] if expression else []) + list(expressions or []):
+        try:
+            lines.append(f"{expr} = {format_number(evaluate(expr))}")
+        except Exception as e:
+            lines.append(f"{expr} = Error calculating: {e}")
+    return "\n".join(lines) if lines else "Error calculating: no expression given"
@@ -0,0 +1,121 @@
+"""
+Destination Bundle Tool
+
+WHY: Planning a trip used to take five tool calls (attractions, restaurants,
+hotels, activities, weather), usually spread over several LLM round-trips.
+This tool geocodes once and fetches every place category plus the weather
+concurrently, so the model gets everything in a single tool round-trip.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from langchain_core.tools import StructuredTool
+from travel_planner.tools.iternaryplaces import (
+    PLACE_CATEGORIES,
+    PlaceResult,
+    get_coordinates,
+    aget_coordinates,
+    search_near,
+    asearch_near,
+)
+from travel_planner.tools.weather import WeatherOutputSchema, fetch_weather, afetch_weather
+from travel_planner.tools.rendering import is_compact, render_bundle
+from travel_planner.utils.tracing import wrap_context
+
+
+# --------------------- SCHEMAS --------------------- #
+class DestinationBundleInput(BaseModel):
+    place: str = Field(..., description="City or destination to plan a trip for")
+    limit: int = Field(5, description="Number of results per category")
+
+
+class DestinationBundleOutput(BaseModel):
+    place: str
+    weather: Optional[WeatherOutputSchema] = None
+    attractions: List[PlaceResult] = []
+    restaurants: List[PlaceResult] = []
+    hotels: List[PlaceResult] = []
+    activities: List[PlaceResult] = []
+    # WHY: One failing section (e.g. weather timeout) shouldn't lose the rest
+    errors: List[str] = []
+
+
+# ------------------ HELPER FUNCTIONS ------------------ #
+def _not_found(place: str) -> str:
+    return f"Could not find '{place}'. Please check the location name."
+
+
+def _assemble(place: str, sections: dict):
+    """Build the tool output from {section: result-or-exception}."""
+    bundle = DestinationBundleOutput(place=place)
+    for section, result in sections.items():
+        if isinstance(result, ValueError):
+            bundle.errors.append(f"{section}: {result}")
+        elif isinstance(result, Exception):
+            bundle.errors.append(f"{section}: unexpected error: {result}")
+        else:
+            setattr(bundle, section, result)
+    # WHY: Compact text instead of the pydantic repr keeps prompts small
+    return render_bundle(bundle) if is_compact() else bundle
+
+
+def _bundle(place: str, limit: int = 5):
+    """Get weather, attractions, restaurants, hotels and activities for a place in one call."""
+    try:
+        lat, lon = get_coordinates(place)
+    except ValueError as e:
+        return str(e)
+    if not lat or not lon:
+        return _not_found(place)
+
+    def run(fn, *args):
+        try:
+            return fn(*args)
+        except Exception as e:
+            return e
+
+    # WHY: Sync path (CLI) fans out on threads; the pooled client is thread-safe.
+    # wrap_context keeps each thread's HTTP spans under the caller's trace
+    with ThreadPoolExecutor(max_workers=len(PLACE_CATEGORIES) + 1) as pool:
+        futures = {
+            section: pool.submit(wrap_context(run), search_near, lat, lon, categories, limit, place)
+            for section, categories in PLACE_CATEGORIES.items()
+        }
+        futures["weather"] = pool.submit(wrap_context(run), fetch_weather, place)
+        sections = {section: future.result() for section, future in futures.items()}
+
+    return _assemble(place, sections)
+
+
+async def _abundle(place: str, limit: int = 5):
+    """Get weather, attractions, restaurants, hotels and activities for a place in one call."""
+    try:
+        lat, lon = await aget_coordinates(place)
+    except ValueError as e:
+        return str(e)
+    if not lat or not lon:
+        return _not_found(place)
+
+    names = list(PLACE_CATEGORIES) + ["weather"]
+    results = await asyncio.gather(
+        *(asearch_near(lat, lon, categories, limit, place) for categories in PLACE_CATEGORIES.values()),
+        afetch_weather(place),
+        return_exceptions=True,
+    )
+    return _assemble(place, dict(zip(names, results)))
+
+
+# --------------------- TOOL --------------------- #
+get_destination_bundle = StructuredTool.from_function(
+    func=_bundle,
+    coroutine=_abundle,
+    name="get_destination_bundle",
+    description=(
+        "Get weather plus top attractions, restaurants, hotels and activities "
+        "for a place in ONE call. Prefer this over the individual search tools "
+        "when planning a trip."
+    ),
+    args_schema=DestinationBundleInput,
+)
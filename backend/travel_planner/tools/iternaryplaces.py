@@ -1,17 +1,38 @@
 # geo_search_tool.py
 import os
-import requests
+import httpx
 from typing import List
 from pydantic import BaseModel, Field
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 from dotenv import load_dotenv
-from functools import lru_cache
+from travel_planner.utils.cache import MISSING, cached, get_tool_cache
 from travel_planner.utils.decorators import retry_on_error
+from travel_planner.utils.http_client import http_get, ahttp_get
+from travel_planner.utils.singleflight import single_flight
+from travel_planner.tools.rendering import is_compact, render_places
 
 load_dotenv()
 API_KEY = os.getenv("GEOAPIFY_API_KEY")
 
-BASE_URL = "https://api.geoapify.com/v2/places"
+# WHY: Overridable so load tests can point at a local stub (utils/stub_servers)
+GEOAPIFY_BASE_URL = os.getenv("GEOAPIFY_BASE_URL", "https://api.geoapify.com").rstrip("/")
+BASE_URL = f"{GEOAPIFY_BASE_URL}/v2/places"
+GEOCODE_URL = f"{GEOAPIFY_BASE_URL}/v1/geocode/search"
+
+# Search within a 20km radius (20000 meters)
+SEARCH_RADIUS_M = 20000
+
+# Geoapify categories behind each place tool
+PLACE_CATEGORIES = {
+    "attractions": "tourism.sights",
+    "restaurants": "catering.restaurant",
+    "hotels": "accommodation",
+    "activities": "entertainment,leisure",
+}
+
+# WHY: Always fetch at least this many places so later requests with a
+# smaller (or default) limit are served from the same cache entry
+MIN_FETCH_LIMIT = 20
 
 
 # --------------------- SCHEMAS --------------------- #
@@ -31,156 +52,279 @@ class PlaceSearchOutput(BaseModel):
 
 
 # ------------------ HELPER FUNCTIONS ------------------ #
+def _place_key(place: str) -> str:
+    """Normalize a place name for cache keys ("  Goa " and "goa" share an entry)."""
+    return place.strip().lower()
+
+
+def _no_coordinates(coordinates) -> bool:
+    """Geocode result for an unknown place; negatively cached."""
+    return coordinates[0] is None
+
+
+def _parse_coordinates(data: dict):
+    if data.get("features"):
+        props = data["features"][0]["properties"]
+        return props.get("lat"), props.get("lon")
+    # WHY: Return None for invalid locations, don't retry (not transient)
+    return None, None
+
+
+def _geocode_error(e: httpx.HTTPError, place: str) -> ValueError:
+    """Map transport/HTTP errors to friendly messages the LLM can relay."""
+    if isinstance(e, httpx.TimeoutException):
+        return ValueError(f"Geocoding timeout for '{place}'. Please try again.")
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == 401:
+            return ValueError("Places API key is invalid or missing.")
+        return ValueError(f"Geocoding service error: {e.response.status_code}")
+    return ValueError(f"Could not connect to geocoding service: {str(e)}")
+
+
+def _places_params(lat: float, lon: float, categories: str, limit: int) -> dict:
+    return {
+        "categories": categories,
+        "filter": f"circle:{lon},{lat},{SEARCH_RADIUS_M}",
+        "limit": limit,
+        "apiKey": API_KEY,
+    }
+
+
+def _places_key(lat: float, lon: float, categories: str) -> str:
+    """
+    Cache key for a place search.
+    
+    WHY: Keyed on the search area, not the user's spelling of the place:
+    coordinates rounded to ~100m, sorted categories and radius, so
+    "Goa", "goa, india" and "North Goa" share entries when they geocode alike.
+    """
+    cats = ",".join(sorted(c.strip() for c in categories.split(",")))
+    return f"{round(lat, 3)},{round(lon, 3)}|{cats}|{SEARCH_RADIUS_M}"
+
+
+def _cached_places(entry, limit: int):
+    """
+    Serve `limit` results from a cached entry, or None if it can't.
+    
+    WHY: An entry fetched with a larger limit answers any smaller request;
+    an entry that returned fewer results than it asked for is complete.
+    """
+    if entry is MISSING:
+        return None
+    if entry["limit"] >= limit or len(entry["results"]) < entry["limit"]:
+        return [PlaceResult(**r) for r in entry["results"][:limit]]
+    return None
+
+
+def _places_entry(results: List[PlaceResult], fetch_limit: int) -> dict:
+    return {"limit": fetch_limit, "results": [r.model_dump() for r in results]}
+
+
+def _no_places(entry) -> bool:
+    """Empty search result; negatively cached."""
+    return not entry["results"]
+
+
+def _parse_places(data: dict) -> List[PlaceResult]:
+    results = []
+    for f in data.get("features", []):
+        props = f.get("properties", {})
+        results.append(
+            PlaceResult(
+                name=props.get("name", "Unknown"),
+                category=props.get("categories", ["unknown"])[0],
+                address=props.get("formatted", "No address available"),
+            )
+        )
+    return results
+
+
+def _places_error(e: httpx.HTTPError, place: str) -> ValueError:
+    """Map transport/HTTP errors to friendly messages the LLM can relay."""
+    if isinstance(e, httpx.TimeoutException):
+        return ValueError(f"Places search timeout for '{place}'. Please try again.")
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == 401:
+            return ValueError("Places API key is invalid or missing.")
+        return ValueError(f"Places service error: {e.response.status_code}")
+    return ValueError(f"Could not connect to places service: {str(e)}")
+
+
+@cached("geocode", key=_place_key, is_negative=_no_coordinates, decode=tuple)
+@single_flight("geocode", key=_place_key)
 @retry_on_error(max_attempts=2, delay=1.0)
-@lru_cache(maxsize=256)
 def get_coordinates(place: str):
     """
     Geocode a place name to get coordinates.
     
-    WHY: Cached to avoid repeated geocoding of same location.
+    WHY: Cached (shared tool cache, long TTL) to avoid repeated geocoding of
+    same location; unknown places are negatively cached for a shorter TTL.
+    Concurrent misses for the same place share one API call (single-flight).
     Retry decorator handles transient API failures.
     """
-    url = f"https://api.geoapify.com/v1/geocode/search?text={place}&apiKey={API_KEY}"
-    
     try:
-        # WHY: 10 second timeout prevents hanging
-        res = requests.get(url, timeout=10)
-        res.raise_for_status()
-        
-        data = res.json()
-        if data.get("features"):
-            props = data["features"][0]["properties"]
-            return props.get("lat"), props.get("lon")
-        else:
-            # WHY: Return None for invalid locations, don't retry (not transient)
-            return None, None
-            
-    except requests.exceptions.Timeout:
-        raise ValueError(f"Geocoding timeout for '{place}'. Please try again.")
-        
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 401:
-            raise ValueError("Places API key is invalid or missing.")
-        else:
-            raise ValueError(f"Geocoding service error: {e.response.status_code}")
-            
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Could not connect to geocoding service: {str(e)}")
+        # WHY: Shared pooled client reuses connections; timeouts come from config.yaml
+        res = http_get(GEOCODE_URL, params={"text": place, "apiKey": API_KEY})
+        return _parse_coordinates(res.json())
+    except httpx.HTTPError as e:
+        raise _geocode_error(e, place) from e
 
 
+@cached("geocode", key=_place_key, is_negative=_no_coordinates, decode=tuple)
+@single_flight("geocode", key=_place_key)
 @retry_on_error(max_attempts=2, delay=1.0)
+async def aget_coordinates(place: str):
+    """Async version of get_coordinates (shares its cache entries)."""
+    try:
+        res = await ahttp_get(GEOCODE_URL, params={"text": place, "apiKey": API_KEY})
+        return _parse_coordinates(res.json())
+    except httpx.HTTPError as e:
+        raise _geocode_error(e, place) from e
+
+
+def _fetch_key(lat: float, lon: float, categories: str, fetch_limit: int, place: str = "") -> str:
+    return f"{_places_key(lat, lon, categories)}|{fetch_limit}"
+
+
+@single_flight("places", key=_fetch_key)
+@retry_on_error(max_attempts=2, delay=1.0)
+def _fetch_places(lat: float, lon: float, categories: str, fetch_limit: int, place: str = "") -> dict:
+    """Call the places API and store the result as a cache entry."""
+    try:
+        # WHY: Shared pooled client reuses connections; timeouts come from config.yaml
+        res = http_get(BASE_URL, params=_places_params(lat, lon, categories, fetch_limit))
+        entry = _places_entry(_parse_places(res.json()), fetch_limit)
+    except httpx.HTTPError as e:
+        raise _places_error(e, place) from e
+
+    get_tool_cache().set("places", _places_key(lat, lon, categories), entry, negative=_no_places(entry))
+    return entry
+
+
+@single_flight("places", key=_fetch_key)
+@retry_on_error(max_attempts=2, delay=1.0)
+async def _afetch_places(lat: float, lon: float, categories: str, fetch_limit: int, place: str = "") -> dict:
+    """Async version of _fetch_places."""
+    try:
+        res = await ahttp_get(BASE_URL, params=_places_params(lat, lon, categories, fetch_limit))
+        entry = _places_entry(_parse_places(res.json()), fetch_limit)
+    except httpx.HTTPError as e:
+        raise _places_error(e, place) from e
+
+    await get_tool_cache().aset("places", _places_key(lat, lon, categories), entry, negative=_no_places(entry))
+    return entry
+
+
+def search_near(lat: float, lon: float, categories: str, limit: int, place: str = "") -> List[PlaceResult]:
+    """
+    Search places of `categories` around known coordinates.
+    
+    WHY: Results are cached per search area (see _places_key) and reused for
+    smaller limits; concurrent misses share one API call (single-flight).
+    Callers that already geocoded (e.g. the destination bundle) skip the
+    geocoding step. `place` is only used in error messages.
+    """
+    key = _places_key(lat, lon, categories)
+    results = _cached_places(get_tool_cache().get("places", key, _no_places), limit)
+    if results is not None:
+        return results
+
+    entry = _fetch_places(lat, lon, categories, max(limit, MIN_FETCH_LIMIT), place)
+    return _cached_places(entry, limit)
+
+
+async def asearch_near(lat: float, lon: float, categories: str, limit: int, place: str = "") -> List[PlaceResult]:
+    """Async version of search_near (shares its cache entries)."""
+    key = _places_key(lat, lon, categories)
+    results = _cached_places(await get_tool_cache().aget("places", key, _no_places), limit)
+    if results is not None:
+        return results
+
+    entry = await _afetch_places(lat, lon, categories, max(limit, MIN_FETCH_LIMIT), place)
+    return _cached_places(entry, limit)
+
+
 def search_geoapify(place: str, categories: str, limit: int) -> List[PlaceResult]:
     """
     Internal function to call Geoapify API.
     
-    WHY: Centralized API calling with error handling.
-    Retry decorator handles transient failures.
+    WHY: Centralized API calling with error handling: geocode, then search
+    the area around the coordinates.
     """
-    try:
-        lat, lon = get_coordinates(place)
-        if not lat or not lon:
-            # WHY: Friendly error message for invalid location
-            return []
-
-        # Search within a 20km radius (20000 meters)
-        url = (
-            f"{BASE_URL}?categories={categories}"
-            f"&filter=circle:{lon},{lat},20000"
-            f"&limit={limit}"
-            f"&apiKey={API_KEY}"
-        )
+    # WHY: ValueError from get_coordinates propagates (user-friendly errors)
+    lat, lon = get_coordinates(place)
+    if not lat or not lon:
+        # WHY: Friendly error message for invalid location
+        return []
+    return search_near(lat, lon, categories, limit, place)
 
-        # WHY: 10 second timeout prevents hanging
-        res = requests.get(url, timeout=10)
-        res.raise_for_status()
-        
-        data = res.json()
-        features = data.get("features", [])
-
-        results = []
-        for f in features:
-            props = f.get("properties", {})
-            results.append(
-                PlaceResult(
-                    name=props.get("name", "Unknown"),
-                    category=props.get("categories", ["unknown"])[0],
-                    address=props.get("formatted", "No address available"),
-                )
-            )
-        return results
-        
-    except ValueError:
-        # WHY: Re-raise ValueError from get_coordinates (user-friendly errors)
-        raise
-        
-    except requests.exceptions.Timeout:
-        raise ValueError(f"Places search timeout for '{place}'. Please try again.")
-        
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 401:
-            raise ValueError("Places API key is invalid or missing.")
-        else:
-            raise ValueError(f"Places service error: {e.response.status_code}")
-            
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Could not connect to places service: {str(e)}")
 
+async def asearch_geoapify(place: str, categories: str, limit: int) -> List[PlaceResult]:
+    """Async version of search_geoapify."""
+    lat, lon = await aget_coordinates(place)
+    if not lat or not lon:
+        return []
+    return await asearch_near(lat, lon, categories, limit, place)
 
-# --------------------- TOOLS --------------------- #
 
-@tool(args_schema=PlaceSearchInput)
-def search_attractions(place: str, limit: int = 10) -> PlaceSearchOutput:
-    """Search top attractions at a place."""
-    try:
-        results = search_geoapify(place, "tourism.sights", limit)
-        if not results:
-            return f"No attractions found for '{place}'. Please check the location name."
+# --------------------- TOOLS --------------------- #
+def _place_output(results: List[PlaceResult], place: str, label: str, tool_name: str):
+    if not results:
+        return f"No {label} found for '{place}'. Please check the location name."
+    if not is_compact():
         return PlaceSearchOutput(results=results)
-    except ValueError as e:
-        return str(e)
-    except Exception as e:
-        return f"Unexpected error searching attractions: {str(e)}"
+    # WHY: Compact lines instead of the pydantic repr keep prompts small
+    return render_places(label.capitalize(), place, results, tool_name)
 
 
-@tool(args_schema=PlaceSearchInput)
-def search_restaurants(place: str, limit: int = 10) -> PlaceSearchOutput:
-    """Search restaurants at a place."""
-    try:
-        results = search_geoapify(place, "catering.restaurant", limit)
-        if not results:
-            return f"No restaurants found for '{place}'. Please check the location name."
-        return PlaceSearchOutput(results=results)
-    except ValueError as e:
-        return str(e)
-    except Exception as e:
-        return f"Unexpected error searching restaurants: {str(e)}"
+def _place_tool(name: str, categories: str, label: str, description: str) -> StructuredTool:
+    """
+    Build a place search tool with both sync and async entry points.
 
+    WHY: The API runs the graph with ainvoke, so tools must not block the
+    event loop. The sync entry point is kept for the CLI (main.py).
+    """
+    def _search(place: str, limit: int = 10) -> PlaceSearchOutput:
+        try:
+            return _place_output(search_geoapify(place, categories, limit), place, label, name)
+        except ValueError as e:
+            return str(e)
+        except Exception as e:
+            return f"Unexpected error searching {label}: {str(e)}"
 
-@tool(args_schema=PlaceSearchInput)
-def search_hotels(place: str, limit: int = 10) -> PlaceSearchOutput:
-    """Search hotels at a place."""
-    try:
-        results = search_geoapify(place, "accommodation", limit)
-        if not results:
-            return f"No hotels found for '{place}'. Please check the location name."
-        return PlaceSearchOutput(results=results)
-    except ValueError as e:
-        return str(e)
-    except Exception as e:
-        return f"Unexpected error searching hotels: {str(e)}"
+    async def _asearch(place: str, limit: int = 10) -> PlaceSearchOutput:
+        try:
+            return _place_output(await asearch_geoapify(place, categories, limit), place, label, name)
+        except ValueError as e:
+            return str(e)
+        except Exception as e:
+            return f"Unexpected error searching {label}: {str(e)}"
 
+    return StructuredTool.from_function(
+        func=_search,
+        coroutine=_asearch,
+        name=name,
+        description=description,
+        args_schema=PlaceSearchInput,
+    )
 
-@tool(args_schema=PlaceSearchInput)
-def search_activities(place: str, limit: int = 10) -> PlaceSearchOutput:
-    """Search activities or things to do at a place."""
-    try:
-        results = search_geoapify(place, "entertainment,leisure", limit)
-        if not results:
-            return f"No activities found for '{place}'. Please check the location name."
-        return PlaceSearchOutput(results=results)
-    except ValueError as e:
-        return str(e)
-    except Exception as e:
-        return f"Unexpected error searching activities: {str(e)}"
 
+search_attractions = _place_tool(
+    "search_attractions", PLACE_CATEGORIES["attractions"], "attractions",
+    "Search top attractions at a place.",
+)
+
+search_restaurants = _place_tool(
+    "search_restaurants", PLACE_CATEGORIES["restaurants"], "restaurants",
+    "Search restaurants at a place.",
+)
+
+search_hotels = _place_tool(
+    "search_hotels", PLACE_CATEGORIES["hotels"], "hotels",
+    "Search hotels at a place.",
+)
 
+search_activities = _place_tool(
+    "search_activities", PLACE_CATEGORIES["activities"], "activities",
+    "Search activities or things to do at a place.",
+)
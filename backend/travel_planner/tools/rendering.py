@@ -0,0 +1,117 @@
+"""
+Compact Tool Output Rendering
+
+WHY: Tools used to return pydantic objects, which ToolNode stringifies into
+verbose repr text (results=[PlaceResult(name=..., category=..., address=...)])
+that is fed back into every later prompt. Rendering results as deduplicated,
+tabular lines with shortened addresses and a character budget per tool call
+cuts prompt tokens (and per-turn latency/cost) without losing what the model
+needs to plan.
+
+Set tool_output.format to "verbose" in config.yaml to make the tools return
+their pydantic objects as before.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from travel_planner.utils.config_loader import load_config
+
+
+DEFAULT_TOOL_OUTPUT_SETTINGS = {
+    "format": "compact",        # compact | verbose
+    "address_chars": 60,        # Max characters per address
+    "max_chars": {"default": 1200},
+}
+
+_POSTCODE = re.compile(r"\b\d{5,6}\b")
+_settings: Optional[Dict] = None
+
+
+def get_tool_output_settings() -> Dict:
+    global _settings
+    if _settings is None:
+        _settings = {**DEFAULT_TOOL_OUTPUT_SETTINGS, **(load_config().get("tool_output") or {})}
+    return _settings
+
+
+def is_compact() -> bool:
+    return get_tool_output_settings()["format"] == "compact"
+
+
+def budget_for(tool_name: str) -> int:
+    """Character budget for one call of `tool_name`."""
+    budgets = get_tool_output_settings()["max_chars"]
+    return budgets.get(tool_name, budgets.get("default", 1200))
+
+
+def short_category(category: str) -> str:
+    """'accommodation.hotel' -> 'hotel'"""
+    return category.rsplit(".", 1)[-1].replace("_", " ")
+
+
+def short_address(address: str, name: str = "") -> str:
+    """
+    Drop the repeated place name, postcodes and the country, then truncate.
+
+    'Taj Fort Aguada, Sinquerim, Candolim, Bardez - 403515, Goa, India'
+    -> 'Sinquerim, Candolim, Bardez, Goa'
+    """
+    parts = [p.strip(" -") for p in _POSTCODE.sub("", address).split(",")]
+    parts = [p for p in parts if p and p.lower() != name.lower()]
+    if len(parts) > 2:
+        parts = parts[:-1]  # country
+    text = ", ".join(parts)
+    limit = get_tool_output_settings()["address_chars"]
+    return text if len(text) <= limit else text[:limit - 1].rstrip(", ") + "…"
+
+
+def place_lines(results) -> List[str]:
+    """One 'name | type | address' line per unique place."""
+    lines, seen = [], set()
+    for r in results:
+        address = short_address(r.address, r.name)
+        key = (r.name.lower(), address.lower())
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(f"- {r.name} | {short_category(r.category)} | {address}")
+    return lines
+
+
+def fit(header: str, lines: List[str], max_chars: int) -> str:
+    """Join header and lines, dropping trailing lines that exceed the budget."""
+    out, used = [header], len(header)
+    for i, line in enumerate(lines):
+        if used + len(line) + 1 > max_chars:
+            out.append(f"(+{len(lines) - i} more not shown)")
+            break
+        out.append(line)
+        used += len(line) + 1
+    return "\n".join(out)
+
+
+def render_places(label: str, place: str, results, tool_name: str = "") -> str:
+    """Render a place search result for the LLM."""
+    return fit(f"{label} near {place} (name | type | address):", place_lines(results), budget_for(tool_name))
+
+
+def render_weather(city: str, weather) -> str:
+    """Render a weather result for the LLM."""
+    return f"Weather in {city}: {weather.temperature:g}°C, {weather.condition}, humidity {weather.humidity}%"
+
+
+def render_bundle(bundle) -> str:
+    """Render a destination bundle; the budget is shared between the four place sections."""
+    sections = ["attractions", "restaurants", "hotels", "activities"]
+    per_section = budget_for("get_destination_bundle") // len(sections)
+    parts = []
+    if bundle.weather is not None:
+        parts.append(render_weather(bundle.place, bundle.weather))
+    for section in sections:
+        results = getattr(bundle, section)
+        if results:
+            parts.append(fit(f"{section.capitalize()} (name | type | address):", place_lines(results), per_section))
+    if bundle.errors:
+        parts.append("Unavailable: " + "; ".join(bundle.errors))
+    return "\n".join(parts)
@@ -1,16 +1,22 @@
 from pydantic import BaseModel, Field
-from langchain_core.tools import tool
-import requests
+from langchain_core.tools import StructuredTool
+import httpx
 from os import getenv
 from dotenv import load_dotenv
-from functools import lru_cache
-from datetime import datetime
+from travel_planner.utils.cache import cached
 from travel_planner.utils.decorators import retry_on_error
+from travel_planner.utils.http_client import http_get, ahttp_get
+from travel_planner.utils.singleflight import single_flight
+from travel_planner.tools.rendering import is_compact, render_weather
 
 load_dotenv()
 
 API_KEY = getenv("OPEN_WEATHER_API_KEY")
 
+# WHY: Overridable so load tests can point at a local stub (utils/stub_servers)
+OPEN_WEATHER_BASE_URL = getenv("OPEN_WEATHER_BASE_URL", "https://api.openweathermap.org").rstrip("/")
+WEATHER_URL = f"{OPEN_WEATHER_BASE_URL}/data/2.5/weather"
+
 # --------- Schema Definition ----------- #
 class WeatherInputSchema(BaseModel):
     city: str = Field(..., description="City name")
@@ -21,53 +27,100 @@ class WeatherOutputSchema(BaseModel):
     humidity: int = Field(..., description="Humidity")
 
 # --------- Helper Function with Caching ----------- #
+def _city_key(city: str) -> str:
+    """Normalize a city name for cache keys."""
+    return city.strip().lower()
+
+
+def _city_not_found(data) -> bool:
+    """Weather result for an unknown city; negatively cached."""
+    return data is None
+
+
+def _weather_error(e: httpx.HTTPError, city: str) -> ValueError:
+    """Map transport/HTTP errors to friendly messages, not stack traces."""
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == 401:
+            return ValueError("Weather API key is invalid or missing.")
+        return ValueError(f"Weather service error: {e.response.status_code}")
+    if isinstance(e, httpx.TimeoutException):
+        return ValueError(f"Weather service timeout for '{city}'. Please try again.")
+    return ValueError(f"Could not connect to weather service: {str(e)}")
+
+
+def _weather_params(city: str) -> dict:
+    return {"q": city, "units": "metric", "appid": API_KEY}
+
+
+@cached("weather", key=_city_key, is_negative=_city_not_found)
+@single_flight("weather", key=_city_key)
 @retry_on_error(max_attempts=2, delay=1.0)
-@lru_cache(maxsize=128)
-def _fetch_weather_cached(city: str, hour_key: str):
+def _fetch_weather_cached(city: str):
     """
     Internal cached function to fetch weather data.
     
-    WHY: Cache based on city + hour_key to get ~1 hour cache duration.
-    Weather doesn't change frequently, so caching reduces API costs.
-    Retry decorator handles transient API failures.
+    WHY: Weather doesn't change frequently, so caching (cache.ttl.weather in
+    config.yaml) reduces API costs. Unknown cities return None and are
+    negatively cached. Concurrent misses for the same city share one API
+    call (single-flight). Retry decorator handles transient API failures.
     """
-    url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&units=metric&appid={API_KEY}"
-    
     try:
-        # WHY: 10 second timeout prevents hanging on slow APIs
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Raises HTTPError for bad status codes
-        return response.json()
-        
-    except requests.exceptions.HTTPError as e:
-        # WHY: Provide friendly error messages, not stack traces
+        # WHY: Shared pooled client reuses connections; timeouts come from config.yaml
+        # http_get raises HTTPStatusError for bad status codes
+        return http_get(WEATHER_URL, params=_weather_params(city)).json()
+    except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
-            raise ValueError(f"City '{city}' not found. Please check the spelling.")
-        elif e.response.status_code == 401:
-            raise ValueError("Weather API key is invalid or missing.")
-        else:
-            raise ValueError(f"Weather service error: {e.response.status_code}")
-            
-    except requests.exceptions.Timeout:
-        raise ValueError(f"Weather service timeout for '{city}'. Please try again.")
-        
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Could not connect to weather service: {str(e)}")
+            return None
+        raise _weather_error(e, city) from e
+    except httpx.HTTPError as e:
+        raise _weather_error(e, city) from e
+
+
+@cached("weather", key=_city_key, is_negative=_city_not_found)
+@single_flight("weather", key=_city_key)
+@retry_on_error(max_attempts=2, delay=1.0)
+async def _afetch_weather_cached(city: str):
+    """Async version of _fetch_weather_cached (shares its cache entries)."""
+    try:
+        return (await ahttp_get(WEATHER_URL, params=_weather_params(city))).json()
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return None
+        raise _weather_error(e, city) from e
+    except httpx.HTTPError as e:
+        raise _weather_error(e, city) from e
+
 
 # --------- Tool Definition ----------- #
-@tool(args_schema=WeatherInputSchema)
-def get_weather(city: str) -> WeatherOutputSchema:
+def _weather_output(data, city: str) -> WeatherOutputSchema:
+    if data is None:
+        raise ValueError(f"City '{city}' not found. Please check the spelling.")
+    return WeatherOutputSchema(
+        temperature=data["main"]["temp"],
+        condition=data["weather"][0]["description"],
+        humidity=data["main"]["humidity"]
+    )
+
+
+def fetch_weather(city: str) -> WeatherOutputSchema:
+    """Fetch (cached) weather for a city; raises ValueError with a friendly message."""
+    return _weather_output(_fetch_weather_cached(city), city)
+
+
+async def afetch_weather(city: str) -> WeatherOutputSchema:
+    """Async version of fetch_weather."""
+    return _weather_output(await _afetch_weather_cached(city), city)
+
+
+def _weather_tool_output(city: str, weather: WeatherOutputSchema):
+    # WHY: One compact line instead of the pydantic repr keeps prompts small
+    return render_weather(city, weather) if is_compact() else weather
+
+
+def _get_weather(city: str) -> WeatherOutputSchema:
     """Get weather information for a city."""
     try:
-        # WHY: Hour-based cache key gives us ~1 hour cache duration
-        hour_key = datetime.utcnow().strftime("%Y%m%d%H")
-        data = _fetch_weather_cached(city, hour_key)
-        
-        return WeatherOutputSchema(
-            temperature=data["main"]["temp"],
-            condition=data["weather"][0]["description"],
-            humidity=data["main"]["humidity"]
-        )
+        return _weather_tool_output(city, fetch_weather(city))
         
     except ValueError as e:
         # WHY: Return friendly error message that LLM can communicate to user
@@ -75,3 +128,20 @@ def get_weather(city: str) -> WeatherOutputSchema:
     except Exception as e:
         return f"Unexpected error getting weather: {str(e)}"
 
+
+async def _aget_weather(city: str) -> WeatherOutputSchema:
+    """Get weather information for a city."""
+    try:
+        return _weather_tool_output(city, await afetch_weather(city))
+    except ValueError as e:
+        return str(e)
+    except Exception as e:
+        return f"Unexpected error getting weather: {str(e)}"
+
+
+get_weather = StructuredTool.from_function(
+    func=_get_weather,
+    coroutine=_aget_weather,
+    name="get_weather",
+    args_schema=WeatherInputSchema,
+)
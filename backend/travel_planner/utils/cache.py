@@ -0,0 +1,429 @@
+"""
+Tool Result Cache
+
+WHY: functools.lru_cache is per-process, lost on restart, never expires
+geocodes, and expires weather on a wall-clock hour boundary. A pluggable
+TTL cache lets every uvicorn worker share results (SQLite or Redis), cuts
+Geoapify/OpenWeather spend, and remembers "not found" answers for a while
+so typos don't hit the API on every retry.
+
+Backends:
+    memory - in-process LRU + TTL (default, zero setup)
+    sqlite - on-disk, shared by all workers on one machine
+    redis  - shared across machines (any Redis-compatible server);
+             redis_url "fake://" uses the in-process FakeRedis for local runs
+
+Usage:
+    @cached("geocode", key=lambda place: place.strip().lower())
+    def get_coordinates(place): ...
+
+Works on both sync and async functions. Values must be JSON-serializable.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from travel_planner.utils.config_loader import load_config, resolve_path
+
+
+DEFAULT_CACHE_SETTINGS = {
+    "backend": "memory",
+    "max_entries": 5000,
+    "sqlite_path": "data/tool_cache.db",
+    "redis_url": "redis://localhost:6379/0",
+    "default_ttl": 3600,
+    "negative_ttl": 3600,
+    "ttl": {},
+}
+
+# Sentinel returned by backends on a cache miss
+MISSING = object()
+
+
+# --------------------- BACKENDS --------------------- #
+class CacheBackend:
+    """Minimal key/value interface every backend implements."""
+
+    # WHY: Async callers run blocking backends (disk, network) in a worker thread
+    blocking = True
+
+    def get(self, key: str) -> Any:
+        """Return the cached value or MISSING."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL.
+
+    WHY: Values are stored as JSON like the other backends, so a caller that
+    mutates a returned dict or list can't corrupt the cached entry, and a
+    value that works here also works on SQLite/Redis.
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, raw = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+        return json.loads(raw)
+
+    def set(self, key, value, ttl):
+        raw = json.dumps(value)
+        with self._lock:
+            self._data[key] = (time.time() + ttl, raw)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """
+    On-disk cache shared by all workers on the same machine.
+
+    WHY: WAL mode lets workers read while another writes; one connection
+    per thread avoids sharing a sqlite3 connection across threads.
+    Eviction doesn't run (or COUNT the table) on every write: only once a
+    running row estimate passes max_entries, or every EVICT_EVERY writes
+    to pick up rows other workers added.
+    """
+
+    EVICT_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tool_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_cache_expires ON tool_cache(expires_at)")
+        conn.commit()
+        (self._rows,) = conn.execute("SELECT COUNT(*) FROM tool_cache").fetchone()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM tool_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= time.time():
+            return MISSING
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO tool_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + ttl),
+        )
+        with self._lock:
+            # WHY: Counts replacements too, so the estimate only errs towards evicting early
+            self._rows += 1
+            self._writes += 1
+            due = self._rows > self.max_entries or self._writes >= self.EVICT_EVERY
+            if due:
+                self._writes = 0
+        if due:
+            self._evict(conn)
+        conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop expired rows (via the expires_at index), then the entries closest to expiry if over max_entries."""
+        conn.execute("DELETE FROM tool_cache WHERE expires_at <= ?", (time.time(),))
+        (count,) = conn.execute("SELECT COUNT(*) FROM tool_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM tool_cache WHERE key IN "
+                "(SELECT key FROM tool_cache ORDER BY expires_at LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+        with self._lock:
+            self._rows = min(count, self.max_entries)
+
+    def delete(self, key):
+        conn = self._conn()
+        conn.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+        conn.commit()
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM tool_cache")
+        conn.commit()
+        with self._lock:
+            self._rows = 0
+
+
+class FakeRedis:
+    """
+    In-process stand-in for a Redis client (get/set with ex/delete/flushdb).
+
+    WHY: Lets the redis backend run locally and in CI without a server.
+    """
+
+    def __init__(self):
+        self._memory = MemoryCache(max_entries=10 ** 9)
+
+    def get(self, key):
+        value = self._memory.get(key)
+        return None if value is MISSING else value
+
+    def set(self, key, value, ex=None):
+        self._memory.set(key, value, ex if ex is not None else 10 ** 9)
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self._memory.delete(key)
+        return len(keys)
+
+    def flushdb(self):
+        self._memory.clear()
+        return True
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache shared across machines via any Redis-compatible server.
+
+    WHY: Size-based eviction is left to the server (maxmemory-policy allkeys-lru),
+    entries expire with native TTLs.
+    """
+
+    def __init__(self, url: str, prefix: str = "travel_planner:"):
+        self.prefix = prefix
+        self.evictions = 0
+        if url.startswith("fake://"):
+            self.client = FakeRedis()
+        else:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("The redis cache backend requires 'pip install redis'") from e
+            self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return MISSING if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl):
+        # WHY: Redis rejects ex=0; a non-positive TTL means "already expired" on every backend
+        if ttl <= 0:
+            self.client.delete(self.prefix + key)
+            return
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        # WHY: Only safe on a database dedicated to this cache
+        self.client.flushdb()
+
+
+# --------------------- TOOL CACHE --------------------- #
+class ToolCache:
+    """
+    Namespaced cache with per-tool TTLs, negative caching and hit/miss metrics.
+
+    WHY: Each tool (geocode, weather, places) has very different freshness needs,
+    so TTLs are looked up per namespace from config.yaml.
+    """
+
+    def __init__(self, backend: CacheBackend, settings: Dict):
+        self.backend = backend
+        self.settings = settings
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "negative_hits": 0, "misses": 0, "sets": 0}
+        )
+
+    def ttl_for(self, namespace: str, negative: bool = False) -> float:
+        if negative:
+            return self.settings["negative_ttl"]
+        return self.settings["ttl"].get(namespace, self.settings["default_ttl"])
+
+    def get(self, namespace: str, key: str, is_negative: Callable[[Any], bool] = None) -> Any:
+        """Return the cached value, or MISSING. Updates metrics."""
+        value = self.backend.get(f"{namespace}:{key}")
+        stats = self._stats[namespace]
+        if value is MISSING:
+            stats["misses"] += 1
+        elif is_negative is not None and is_negative(value):
+            stats["negative_hits"] += 1
+        else:
+            stats["hits"] += 1
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, negative: bool = False, ttl: Optional[float] = None):
+        """Store a value; `ttl` overrides the namespace TTL from config (0 expires at once)."""
+        if ttl is None:
+            ttl = self.ttl_for(namespace, negative)
+        self.backend.set(f"{namespace}:{key}", value, ttl)
+        self._stats[namespace]["sets"] += 1
+
+    async def aget(self, namespace: str, key: str, is_negative: Callable[[Any], bool] = None) -> Any:
+        """Async get; blocking backends run in a worker thread."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.get, namespace, key, is_negative)
+        return self.get(namespace, key, is_negative)
+
+    async def aset(self, namespace: str, key: str, value: Any, negative: bool = False,
+                   ttl: Optional[float] = None):
+        """Async set; blocking backends run in a worker thread."""
+        if self.backend.blocking:
+            await asyncio.to_thread(self.set, namespace, key, value, negative, ttl)
+        else:
+            self.set(namespace, key, value, negative, ttl)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-namespace hit/miss counters plus hit ratio."""
+        result = {}
+        for namespace, counts in self._stats.items():
+            lookups = counts["hits"] + counts["negative_hits"] + counts["misses"]
+            hit_ratio = (counts["hits"] + counts["negative_hits"]) / lookups if lookups else 0.0
+            result[namespace] = {**counts, "hit_ratio": round(hit_ratio, 4)}
+        result["_backend"] = {
+            "type": type(self.backend).__name__,
+            "evictions": getattr(self.backend, "evictions", 0),
+        }
+        return result
+
+
+def create_backend(settings: Dict) -> CacheBackend:
+    """Instantiate the backend named in settings['backend']."""
+    backend = settings["backend"]
+    if backend == "memory":
+        return MemoryCache(max_entries=settings["max_entries"])
+    if backend == "sqlite":
+        return SQLiteCache(resolve_path(settings["sqlite_path"]), max_entries=settings["max_entries"])
+    if backend == "redis":
+        return RedisCache(settings["redis_url"])
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+_tool_cache: Optional[ToolCache] = None
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolCache:
+    """Return the process-wide ToolCache configured from config.yaml."""
+    global _tool_cache
+    if _tool_cache is None:
+        with _tool_cache_lock:
+            if _tool_cache is None:
+                settings = {**DEFAULT_CACHE_SETTINGS, **(load_config().get("cache") or {})}
+                _tool_cache = ToolCache(create_backend(settings), settings)
+    return _tool_cache
+
+
+def set_tool_cache(cache: Optional[ToolCache]):
+    """Replace the process-wide cache (None resets it to the configured one)."""
+    global _tool_cache
+    _tool_cache = cache
+
+
+def cached(
+    namespace: str,
+    key: Callable[..., str],
+    is_negative: Callable[[Any], bool] = None,
+    decode: Callable[[Any], Any] = None,
+):
+    """
+    Cache a sync or async function's result in the tool cache.
+
+    Args:
+        namespace: Cache namespace; also selects the TTL from config (cache.ttl.<namespace>)
+        key: Builds the cache key from the function's arguments (normalize here)
+        is_negative: Marks results like "city not found"; cached with negative_ttl
+        decode: Rebuilds the return value from its JSON form (e.g. list -> tuple)
+
+    Exceptions are never cached.
+    """
+    decode = decode or (lambda value: value)
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache = get_tool_cache()
+                cache_key = key(*args, **kwargs)
+                value = await cache.aget(namespace, cache_key, is_negative)
+                if value is not MISSING:
+                    return decode(value)
+
+                result = await func(*args, **kwargs)
+                await cache.aset(namespace, cache_key, result, bool(is_negative and is_negative(result)))
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_tool_cache()
+            cache_key = key(*args, **kwargs)
+            value = cache.get(namespace, cache_key, is_negative)
+            if value is not MISSING:
+                return decode(value)
+
+            result = func(*args, **kwargs)
+            cache.set(namespace, cache_key, result, bool(is_negative and is_negative(result)))
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,295 @@
+"""
+Checkpoint Retention and Compaction
+
+WHY: Every graph step writes a full checkpoint, so checkpoints.db grew without
+bound and everything that scans it (session listing, backups) slowed down
+every day. This job keeps the DB small enough to stay in the page cache:
+
+1. Keeps only the latest N checkpoints per conversation thread
+2. Prunes pending writes of superseded checkpoints (only the latest one's
+   writes are needed to resume a thread)
+3. Deletes threads (and their session index/log rows) idle for longer than a TTL
+4. Returns free pages to the OS with incremental VACUUM
+
+Deletes run in small batches so a concurrent turn never waits long for the
+write lock. Settings live under "checkpoint_retention" in config.yaml.
+
+New DBs are created with auto_vacuum=INCREMENTAL (utils/checkpoint_store).
+A DB created before that needs one full VACUUM to switch modes; it holds an
+exclusive lock for as long as it takes to rewrite the file, so it only runs
+from the command line (--full-vacuum), in a maintenance window, never from
+the API's background loop.
+
+Usage (from the backend directory):
+    python -m travel_planner.utils.checkpoint_retention --keep-last 10 --idle-ttl-days 30
+    python -m travel_planner.utils.checkpoint_retention --full-vacuum   # one-off migration
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from travel_planner.utils.checkpoint_store import checkpoint_db_path, connect
+from travel_planner.utils.config_loader import load_config
+from travel_planner.utils.session_index import DELETE_SESSION
+
+
+DEFAULT_RETENTION_SETTINGS = {
+    "enabled": True,            # Run as a background task in the API server
+    "interval_minutes": 60,
+    "keep_last": 10,            # Checkpoints kept per thread (0 keeps all)
+    "idle_ttl_days": 30,        # Delete threads idle longer than this (0 disables)
+    "batch_size": 500,          # Rows deleted per transaction
+    "vacuum_pages": 2000,       # Free pages released per run (0 disables)
+}
+
+# 100ns intervals between the UUID epoch (1582-10-15) and the Unix epoch
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+logger = logging.getLogger("travel_planner")
+_settings: Optional[Dict] = None
+
+
+def get_retention_settings() -> Dict:
+    """Return retention settings from config.yaml merged over the defaults."""
+    global _settings
+    if _settings is None:
+        _settings = {**DEFAULT_RETENTION_SETTINGS, **(load_config().get("checkpoint_retention") or {})}
+    return _settings
+
+
+def checkpoint_id_at(timestamp: float) -> str:
+    """
+    Smallest checkpoint id created at `timestamp` (Unix seconds).
+
+    WHY: LangGraph checkpoint ids are UUIDv6, whose hex form sorts by creation
+    time, so "idle since" becomes a plain string comparison on an indexed
+    column instead of deserializing every checkpoint to read its ts.
+    """
+    ticks = int(timestamp * 10_000_000) + _UUID_EPOCH_OFFSET
+    time_high, time_mid, time_low = ticks >> 28, (ticks >> 12) & 0xFFFF, ticks & 0xFFF
+    return str(uuid.UUID(f"{time_high:08x}{time_mid:04x}6{time_low:03x}8000000000000000"))
+
+
+def checkpoint_time(checkpoint_id: str) -> float:
+    """Creation time (Unix seconds) encoded in a UUIDv6 checkpoint id."""
+    value = uuid.UUID(checkpoint_id).int
+    ticks = ((value >> 96) << 28) | (((value >> 80) & 0xFFFF) << 12) | ((value >> 64) & 0xFFF)
+    return (ticks - _UUID_EPOCH_OFFSET) / 10_000_000
+
+
+def _delete_in_batches(conn: sqlite3.Connection, select_rowids: str, table: str,
+                       params: tuple, batch_size: int) -> int:
+    """Delete rows whose rowids `select_rowids` returns, batch_size per transaction."""
+    deleted = 0
+    while True:
+        cur = conn.execute(
+            f"DELETE FROM {table} WHERE rowid IN ({select_rowids} LIMIT ?)",
+            (*params, batch_size),
+        )
+        conn.commit()
+        deleted += cur.rowcount
+        if cur.rowcount < batch_size:
+            return deleted
+
+
+def expire_idle_threads(conn: sqlite3.Connection, idle_ttl_days: float, batch_size: int) -> List[str]:
+    """Delete every checkpoint and write of threads idle longer than the TTL."""
+    cutoff = checkpoint_id_at(time.time() - idle_ttl_days * 86400)
+    threads = [row[0] for row in conn.execute(
+        "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(checkpoint_id) < ?",
+        (cutoff,),
+    )]
+    for thread_id in threads:
+        for table in ("writes", "checkpoints"):
+            _delete_in_batches(
+                conn, f"SELECT rowid FROM {table} WHERE thread_id = ?", table, (thread_id,), batch_size
+            )
+        if _has_table(conn, "sessions"):
+            for statement in DELETE_SESSION:
+                conn.execute(statement, (thread_id,))
+            conn.commit()
+    return threads
+
+
+def prune_checkpoints(conn: sqlite3.Connection, keep_last: int, batch_size: int) -> int:
+    """
+    Keep the latest `keep_last` checkpoints per thread and namespace.
+
+    WHY: Works one thread at a time below the keep_last-th newest id, so every
+    batch is a primary-key range delete instead of re-ranking the whole table.
+    """
+    groups = conn.execute(
+        "SELECT thread_id, checkpoint_ns FROM checkpoints GROUP BY thread_id, checkpoint_ns HAVING COUNT(*) > ?",
+        (keep_last,),
+    ).fetchall()
+    deleted = 0
+    for thread_id, checkpoint_ns in groups:
+        row = conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+            (thread_id, checkpoint_ns, keep_last - 1),
+        ).fetchone()
+        if row is None:
+            continue
+        deleted += _delete_in_batches(
+            conn,
+            "SELECT rowid FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+            "checkpoints",
+            (thread_id, checkpoint_ns, row[0]),
+            batch_size,
+        )
+    return deleted
+
+
+def prune_writes(conn: sqlite3.Connection, batch_size: int) -> int:
+    """Delete pending writes of every checkpoint except each thread's latest."""
+    # WHY: Latest checkpoint per thread/namespace resolved once (None if the
+    # thread has no checkpoints left), then range deletes on the writes key
+    groups = conn.execute(
+        """SELECT w.thread_id, w.checkpoint_ns, (
+               SELECT MAX(c.checkpoint_id) FROM checkpoints c
+               WHERE c.thread_id = w.thread_id AND c.checkpoint_ns = w.checkpoint_ns
+           ), MIN(w.checkpoint_id)
+           FROM writes w GROUP BY w.thread_id, w.checkpoint_ns"""
+    ).fetchall()
+    deleted = 0
+    for thread_id, checkpoint_ns, latest, oldest_write in groups:
+        where, params = "thread_id = ? AND checkpoint_ns = ?", (thread_id, checkpoint_ns)
+        if latest is not None:
+            if oldest_write >= latest:
+                continue
+            where, params = where + " AND checkpoint_id < ?", (*params, latest)
+        deleted += _delete_in_batches(conn, f"SELECT rowid FROM writes WHERE {where}", "writes", params, batch_size)
+    return deleted
+
+
+def incremental_vacuum(conn: sqlite3.Connection, pages: int) -> int:
+    """
+    Release up to `pages` free pages to the OS and return how many were freed.
+
+    WHY: incremental_vacuum is a no-op unless the DB uses auto_vacuum=INCREMENTAL;
+    an older DB is left alone until migrated with full_vacuum().
+    """
+    (mode,) = conn.execute("PRAGMA auto_vacuum").fetchone()
+    if mode != 2:
+        logger.warning(
+            "Checkpoint DB is not in auto_vacuum=INCREMENTAL mode, so free pages are not released; "
+            "run `python -m travel_planner.utils.checkpoint_retention --full-vacuum` in a maintenance window"
+        )
+        return 0
+    (before,) = conn.execute("PRAGMA freelist_count").fetchone()
+    conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    (after,) = conn.execute("PRAGMA freelist_count").fetchone()
+    # WHY: Fold the WAL back into the DB file so the freed space is really gone
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return before - after
+
+
+def full_vacuum(conn: sqlite3.Connection):
+    """
+    Switch the DB to auto_vacuum=INCREMENTAL and rebuild it with a full VACUUM.
+
+    WHY: Rewrites the whole file under an exclusive lock, so concurrent
+    checkpoint writes fail once busy_timeout runs out; CLI/maintenance only.
+    """
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def compact_checkpoints(db_path: Optional[str] = None, full: bool = False, **overrides) -> Dict:
+    """
+    Run one retention/compaction pass.
+
+    Args:
+        db_path: Checkpoint DB (defaults to checkpoints.path in config.yaml)
+        full: Finish with a full VACUUM (the one-off auto_vacuum migration)
+            instead of an incremental one; never from the background loop
+        **overrides: Any retention setting, e.g. keep_last=5
+
+    Returns:
+        Counts of what was removed plus the DB size before and after
+    """
+    cfg = {**get_retention_settings(), **{k: v for k, v in overrides.items() if v is not None}}
+    db_path = checkpoint_db_path(db_path)
+    stats = {"expired_threads": 0, "checkpoints_deleted": 0, "writes_deleted": 0, "pages_freed": 0}
+    if not os.path.exists(db_path):
+        return stats
+
+    started = time.perf_counter()
+    stats["size_before_bytes"] = os.path.getsize(db_path)
+    conn = connect(db_path)
+    try:
+        if not (_has_table(conn, "checkpoints") and _has_table(conn, "writes")):
+            return stats
+        batch_size = int(cfg["batch_size"])
+        if cfg["idle_ttl_days"]:
+            stats["expired_threads"] = len(expire_idle_threads(conn, float(cfg["idle_ttl_days"]), batch_size))
+        if cfg["keep_last"]:
+            stats["checkpoints_deleted"] = prune_checkpoints(conn, int(cfg["keep_last"]), batch_size)
+        stats["writes_deleted"] = prune_writes(conn, batch_size)
+        if full:
+            full_vacuum(conn)
+        elif cfg["vacuum_pages"]:
+            stats["pages_freed"] = incremental_vacuum(conn, int(cfg["vacuum_pages"]))
+    finally:
+        conn.close()
+    stats["size_after_bytes"] = os.path.getsize(db_path)
+    stats["duration_s"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+async def retention_loop(db_path: Optional[str] = None):
+    """
+    Run compact_checkpoints every interval_minutes until cancelled.
+
+    WHY: The pass runs in a worker thread so the event loop keeps serving turns,
+    and only ever vacuums incrementally so it never locks out checkpoint writes.
+    """
+    interval = float(get_retention_settings()["interval_minutes"]) * 60
+    while True:
+        try:
+            stats = await asyncio.to_thread(compact_checkpoints, db_path)
+            logger.info(f"Checkpoint retention pass finished: {stats}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Checkpoint retention pass failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune and compact the LangGraph checkpoint DB")
+    parser.add_argument("--db", help="Checkpoint DB path (default: checkpoints.path in config.yaml)")
+    parser.add_argument("--keep-last", type=int, help="Checkpoints kept per thread (0 keeps all)")
+    parser.add_argument("--idle-ttl-days", type=float, help="Delete threads idle longer than this (0 disables)")
+    parser.add_argument("--vacuum-pages", type=int, help="Free pages released (0 disables)")
+    parser.add_argument("--full-vacuum", action="store_true",
+                        help="Switch an older DB to auto_vacuum=INCREMENTAL with a full VACUUM "
+                             "(locks the DB; run with the API stopped)")
+    args = parser.parse_args()
+    stats = compact_checkpoints(
+        args.db,
+        full=args.full_vacuum,
+        keep_last=args.keep_last,
+        idle_ttl_days=args.idle_ttl_days,
+        vacuum_pages=args.vacuum_pages,
+    )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
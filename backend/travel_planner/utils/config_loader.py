@@ -1,7 +1,47 @@
+"""
+Config Loading
+
+WHY: Every get_*_settings() reads config.yaml, and the path used to be
+relative to the current working directory, so the server only started from
+backend/. Relative paths are now resolved against the backend directory and
+each file is parsed once per process (with libyaml when available).
+"""
+
+import copy
+import os
+import threading
+from typing import Any, Dict
+
 import yaml
 
-def load_config(path="travel_planner/config/config.yaml"):
-    """Read config.yaml and return dictionary."""
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
 
+# WHY: Relative paths in config are resolved against the backend directory,
+# the same place GraphBuilder keeps data/checkpoints.db
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+CONFIG_PATH = "travel_planner/config/config.yaml"
+
+# WHY: The C loader parses several times faster; PyYAML without libyaml lacks it
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_parsed: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def resolve_path(path: str) -> str:
+    """Absolute path for `path`, taking relative paths from the backend directory."""
+    return path if os.path.isabs(path) else os.path.join(BACKEND_DIR, path)
+
+
+def load_config(path=CONFIG_PATH):
+    """Read config.yaml and return dictionary."""
+    path = resolve_path(path)
+    config = _parsed.get(path)
+    if config is None:
+        with _lock:
+            config = _parsed.get(path)
+            if config is None:
+                with open(path, "r") as f:
+                    config = yaml.load(f, Loader=_Loader)
+                _parsed[path] = config
+    # WHY: A copy, so a caller editing its settings can't change everyone else's
+    return copy.deepcopy(config)
@@ -6,21 +6,69 @@ Smart retry logic makes the system resilient without wasting resources on perman
 """
 
 import time
+import random
+import asyncio
 import functools
-from typing import Callable
-import requests
+from typing import Callable, Optional
+import httpx
+from travel_planner.utils.resilience import is_transient_failure
 
 
-def retry_on_error(max_attempts: int = 2, delay: float = 1.0):
+def _root_error(e: Exception) -> Exception:
+    """
+    Return the underlying network error for an exception.
+    
+    WHY: Tool helpers wrap httpx errors in friendly ValueErrors
+    (raise ValueError(...) from e); retry decisions need the original.
+    """
+    if isinstance(e, ValueError) and isinstance(e.__cause__, httpx.HTTPError):
+        return e.__cause__
+    return e
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    """Seconds requested by a 429/503 Retry-After header, if any."""
+    if isinstance(e, httpx.HTTPStatusError):
+        value = e.response.headers.get("Retry-After", "")
+        if value.isdigit():
+            return float(value)
+    return None
+
+
+def _backoff_delay(attempt: int, delay: float, backoff: float, max_delay: float,
+                   jitter: bool, error: Exception) -> float:
+    """
+    Exponential backoff with "equal jitter", honouring Retry-After.
+    
+    WHY: Jitter spreads retries from many concurrent requests so they don't
+    hit a recovering provider in lockstep.
+    """
+    wait = min(max_delay, delay * (backoff ** (attempt - 1)))
+    if jitter:
+        wait = wait / 2 + random.uniform(0, wait / 2)
+    retry_after = _retry_after(error)
+    if retry_after is not None:
+        wait = min(max_delay, max(wait, retry_after))
+    return wait
+
+
+def retry_on_error(max_attempts: int = 2, delay: float = 1.0, backoff: float = 2.0,
+                   max_delay: float = 10.0, jitter: bool = True):
     """
     Decorator to retry function calls on specific errors.
     
     WHY: Retry logic should be centralized and reusable across all tools.
-    We only retry transient errors (timeout, rate limit, server error).
+    We only retry transient errors (timeout, rate limit, server error); an
+    open circuit breaker is never retried so outages fail fast.
+    Works on both sync and async functions; async functions wait with
+    asyncio.sleep so retries never block the event loop.
     
     Args:
         max_attempts: Maximum number of attempts (including first call)
-        delay: Seconds to wait between retries
+        delay: Base seconds to wait before the first retry
+        backoff: Multiplier applied to the wait after each failed attempt
+        max_delay: Upper bound for a single wait
+        jitter: Randomize each wait between 50% and 100% of its value
         
     Usage:
         @retry_on_error(max_attempts=2, delay=1.0)
@@ -28,50 +76,29 @@ def retry_on_error(max_attempts: int = 2, delay: float = 1.0):
             ...
     """
     def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                for attempt in range(1, max_attempts + 1):
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception as e:
+                        root = _root_error(e)
+                        if not is_transient_failure(root) or attempt == max_attempts:
+                            raise
+                        await asyncio.sleep(_backoff_delay(attempt, delay, backoff, max_delay, jitter, root))
+            return async_wrapper
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            last_exception = None
-            
             for attempt in range(1, max_attempts + 1):
                 try:
                     return func(*args, **kwargs)
-                    
-                except requests.exceptions.Timeout as e:
-                    # WHY: Timeout errors are transient, worth retrying
-                    last_exception = e
-                    if attempt < max_attempts:
-                        time.sleep(delay)
-                        continue
-                        
-                except requests.exceptions.HTTPError as e:
-                    # WHY: Only retry on rate limits (429) and server errors (5xx)
-                    # Don't retry on client errors (4xx) as they won't succeed
-                    if e.response is not None:
-                        status_code = e.response.status_code
-                        
-                        # Retry on rate limit or server error
-                        if status_code == 429 or status_code >= 500:
-                            last_exception = e
-                            if attempt < max_attempts:
-                                time.sleep(delay)
-                                continue
-                    
-                    # Don't retry on other HTTP errors (404, 400, etc.)
-                    raise
-                    
-                except requests.exceptions.RequestException as e:
-                    # WHY: Connection errors might be transient
-                    last_exception = e
-                    if attempt < max_attempts:
-                        time.sleep(delay)
-                        continue
-                        
                 except Exception as e:
-                    # WHY: Don't retry on non-network errors (validation, etc.)
-                    raise
-            
-            # All attempts failed, raise the last exception
-            raise last_exception
+                    root = _root_error(e)
+                    if not is_transient_failure(root) or attempt == max_attempts:
+                        raise
+                    time.sleep(_backoff_delay(attempt, delay, backoff, max_delay, jitter, root))
             
         return wrapper
     return decorator
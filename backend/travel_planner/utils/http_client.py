@@ -0,0 +1,225 @@
+"""
+Shared HTTP Client Layer for External APIs
+
+WHY: Calling bare requests.get opens a new TCP+TLS connection for every call.
+A single itinerary fires 5-10 Geoapify/OpenWeather calls, so handshakes dominate
+tool latency. One pooled client per host keeps connections alive and caps how
+many we open against each provider.
+
+Both sync (tools run from the CLI / worker threads) and async (tools run from
+graph.ainvoke in the API) entry points share the same settings.
+"""
+
+import asyncio
+import importlib.util
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from travel_planner.utils.config_loader import load_config
+from travel_planner.utils.metrics import HTTP_REQUEST_SECONDS
+from travel_planner.utils.resilience import get_guard
+from travel_planner.utils.tracing import span
+
+
+# WHY: Sensible defaults if config.yaml has no "http" section
+DEFAULT_HTTP_SETTINGS = {
+    "timeout": 10.0,                # Read/write/pool timeout (seconds)
+    "connect_timeout": 5.0,         # TCP + TLS handshake timeout (seconds)
+    "max_connections_per_host": 20,
+    "max_keepalive_per_host": 10,
+    "keepalive_expiry": 30.0,       # Idle keep-alive connection lifetime (seconds)
+    "http2": True,                  # Only used if the 'h2' package is installed
+}
+
+_lock = threading.Lock()
+_settings: Optional[Dict] = None
+_clients: Dict[str, httpx.Client] = {}
+# WHY: Per event loop: (task that closes the loop's clients, clients by host)
+_async_clients: Dict[asyncio.AbstractEventLoop, Tuple[asyncio.Task, Dict[str, httpx.AsyncClient]]] = {}
+
+
+def get_http_settings() -> Dict:
+    """Return HTTP settings from config.yaml merged over the defaults."""
+    global _settings
+    if _settings is None:
+        _settings = {**DEFAULT_HTTP_SETTINGS, **(load_config().get("http") or {})}
+    return _settings
+
+
+def _client_kwargs() -> Dict:
+    """Build the keyword arguments shared by sync and async clients."""
+    cfg = get_http_settings()
+    return {
+        "timeout": httpx.Timeout(cfg["timeout"], connect=cfg["connect_timeout"]),
+        "limits": httpx.Limits(
+            max_connections=cfg["max_connections_per_host"],
+            max_keepalive_connections=cfg["max_keepalive_per_host"],
+            keepalive_expiry=cfg["keepalive_expiry"],
+        ),
+        # WHY: HTTP/2 multiplexes requests over one connection, but needs the h2 extra
+        "http2": bool(cfg["http2"]) and importlib.util.find_spec("h2") is not None,
+    }
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def _status(e: httpx.HTTPError) -> str:
+    """Metrics label for a failed call: the HTTP status, or the transport error type."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return str(e.response.status_code)
+    return type(e).__name__
+
+
+def get_client(url: str) -> httpx.Client:
+    """
+    Return the pooled sync client for the host of `url`.
+
+    WHY: One client per host gives each provider its own connection limit,
+    so a slow provider can't starve connections to the others.
+    """
+    host = _host(url)
+    client = _clients.get(host)
+    if client is None:
+        with _lock:
+            client = _clients.get(host)
+            if client is None:
+                client = httpx.Client(**_client_kwargs())
+                _clients[host] = client
+    return client
+
+
+async def _close_with_loop(loop: asyncio.AbstractEventLoop, clients: Dict[str, httpx.AsyncClient]):
+    """
+    Wait until cancelled, then close the loop's clients.
+
+    WHY: asyncio.run cancels leftover tasks and lets them finish before it
+    closes the loop, so the pooled connections are closed while their loop
+    can still run the close, instead of leaking with every asyncio.run.
+    """
+    try:
+        await loop.create_future()
+    except asyncio.CancelledError:
+        for client in list(clients.values()):
+            await client.aclose()
+        raise
+    finally:
+        with _lock:
+            _async_clients.pop(loop, None)
+
+
+def get_async_client(url: str) -> httpx.AsyncClient:
+    """
+    Return the pooled async client for the host of `url`.
+
+    WHY: httpx.AsyncClient is bound to the event loop it first ran on, so
+    clients are kept per running loop (e.g. asyncio.run in scripts, or a
+    worker thread with its own loop) and closed when that loop shuts down.
+    """
+    host = _host(url)
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        with _lock:
+            # WHY: A loop closed without cancelling its tasks can't close its clients;
+            # at least drop them so their sockets are released
+            for stale in [l for l in _async_clients if l.is_closed()]:
+                del _async_clients[stale]
+            clients: Dict[str, httpx.AsyncClient] = {}
+            entry = (loop.create_task(_close_with_loop(loop, clients)), clients)
+            _async_clients[loop] = entry
+    clients = entry[1]
+    client = clients.get(host)
+    if client is None:
+        client = httpx.AsyncClient(**_client_kwargs())
+        clients[host] = client
+    return client
+
+
+def http_get(url: str, params: Optional[Dict] = None) -> httpx.Response:
+    """
+    GET through the shared pool and raise on HTTP error status.
+
+    WHY: Every call passes the host's rate limiter and circuit breaker
+    (utils/resilience), so an outage fails fast instead of burning timeouts.
+
+    Raises:
+        httpx.TimeoutException, httpx.HTTPStatusError, httpx.RequestError,
+        CircuitOpenError (a RequestError) when the provider's circuit is open
+    """
+    host = _host(url)
+    guard = get_guard(host)
+    guard.breaker.before_call()
+    try:
+        # WHY: Inside the try, so a request cancelled while waiting for a token
+        # still releases a half-open trial granted by before_call
+        guard.limiter.acquire()
+        started = time.perf_counter()
+        with span(f"http GET {host}", path=urlsplit(url).path) as current:
+            response = get_client(url).get(url, params=params)
+            if current:
+                current.set(status=response.status_code)
+            response.raise_for_status()
+    except httpx.HTTPError as e:
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, host, _status(e))
+        guard.record(e)
+        raise
+    except BaseException:
+        # WHY: e.g. a cancelled request; don't leave a half-open trial hanging
+        guard.breaker.cancel_trial()
+        raise
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, host, response.status_code)
+    guard.record(None)
+    return response
+
+
+async def ahttp_get(url: str, params: Optional[Dict] = None) -> httpx.Response:
+    """Async version of http_get (waits for rate-limit tokens with asyncio.sleep)."""
+    host = _host(url)
+    guard = get_guard(host)
+    guard.breaker.before_call()
+    try:
+        # WHY: Inside the try, so a request cancelled while waiting for a token
+        # still releases a half-open trial granted by before_call
+        await guard.limiter.aacquire()
+        started = time.perf_counter()
+        with span(f"http GET {host}", path=urlsplit(url).path) as current:
+            response = await get_async_client(url).get(url, params=params)
+            if current:
+                current.set(status=response.status_code)
+            response.raise_for_status()
+    except httpx.HTTPError as e:
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, host, _status(e))
+        guard.record(e)
+        raise
+    except BaseException:
+        # WHY: e.g. a cancelled request; don't leave a half-open trial hanging
+        guard.breaker.cancel_trial()
+        raise
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, host, response.status_code)
+    guard.record(None)
+    return response
+
+
+def close_clients():
+    """Close all pooled sync clients."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+async def aclose_clients():
+    """Close the sync clients and the running loop's async clients (call on server shutdown)."""
+    close_clients()
+    entry = _async_clients.get(asyncio.get_running_loop())
+    if entry is not None:
+        closer = entry[0]
+        closer.cancel()
+        # WHY: The closer does the actual aclose() once cancelled
+        await asyncio.gather(closer, return_exceptions=True)
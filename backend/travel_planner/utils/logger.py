@@ -3,13 +3,74 @@ Structured Logging Module
 
 Production-grade JSON logging for monitoring, debugging, and audit trails.
 WHY: Structured logs enable easy parsing, querying, and integration with monitoring tools.
+
+Handlers don't run on the caller's thread: the logger only puts records on a
+queue (QueueHandler), and a background QueueListener formats and writes them.
+A logger.info inside an async endpoint therefore never blocks the event loop
+on disk or terminal I/O. The file is rotated by size, and high-volume success
+lines can be sampled.
+
+Settings live under "logging" in config.yaml.
 """
 
-import logging
+import atexit
+import importlib.util
 import json
-import os
-from datetime import datetime
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+import time
 from pathlib import Path
+from typing import Dict, Optional
+
+from travel_planner.utils.config_loader import load_config, resolve_path
+from travel_planner.utils.tracing import current_ids
+
+
+DEFAULT_LOGGING_SETTINGS = {
+    "dir": "logs",                  # Relative paths are resolved against backend/
+    "file": "agent.log",
+    "max_bytes": 10 * 1024 * 1024,  # Rotate agent.log at this size
+    "backup_count": 5,              # Rotated files kept (agent.log.1 ... .5)
+    "queue_size": 10000,            # Records waiting for the writer; 0 = unbounded
+    "success_sample_rate": 1.0,     # Fraction of INFO success=True lines kept
+    "console_level": "INFO",
+    "file_level": "DEBUG",
+}
+
+# WHY: Fields passed via extra={...} that end up in the JSON line
+EXTRA_FIELDS = (
+    'query', 'tools_used', 'errors', 'error', 'latency_ms', 'success', 'output_score',
+    'session_id', 'trace_id', 'span_id', 'sample_rate',
+)
+
+_settings: Optional[Dict] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+_listener_lock = threading.Lock()
+
+
+def get_logging_settings() -> Dict:
+    """Return logging settings from config.yaml merged over the defaults."""
+    global _settings
+    if _settings is None:
+        _settings = {**DEFAULT_LOGGING_SETTINGS, **(load_config().get("logging") or {})}
+    return _settings
+
+
+# WHY: orjson encodes several times faster than json.dumps, but is optional
+if importlib.util.find_spec("orjson") is not None:
+    import orjson
+
+    def _dumps(data: Dict) -> str:
+        return orjson.dumps(data, default=str).decode()
+else:
+    _encoder = json.JSONEncoder(default=str)
+
+    def _dumps(data: Dict) -> str:
+        return _encoder.encode(data)
 
 
 class JsonFormatter(logging.Formatter):
@@ -17,72 +78,181 @@ class JsonFormatter(logging.Formatter):
     Custom formatter that outputs logs in JSON format.
     WHY: JSON logs are machine-readable and easily indexable by log aggregators.
     """
-    
+
+    def __init__(self):
+        super().__init__()
+        self._second = None
+        self._prefix = ""
+
+    def _timestamp(self, created: float) -> str:
+        # WHY: Uses the record's creation time (the writer thread formats later);
+        # the strftime part only changes once per second, so it's cached
+        second = int(created)
+        if second != self._second:
+            self._second = second
+            self._prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        return f"{self._prefix}.{int((created - second) * 1e6):06d}Z"
+
     def format(self, record):
         log_data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "message": record.getMessage(),
         }
-        
+
         # Add extra fields if they exist
         # WHY: Allows us to include context like query, tools_used, latency, etc.
-        if hasattr(record, 'query'):
-            log_data['query'] = record.query
-        if hasattr(record, 'tools_used'):
-            log_data['tools_used'] = record.tools_used
-        if hasattr(record, 'errors'):
-            log_data['errors'] = record.errors
-        if hasattr(record, 'latency_ms'):
-            log_data['latency_ms'] = record.latency_ms
-        if hasattr(record, 'success'):
-            log_data['success'] = record.success
-            
-        return json.dumps(log_data)
-
-
-def setup_logger(name: str = "travel_planner", log_dir: str = "logs") -> logging.Logger:
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                log_data[field] = value
+        if record.exc_text:
+            log_data['exception'] = record.exc_text
+
+        return _dumps(log_data)
+
+
+class TraceContextFilter(logging.Filter):
+    """
+    Stamps records with the current trace_id, span_id and session_id.
+
+    WHY: Runs in the thread that logs, so the ids come from the request's
+    context even though the record is formatted by the writer thread.
+    """
+
+    def filter(self, record):
+        trace_id, span_id, session_id = current_ids()
+        if trace_id:
+            record.trace_id, record.span_id = trace_id, span_id
+        if session_id and not getattr(record, 'session_id', None):
+            record.session_id = session_id
+        return True
+
+
+class SuccessSamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of INFO lines logged with success=True.
+
+    WHY: Every successful turn logs 2-3 lines; under load they dwarf the
+    warnings and errors. Kept lines carry sample_rate so counts can be scaled.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if self.rate >= 1.0 or record.levelno != logging.INFO or getattr(record, 'success', None) is not True:
+            return True
+        if random.random() >= self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that drops records when the queue is full instead of blocking.
+
+    WHY: A stalled disk must not stall requests; dropped records are counted
+    (travel_planner_log_records_dropped_total in GET /metrics).
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # WHY: The stdlib version formats the whole line here, on the caller's
+        # thread; only resolve what can't wait (mutable args, the traceback)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _stop_listener():
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def setup_logger(name: str = "travel_planner", log_dir: Optional[str] = None) -> logging.Logger:
     """
     Setup structured logger with file and console handlers.
-    
+
     WHY: Separating console (INFO) and file (DEBUG) logs allows detailed
     debugging without overwhelming terminal output.
-    
+
     Args:
         name: Logger name
-        log_dir: Directory for log files (auto-created)
-        
+        log_dir: Directory for log files (auto-created; default from config.yaml,
+            relative paths resolved against backend/)
+
     Returns:
         Configured logger instance
     """
+    global _listener, _queue_handler
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
-    
+
     # Avoid duplicate handlers if logger already configured
     if logger.handlers:
         return logger
-    
+
+    cfg = get_logging_settings()
+
     # Create logs directory if it doesn't exist
     # WHY: Automatic directory creation makes deployment easier
-    log_path = Path(log_dir)
+    log_path = Path(resolve_path(log_dir or cfg["dir"]))
     log_path.mkdir(exist_ok=True)
-    
-    # File handler - JSON format, DEBUG level
+
+    # File handler - JSON format, DEBUG level, rotated by size
     # WHY: File gets detailed logs for debugging and audit
-    file_handler = logging.FileHandler(log_path / "agent.log")
-    file_handler.setLevel(logging.DEBUG)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_path / cfg["file"], maxBytes=cfg["max_bytes"], backupCount=cfg["backup_count"]
+    )
+    file_handler.setLevel(cfg["file_level"])
     file_handler.setFormatter(JsonFormatter())
-    
-    # Console handler - Plain format, INFO level  
+
+    # Console handler - Plain format, INFO level
     # WHY: Console gets readable logs for monitoring, not too verbose
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
+    console_handler.setLevel(cfg["console_level"])
     console_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     console_handler.setFormatter(console_formatter)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+
+    # WHY: The logger only enqueues; the listener thread formats and writes
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=cfg["queue_size"]))
+    queue_handler.addFilter(SuccessSamplingFilter(cfg["success_sample_rate"]))
+    queue_handler.addFilter(TraceContextFilter())
+    logger.addHandler(queue_handler)
+    _queue_handler = queue_handler
+
+    with _listener_lock:
+        _listener = logging.handlers.QueueListener(
+            queue_handler.queue, file_handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+    # WHY: Drains the queue on exit so the last records aren't lost
+    atexit.register(_stop_listener)
+
     return logger
+
+
+
+def dropped_records() -> int:
+    """Records dropped because the writer queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
@@ -0,0 +1,270 @@
+"""
+Prometheus-Style Metrics
+
+WHY: The only telemetry was a latency_ms field on the chat log line, so a
+slow turn could not be pinned on Gemini, Geoapify/OpenWeather or SQLite.
+Hot paths now record into in-process histograms and counters, which
+GET /metrics renders in the Prometheus text format:
+
+    travel_planner_chat_request_seconds     /api/chat and /api/chat/stream turns
+    travel_planner_graph_node_seconds       LangGraph nodes (agent, tools)
+    travel_planner_tool_call_seconds        each tool call, by tool and outcome
+    travel_planner_llm_call_seconds         each LLM call, by provider
+    travel_planner_llm_tokens               tokens per LLM call (input/output)
+    travel_planner_http_request_seconds     external API calls, by host and status
+    travel_planner_checkpoint_write_seconds checkpoint writes, by operation
+
+plus cache, single-flight, circuit-breaker, dropped-log and dropped-trace counters read from their own
+stats at scrape time. Observing is a bisect and an add under a lock; no
+dependency on prometheus_client. Values are per process, so with several
+uvicorn workers each scrape sees the worker that answered it.
+
+Settings live under "metrics" in config.yaml.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from travel_planner.utils.config_loader import load_config
+
+
+DEFAULT_METRICS_SETTINGS = {
+    "enabled": True,    # Record metrics and serve GET /metrics
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (64, 256, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "travel_planner_"
+
+_settings: Optional[Dict] = None
+
+
+def get_metrics_settings() -> Dict:
+    """Return metrics settings from config.yaml merged over the defaults."""
+    global _settings
+    if _settings is None:
+        _settings = {**DEFAULT_METRICS_SETTINGS, **(load_config().get("metrics") or {})}
+    return _settings
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ------------------ METRIC TYPES ------------------ #
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = PREFIX + name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        if not get_metrics_settings()["enabled"]:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labels) -> Iterator[None]:
+        """Observe the duration of a block (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = []
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+# ------------------ METRICS ------------------ #
+CHAT_REQUEST_SECONDS = Histogram(
+    "chat_request_seconds", "Chat turn latency", ["endpoint", "outcome"]
+)
+NODE_SECONDS = Histogram(
+    "graph_node_seconds", "LangGraph node latency", ["node"]
+)
+TOOL_CALL_SECONDS = Histogram(
+    "tool_call_seconds", "Tool call latency", ["tool", "outcome"]
+)
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_seconds", "LLM call latency", ["provider"]
+)
+LLM_TOKENS = Histogram(
+    "llm_tokens", "Tokens per LLM call", ["provider", "direction"], buckets=TOKEN_BUCKETS
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds", "External API call latency", ["host", "status"]
+)
+CHECKPOINT_WRITE_SECONDS = Histogram(
+    "checkpoint_write_seconds", "Checkpoint write latency (including the session index)", ["operation"]
+)
+
+_METRICS = [
+    CHAT_REQUEST_SECONDS, NODE_SECONDS, TOOL_CALL_SECONDS, LLM_CALL_SECONDS,
+    LLM_TOKENS, HTTP_REQUEST_SECONDS, CHECKPOINT_WRITE_SECONDS,
+]
+
+
+def record_llm_usage(provider: str, response, seconds: float):
+    """Record an LLM call's latency and token usage (if the provider reports it)."""
+    LLM_CALL_SECONDS.observe(seconds, provider)
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        LLM_TOKENS.observe(usage.get("input_tokens", 0), provider, "input")
+        LLM_TOKENS.observe(usage.get("output_tokens", 0), provider, "output")
+
+
+def _outcome(result) -> str:
+    # WHY: ToolNode turns tool exceptions into ToolMessages with status="error"
+    return "error" if getattr(result, "status", None) == "error" else "success"
+
+
+def time_tool_call(request, execute):
+    """ToolNode wrap_tool_call hook: time each tool call by name."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = execute(request)
+        outcome = _outcome(result)
+        return result
+    finally:
+        TOOL_CALL_SECONDS.observe(time.perf_counter() - started, request.tool_call["name"], outcome)
+
+
+async def atime_tool_call(request, execute):
+    """ToolNode awrap_tool_call hook: async version of time_tool_call."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await execute(request)
+        outcome = _outcome(result)
+        return result
+    finally:
+        TOOL_CALL_SECONDS.observe(time.perf_counter() - started, request.tool_call["name"], outcome)
+
+
+# ------------------ SCRAPE-TIME COLLECTORS ------------------ #
+Sample = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]  # name, kind, help, samples
+
+
+def _cache_samples() -> List[Sample]:
+    from travel_planner.utils.cache import get_tool_cache
+    stats = get_tool_cache().stats()
+    stats.pop("_backend", None)
+    samples = []
+    for field, kind, help in [
+        ("hits", "counter", "Tool cache hits"),
+        ("negative_hits", "counter", "Tool cache hits on cached not-found results"),
+        ("misses", "counter", "Tool cache misses"),
+        ("hit_ratio", "gauge", "Tool cache hit ratio (including negative hits)"),
+    ]:
+        values = [({"namespace": namespace}, counts[field]) for namespace, counts in stats.items()]
+        samples.append((f"cache_{field}" + ("_total" if kind == "counter" else ""), kind, help, values))
+    return samples
+
+
+def _single_flight_samples() -> List[Sample]:
+    from travel_planner.utils.singleflight import get_single_flight
+    stats = get_single_flight().stats()
+    return [
+        ("singleflight_calls_total", "counter", "Calls that reached the provider",
+         [({"namespace": ns}, counts["calls"]) for ns, counts in stats.items()]),
+        ("singleflight_shared_total", "counter", "Callers that shared another caller's in-flight call",
+         [({"namespace": ns}, counts["shared"]) for ns, counts in stats.items()]),
+    ]
+
+
+def _resilience_samples() -> List[Sample]:
+    from travel_planner.utils.resilience import get_resilience_stats
+    stats = get_resilience_stats()
+    states = {"closed": 0, "half_open": 1, "open": 2}
+    return [
+        ("circuit_state", "gauge", "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+         [({"host": host}, states.get(s["state"], -1)) for host, s in stats.items()]),
+        ("circuit_rejected_total", "counter", "Calls rejected by an open circuit",
+         [({"host": host}, s["rejected"]) for host, s in stats.items()]),
+        ("rate_limit_throttled_total", "counter", "Calls delayed by the client-side rate limiter",
+         [({"host": host}, s["throttled"]) for host, s in stats.items()]),
+    ]
+
+
+def _logging_samples() -> List[Sample]:
+    from travel_planner.utils.logger import dropped_records
+    return [
+        ("log_records_dropped_total", "counter", "Log records dropped because the writer queue was full",
+         [({}, dropped_records())]),
+    ]
+
+
+def _tracing_samples() -> List[Sample]:
+    from travel_planner.utils.tracing import exporter_stats
+    stats = exporter_stats()
+    return [
+        ("traces_dropped_total", "counter", "Traces dropped because the trace writer queue was full",
+         [({}, stats["dropped"])]),
+        ("traces_evicted_total", "counter", "Incomplete traces evicted after tracing.pending_ttl_s",
+         [({}, stats["evicted"])]),
+    ]
+
+
+_COLLECTORS: List[Callable[[], List[Sample]]] = [
+    _cache_samples, _single_flight_samples, _resilience_samples, _logging_samples, _tracing_samples,
+]
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.lines())
+    for collector in _COLLECTORS:
+        for name, kind, help, samples in collector():
+            lines.append(f"# HELP {PREFIX}{name} {help}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{PREFIX}{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+    return "\n".join(lines) + "\n"
@@ -1,9 +1,9 @@
 import os
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
 from travel_planner.utils.config_loader import load_config
 
+# WHY: Provider SDKs are imported inside their _load_* method. Importing all
+# three took ~1.6s at startup although a server only ever uses one of them.
+
 
 class ModelLoader:
     def __init__(self, provider: str = "groq"):
@@ -23,6 +23,9 @@ class ModelLoader:
         elif self.provider == "gemini":
             return self._load_gemini()
 
+        elif self.provider == "stub":
+            return self._load_stub()
+
         else:
             raise ValueError(f"Unknown LLM provider: {self.provider}")
 
@@ -33,6 +36,8 @@ class ModelLoader:
         if not api_key:
             raise ValueError("GROQ_API_KEY missing in environment variables")
 
+        from langchain_groq import ChatGroq
+
         return ChatGroq(
             api_key=api_key,
             model=cfg["model_name"],
@@ -53,6 +58,8 @@ class ModelLoader:
         if not api_key:
             raise ValueError("OPENAI_API_KEY missing in environment variables")
 
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             api_key=api_key,
             model=cfg["model_name"],
@@ -73,6 +80,8 @@ class ModelLoader:
         if not api_key:
             raise ValueError("GEMINI_API_KEY missing in environment variables")
 
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         return ChatGoogleGenerativeAI(
             model=cfg["model_name"],
             google_api_key=api_key,
@@ -81,3 +90,7 @@ class ModelLoader:
             timeout=cfg.get("timeout", 60),
         )
 
+    def _load_stub(self):
+        # WHY: Offline scripted model for load tests and CI; needs no API key
+        from travel_planner.utils.stub_llm import create_stub_llm
+        return create_stub_llm(self.config["llm"].get("stub"))
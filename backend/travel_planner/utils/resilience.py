@@ -0,0 +1,204 @@
+"""
+Client-Side Rate Limiting and Circuit Breaking for External APIs
+
+WHY: During a provider outage every request used to burn its full timeout
+(twice, with the retry), piling up stuck requests and blowing our p99.
+A circuit breaker per provider fails fast once the provider is clearly down
+and probes it again after a cool-down. A token bucket per provider keeps us
+under the provider's rate limit instead of discovering it through 429s.
+
+Both are applied to every call made through utils/http_client, keyed by host,
+and are async-aware: async callers wait for tokens with asyncio.sleep.
+
+States: closed (normal) -> open (fail fast) -> half_open (one trial call)
+        -> closed on success / open again on failure.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from travel_planner.utils.config_loader import load_config
+
+
+DEFAULT_PROVIDER_SETTINGS = {
+    "rate_per_sec": 10.0,       # Sustained requests per second
+    "burst": 20,                # Bucket size (requests allowed in a burst)
+    "failure_threshold": 5,     # Consecutive transient failures before opening
+    "recovery_timeout": 30.0,   # Seconds to stay open before a trial call
+}
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+def is_transient_failure(e: Exception) -> bool:
+    """
+    Failures that say the provider is unhealthy (counted by the breaker).
+
+    WHY: 404/401 mean the provider answered correctly; only timeouts,
+    connection errors, rate limits and 5xx indicate an outage.
+    """
+    if isinstance(e, CircuitOpenError):
+        return False
+    if isinstance(e, httpx.HTTPStatusError):
+        status_code = e.response.status_code
+        return status_code == 429 or status_code >= 500
+    return isinstance(e, httpx.RequestError)
+
+
+class TokenBucket:
+    """Token bucket rate limiter usable from threads and coroutines."""
+
+    def __init__(self, rate_per_sec: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.clock = clock
+        self.updated = clock()
+        self.throttled = 0
+        self.waited_s = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token (possibly going negative) and return how long to wait for it."""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            wait = -self.tokens / self.rate
+            self.throttled += 1
+            self.waited_s += wait
+            return wait
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        wait = self._reserve()
+        if wait:
+            # WHY: Never block the event loop while throttled
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.opened_count = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not go out."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.recovery_timeout:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} is unavailable (circuit open), failing fast")
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} is recovering (circuit half-open), failing fast")
+                self._trial_in_flight = True
+
+    def cancel_trial(self):
+        """Forget a half-open trial call that ended without an outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened_count += 1
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+                self._trial_in_flight = False
+
+
+class ProviderGuard:
+    """Rate limiter + circuit breaker for one provider (host)."""
+
+    def __init__(self, name: str, settings: Dict):
+        self.name = name
+        self.limiter = TokenBucket(settings["rate_per_sec"], settings["burst"])
+        self.breaker = CircuitBreaker(name, settings["failure_threshold"], settings["recovery_timeout"])
+
+    def record(self, error: Optional[Exception]):
+        """Record the outcome of a call (None means success)."""
+        if error is None or not is_transient_failure(error):
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "rejected": self.breaker.rejected,
+            "opened": self.breaker.opened_count,
+            "throttled": self.limiter.throttled,
+            "throttle_wait_s": round(self.limiter.waited_s, 3),
+        }
+
+
+_guards: Dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+_settings: Optional[Dict] = None
+
+
+def _provider_settings(name: str) -> Dict:
+    global _settings
+    if _settings is None:
+        _settings = load_config().get("resilience") or {}
+    defaults = {**DEFAULT_PROVIDER_SETTINGS, **(_settings.get("default") or {})}
+    return {**defaults, **((_settings.get("providers") or {}).get(name) or {})}
+
+
+def get_guard(name: str) -> ProviderGuard:
+    """Return the guard for a provider (host), creating it from config."""
+    guard = _guards.get(name)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(name)
+            if guard is None:
+                guard = ProviderGuard(name, _provider_settings(name))
+                _guards[name] = guard
+    return guard
+
+
+def get_resilience_stats() -> Dict[str, Dict]:
+    """Breaker state and limiter counters per provider."""
+    return {name: guard.stats() for name, guard in _guards.items()}
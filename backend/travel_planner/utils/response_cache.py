@@ -0,0 +1,263 @@
+"""
+Response Cache for Repeated Travel Queries
+
+WHY: Many users open a conversation with a near-identical question ("3 days
+in Goa under ₹10000", "weather in Chennai"), and each one ran the full agent
+loop: several LLM calls and tool round-trips, ~20s. With this cache enabled,
+the answer to a first-turn query is stored under a normalized key and
+replayed in milliseconds for the next user who asks the same thing.
+
+1. Queries are normalized: lowercased, filler words dropped, numbers and
+   currencies canonicalized ("₹10,000" / "10k rupees" -> "inr10000",
+   "three days" -> "3 day"), and the destination extracted
+2. The exact key is looked up in the tool cache ("responses" namespace), so
+   cached answers are shared by every worker on the sqlite/redis backends
+3. Optionally, if sentence-transformers is installed, a miss falls back to
+   an embedding-similarity lookup among recent queries for the same
+   destination (in process, never across destinations)
+
+Only first-turn (stateless) queries are cached: a follow-up's answer depends
+on the conversation so far. The TTL defaults to the weather TTL, since plans
+quote the current forecast. Settings live under "response_cache" in config.yaml.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
+
+from travel_planner.utils.cache import MISSING, ToolCache, get_tool_cache
+from travel_planner.utils.config_loader import load_config
+
+
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    "enabled": False,           # Opt-in: cached plans skip the agent entirely
+    "ttl": None,                # Seconds; None uses cache.ttl.weather
+    "min_output_score": 70,     # Only cache answers validate_agent_output scores at least this high
+    "similarity": {
+        "enabled": False,       # Needs the sentence-transformers package
+        "model": "all-MiniLM-L6-v2",
+        "threshold": 0.92,      # Cosine similarity needed to reuse another query's answer
+        "max_entries": 2000,    # Recent queries kept in the in-process index
+    },
+}
+
+NAMESPACE = "responses"
+
+_CURRENCIES = [
+    ("inr", r"₹|\brs\b\.?|\binr\b|\brupees?\b"),
+    ("usd", r"\$|\busd\b|\bdollars?\b"),
+    ("eur", r"€|\beur\b|\beuros?\b"),
+    ("gbp", r"£|\bgbp\b|\bpounds?\b"),
+]
+_CURRENCY_PATTERNS = [(code, re.compile(pattern)) for code, pattern in _CURRENCIES]
+_CODES = "|".join(code for code, _ in _CURRENCIES)
+_CODE_BEFORE = re.compile(rf"\b({_CODES})\s*(\d+)\b")
+_CODE_AFTER = re.compile(rf"\b(\d+)\s*({_CODES})\b")
+
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}\b)")
+_MULTIPLIERS = {
+    "k": 1_000, "thousand": 1_000,
+    "l": 100_000, "lac": 100_000, "lakh": 100_000, "lakhs": 100_000,
+    "m": 1_000_000, "million": 1_000_000,
+    "cr": 10_000_000, "crore": 10_000_000, "crores": 10_000_000,
+}
+_MAGNITUDE = re.compile(rf"\b(\d+(?:\.\d+)?)\s*({'|'.join(_MULTIPLIERS)})\b")
+_NUMBER_WORDS = {
+    word: str(number) for number, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve".split()
+    )
+}
+_NUMBER_WORD = re.compile(rf"\b({'|'.join(_NUMBER_WORDS)})\b")
+_UNITS = re.compile(r"\b(\d+)\s*-?\s*(day|night|week|person|people|persons|adult|kid)s?\b")
+_UNIT_NAMES = {"people": "person", "persons": "person"}
+
+_FILLER = {
+    "a", "an", "the", "please", "pls", "kindly", "can", "could", "would", "you",
+    "me", "i", "want", "need", "hi", "hey", "hello",
+}
+_DESTINATION = re.compile(
+    r"\b(?:in|to|at|visit|visiting|around|explore)\s+([a-z][a-z'-]*(?:\s+[a-z][a-z'-]*){0,2}?)"
+    r"(?=\s+(?:for|under|within|with|on|in|during|from|next|this|and|budget|trip|tour|itinerary|"
+    r"weather|today|tomorrow|day|night|week)\b|\s+\d|$)"
+)
+
+logger = logging.getLogger("travel_planner")
+_settings: Optional[Dict] = None
+_response_cache: Optional["ResponseCache"] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache_settings() -> Dict:
+    """Return response cache settings from config.yaml merged over the defaults."""
+    global _settings
+    if _settings is None:
+        config = load_config()
+        cfg = config.get("response_cache") or {}
+        _settings = {
+            **DEFAULT_RESPONSE_CACHE_SETTINGS,
+            **cfg,
+            "similarity": {**DEFAULT_RESPONSE_CACHE_SETTINGS["similarity"], **(cfg.get("similarity") or {})},
+        }
+        if not _settings["ttl"]:
+            # WHY: A cached plan quotes the forecast, so it goes stale with the weather data
+            _settings["ttl"] = ((config.get("cache") or {}).get("ttl") or {}).get("weather", 1800)
+    return _settings
+
+
+# ------------------ NORMALIZATION ------------------ #
+class NormalizedQuery(NamedTuple):
+    text: str           # Canonical query text
+    destination: str    # Extracted destination ("" if none was found)
+
+    @property
+    def key(self) -> str:
+        digest = hashlib.sha1(self.text.encode()).hexdigest()[:32]
+        return f"{self.destination or '-'}:{digest}"
+
+
+def _expand_magnitude(match: re.Match) -> str:
+    value = float(match.group(1)) * _MULTIPLIERS[match.group(2)]
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def _unit(match: re.Match) -> str:
+    unit = _UNIT_NAMES.get(match.group(2), match.group(2))
+    return f"{match.group(1)} {unit}"
+
+
+def normalize_query(query: str) -> NormalizedQuery:
+    """
+    Canonical form of a user query.
+
+    "Plan 3-days in Goa under Rs. 10k!" and "plan 3 days in goa under ₹10,000"
+    both become "plan 3 day in goa under inr10000" with destination "goa".
+    """
+    text = query.lower().strip()
+    for code, pattern in _CURRENCY_PATTERNS:
+        text = pattern.sub(f" {code} ", text)
+    text = _THOUSANDS.sub("", text)
+    text = _MAGNITUDE.sub(_expand_magnitude, text)
+    text = _NUMBER_WORD.sub(lambda m: _NUMBER_WORDS[m.group(1)], text)
+    # WHY: Keep decimals and apostrophes, everything else separates words
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)|[^\w\s.'-]|_", " ", text)
+    text = _UNITS.sub(_unit, text)
+    text = _CODE_BEFORE.sub(r"\1\2", text)
+    text = _CODE_AFTER.sub(r"\2\1", text)
+    words = [word for word in text.split() if word not in _FILLER]
+    text = " ".join(words)
+
+    match = _DESTINATION.search(text)
+    destination = match.group(1).strip() if match else ""
+    return NormalizedQuery(text, destination)
+
+
+# ------------------ SIMILARITY INDEX ------------------ #
+class SimilarityIndex:
+    """
+    Recent query embeddings, searched per destination.
+
+    WHY: Exact keys miss rephrasings ("things to do in goa" vs "what to do
+    in goa"). Comparing only queries with the same extracted destination
+    keeps a high similarity score from mapping Goa onto Gokarna.
+    """
+
+    def __init__(self, settings: Dict):
+        self.model_name = settings["model"]
+        self.threshold = float(settings["threshold"])
+        self._entries: Deque[Tuple[float, str, object, str]] = deque(maxlen=int(settings["max_entries"]))
+        self._model = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("sentence_transformers") is not None
+
+    def _embed(self, text: str):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(text, normalize_embeddings=True)
+
+    def add(self, query: NormalizedQuery, ttl: float):
+        vector = self._embed(query.text)
+        with self._lock:
+            self._entries.append((time.time() + ttl, query.destination, vector, query.key))
+
+    def nearest(self, query: NormalizedQuery) -> Optional[str]:
+        """Key of the most similar live entry for the same destination, if above the threshold."""
+        now = time.time()
+        with self._lock:
+            candidates = [
+                (vector, key) for expires_at, destination, vector, key in self._entries
+                if destination == query.destination and expires_at > now and key != query.key
+            ]
+        if not candidates:
+            return None
+        vector = self._embed(query.text)
+        # WHY: Embeddings are unit length, so the dot product is the cosine similarity
+        score, key = max((float(vector @ other), key) for other, key in candidates)
+        return key if score >= self.threshold else None
+
+
+# ------------------ RESPONSE CACHE ------------------ #
+class ResponseCache:
+    """Stores and replays agent answers to first-turn queries."""
+
+    def __init__(self, settings: Dict, tool_cache: Optional[ToolCache] = None):
+        self.settings = settings
+        self.enabled = bool(settings["enabled"])
+        self.ttl = float(settings["ttl"])
+        self.tool_cache = tool_cache or get_tool_cache()
+        self.similar_hits = 0
+        self.index: Optional[SimilarityIndex] = None
+        if self.enabled and settings["similarity"]["enabled"]:
+            if SimilarityIndex.available():
+                self.index = SimilarityIndex(settings["similarity"])
+            else:
+                logger.warning("response_cache.similarity needs sentence-transformers; using exact keys only")
+
+    async def lookup(self, query: str) -> Optional[str]:
+        """Cached answer for a query, or None."""
+        if not self.enabled:
+            return None
+        normalized = normalize_query(query)
+        value = await self.tool_cache.aget(NAMESPACE, normalized.key)
+        if value is not MISSING:
+            return value
+        if self.index is None or not normalized.destination:
+            return None
+        key = await asyncio.to_thread(self.index.nearest, normalized)
+        if key is None:
+            return None
+        value = await self.tool_cache.aget(NAMESPACE, key)
+        if value is MISSING:
+            return None
+        self.similar_hits += 1
+        return value
+
+    async def store(self, query: str, response: str, output_score: int):
+        """Cache an answer if it is good enough to hand to the next user."""
+        if not self.enabled or not response or output_score < self.settings["min_output_score"]:
+            return
+        normalized = normalize_query(query)
+        await self.tool_cache.aset(NAMESPACE, normalized.key, response, ttl=self.ttl)
+        if self.index is not None and normalized.destination:
+            await asyncio.to_thread(self.index.add, normalized, self.ttl)
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide ResponseCache configured from config.yaml."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(get_response_cache_settings())
+    return _response_cache
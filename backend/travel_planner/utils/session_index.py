@@ -0,0 +1,226 @@
+"""
+Session Metadata Index
+
+WHY: Listing sessions used to GROUP BY over every checkpoint and then
+deserialize each thread's full latest state just to read a title, so the
+sidebar got slower with every conversation turn ever stored. The checkpointers
+in utils/checkpoint_store now upsert one small row per session into a
+`sessions` table whenever a checkpoint changes the messages, and listing is a
+keyset-paginated read of that table: O(page size).
+
+Loading a history had the same problem: the whole messages channel (including
+large tool outputs) was deserialized to show a few chat bubbles. The same
+write also appends the new user/assistant messages to `session_messages`, an
+append-only log keyed by (session_id, position), so the last K messages or
+the messages since a position are a primary-key range read.
+"""
+
+import base64
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+SESSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at DESC, session_id DESC);
+CREATE TABLE IF NOT EXISTS session_messages (
+    session_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, position)
+) WITHOUT ROWID;
+"""
+
+# WHY: Append-only; a position is written once, replays are ignored
+APPEND_MESSAGE = """
+INSERT OR IGNORE INTO session_messages (session_id, position, role, content, created_at)
+VALUES (?, ?, ?, ?, ?)
+"""
+
+LOGGED_COUNT = "SELECT message_count FROM sessions WHERE session_id = ?"
+
+# Statements that remove a session from the index (each takes the session id)
+DELETE_SESSION = (
+    "DELETE FROM session_messages WHERE session_id = ?",
+    "DELETE FROM sessions WHERE session_id = ?",
+)
+
+# WHY: The title is fixed by the first user message, so conflicts only bump counters
+UPSERT_SESSION = """
+INSERT INTO sessions (session_id, title, message_count, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(session_id) DO UPDATE SET
+    message_count = excluded.message_count,
+    updated_at = excluded.updated_at,
+    title = CASE WHEN sessions.title = 'New Conversation' THEN excluded.title ELSE sessions.title END
+"""
+
+DEFAULT_TITLE = "New Conversation"
+
+_TITLE_PREFIXES = [
+    'plan a trip to ', 'plan a ', 'i want to ',
+    'can you ', 'please ', 'tell me about ',
+    'what is the weather in ', 'weather in '
+]
+
+
+def create_title(text: str) -> str:
+    """Create a short title from message text"""
+    # Remove common prefixes
+    text = text.lower().strip()
+    for prefix in _TITLE_PREFIXES:
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            break
+
+    # Take first 3-4 words and capitalize
+    words = text.strip().split()[:4]
+    title = ' '.join(word.capitalize() for word in words)
+
+    return title if title else DEFAULT_TITLE
+
+
+def message_text(content) -> str:
+    """Flatten message content (Gemini returns a list of parts) to text."""
+    if isinstance(content, list):
+        return "".join(
+            item["text"] for item in content if isinstance(item, dict) and "text" in item
+        )
+    return content if isinstance(content, str) else ""
+
+
+def is_chat_message(message) -> bool:
+    """User/assistant messages with text, i.e. what the chat UI shows."""
+    return getattr(message, "type", None) in ("human", "ai") and bool(message_text(message.content))
+
+
+def chat_messages(messages: List) -> List[Tuple[str, str]]:
+    """(role, text) of the messages the chat UI shows, in order."""
+    return [
+        ('user' if message.type == 'human' else 'assistant', message_text(message.content))
+        for message in messages
+        if is_chat_message(message)
+    ]
+
+
+class SessionUpdate(NamedTuple):
+    """What one checkpoint write changes in the index."""
+    row: Tuple                      # UPSERT_SESSION parameters
+    messages: List[Tuple[str, str]]  # All chat messages (role, text) so far
+
+
+def session_update(thread_id: str, messages: List, now: Optional[float] = None) -> SessionUpdate:
+    """Index update for a thread's current messages."""
+    now = time.time() if now is None else now
+    title = DEFAULT_TITLE
+    for message in messages:
+        if getattr(message, "type", None) == "human":
+            text = message_text(message.content)
+            if text.strip():
+                title = create_title(text)
+                break
+    chat = chat_messages(messages)
+    return SessionUpdate((thread_id, title, len(chat), now, now), chat)
+
+
+def index_update(config: Dict, checkpoint: Dict, new_versions: Dict) -> Optional[SessionUpdate]:
+    """
+    Index update for a checkpoint write, or None if the index is unchanged.
+
+    WHY: Only root-graph checkpoints that changed the messages channel matter,
+    which skips the bookkeeping checkpoints LangGraph writes between nodes.
+    """
+    configurable = config.get("configurable", {})
+    if configurable.get("checkpoint_ns") or "messages" not in new_versions:
+        return None
+    messages = checkpoint.get("channel_values", {}).get("messages")
+    if not messages:
+        return None
+    return session_update(configurable["thread_id"], messages)
+
+
+def _new_message_rows(update: SessionUpdate, logged: int) -> List[Tuple]:
+    session_id, now = update.row[0], update.row[4]
+    return [
+        (session_id, position, role, content, now)
+        for position, (role, content) in enumerate(update.messages)
+        if position >= logged
+    ]
+
+
+def write_index(cur, update: SessionUpdate):
+    """
+    Append new messages to the log and upsert the session row (one transaction).
+
+    WHY: The session row's message_count is how much of the log is already
+    written, so each turn only inserts its own new messages.
+    """
+    row = cur.execute(LOGGED_COUNT, (update.row[0],)).fetchone()
+    cur.executemany(APPEND_MESSAGE, _new_message_rows(update, row[0] if row else 0))
+    cur.execute(UPSERT_SESSION, update.row)
+
+
+async def awrite_index(conn, update: SessionUpdate):
+    """Async version of write_index for an aiosqlite connection (caller commits)."""
+    async with conn.execute(LOGGED_COUNT, (update.row[0],)) as cur:
+        row = await cur.fetchone()
+    await conn.executemany(APPEND_MESSAGE, _new_message_rows(update, row[0] if row else 0))
+    await conn.execute(UPSERT_SESSION, update.row)
+
+
+# ------------------ PAGINATION ------------------ #
+def encode_cursor(updated_at: float, session_id: str) -> str:
+    """Opaque keyset cursor pointing just after a row."""
+    return base64.urlsafe_b64encode(f"{updated_at!r}|{session_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        updated_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return float(updated_at), session_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def page_query(limit: int, cursor: Optional[str] = None) -> Tuple[str, Tuple]:
+    """SQL and parameters for one page of sessions, newest first (one extra row to detect more)."""
+    sql = "SELECT session_id, title, message_count, created_at, updated_at FROM sessions"
+    params: Tuple = ()
+    if cursor:
+        updated_at, session_id = decode_cursor(cursor)
+        # WHY: Row-value comparison walks idx_sessions_updated from the cursor position
+        sql += " WHERE (updated_at, session_id) < (?, ?)"
+        params = (updated_at, session_id)
+    sql += " ORDER BY updated_at DESC, session_id DESC LIMIT ?"
+    return sql, params + (limit + 1,)
+
+
+def page_result(rows: List[Tuple], limit: int) -> Tuple[List[Dict], Optional[str]]:
+    """(sessions, next_cursor) from the rows fetched with page_query."""
+    sessions = [
+        {
+            'session_id': session_id,
+            'preview': title,
+            'message_count': message_count,
+            'created_at': created_at,
+            'updated_at': updated_at,
+        }
+        for session_id, title, message_count, created_at, updated_at in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit and sessions:
+        last = sessions[-1]
+        next_cursor = encode_cursor(last['updated_at'], last['session_id'])
+    return sessions, next_cursor
@@ -1,169 +1,235 @@
 """
 Session Manager for AI Travel Planner - FIXED VERSION
 
-This version works around pickle issues by using LangGraph's SQLite saver directly
+This version reads checkpoints through LangGraph's SQLite saver directly.
+Session listing and history loading read the `sessions` index and the
+append-only `session_messages` log maintained by the checkpointer
+(see utils/session_index) instead of scanning and deserializing checkpoints,
+over pooled connections so each request doesn't re-run the pragma script.
 """
 
+import logging
 import sqlite3
-import os
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from langgraph.checkpoint.sqlite import SqliteSaver
+from travel_planner.utils.checkpoint_store import ConnectionPool, checkpoint_db_path, get_checkpoint_settings
+from travel_planner.utils.checkpoint_retention import checkpoint_time
+from travel_planner.utils.session_index import (
+    DELETE_SESSION,
+    SESSIONS_SCHEMA,
+    create_title,
+    page_query,
+    page_result,
+    session_update,
+    write_index,
+)
+
+
+logger = logging.getLogger("travel_planner")
 
 
 class SessionManager:
     def __init__(self, db_path: str = None):
         """Initialize session manager with database path"""
-        if db_path is None:
-            current_dir = os.path.dirname(__file__)
-            db_path = os.path.join(current_dir, '../../data/checkpoints.db')
+        self.db_path = checkpoint_db_path(db_path)
+        # WHY: Methods run on asyncio.to_thread workers; idle connections are
+        # reused by whichever thread serves the next request
+        self._pool = ConnectionPool(self.db_path, max(1, int(get_checkpoint_settings()["pool_size"])))
+        self._ensure_index()
+    
+    def close(self):
+        """Close the pooled connections"""
+        self._pool.close()
+    
+    def _ensure_index(self):
+        """
+        Create the index tables and backfill them once from existing checkpoints.
+        
+        WHY: Databases written before the index/log existed still list their
+        sessions and histories
+        """
+        with self._pool.connection() as conn:
+            conn.executescript(SESSIONS_SCHEMA)
+            has_checkpoints = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'checkpoints'"
+            ).fetchone()
+            has_log = conn.execute("SELECT 1 FROM session_messages LIMIT 1").fetchone()
+            if has_checkpoints and not has_log:
+                self.rebuild_index(conn)
+    
+    def rebuild_index(self, conn: sqlite3.Connection) -> int:
+        """Rebuild the sessions table and message log from the latest checkpoint of every thread"""
+        saver = SqliteSaver(conn)
+        rows = conn.execute(
+            "SELECT thread_id, MIN(checkpoint_id), MAX(checkpoint_id) FROM checkpoints "
+            "WHERE checkpoint_ns = '' GROUP BY thread_id"
+        ).fetchall()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM session_messages")
+        cursor.execute("DELETE FROM sessions")
+        count = 0
+        for thread_id, first_checkpoint, last_checkpoint in rows:
+            checkpoint = saver.get({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+            messages = (checkpoint or {}).get("channel_values", {}).get("messages") or []
+            if messages:
+                update = session_update(thread_id, messages, checkpoint_time(last_checkpoint))
+                session_id, title, message_count, _, updated_at = update.row
+                row = (session_id, title, message_count, checkpoint_time(first_checkpoint), updated_at)
+                write_index(cursor, update._replace(row=row))
+                count += 1
+        conn.commit()
+        logger.info(f"Indexed {count} existing sessions")
+        return count
+    
+    def get_sessions_page(self, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of sessions, most recently updated first.
+        
+        Args:
+            limit: Page size
+            cursor: next_cursor from the previous page (None for the first page)
         
-        self.db_path = db_path
-        # Create connection string
-        self.conn_string = f"sqlite:///{db_path}"
+        Returns:
+            (sessions, next_cursor) - next_cursor is None on the last page
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        sql, params = page_query(limit, cursor)
+        with self._pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return page_result(rows, limit)
     
     def get_all_sessions(self) -> List[Dict]:
         """Get all conversation sessions with metadata"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get unique thread_ids
-            cursor.execute("""
-                SELECT 
-                    thread_id,
-                    MIN(checkpoint_id) as first_checkpoint,
-                    MAX(checkpoint_id) as last_checkpoint,
-                    COUNT(*) as checkpoint_count
-                FROM checkpoints
-                GROUP BY thread_id
-                ORDER BY last_checkpoint DESC
-            """)
-            
-            sessions = []
-            for row in cursor.fetchall():
-                thread_id, first_cp, last_cp, count = row
-                
-                # Get title by reading from saver
-                preview = self._get_session_title(thread_id)
-                print(f"[SESSION] {thread_id[:8]}: '{preview}'")
-                
-                sessions.append({
-                    'session_id': thread_id,
-                    'preview': preview,
-                    'message_count': count,
-                    'created_at': first_cp,
-                    'updated_at': last_cp
-                })
-            
-            conn.close()
-            print(f"[SESSION] Returning {len(sessions)} total sessions")
+            with self._pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT session_id, title, message_count, created_at, updated_at FROM sessions "
+                    "ORDER BY updated_at DESC, session_id DESC"
+                ).fetchall()
+            sessions, _ = page_result(rows, len(rows))
+            logger.debug(f"Returning {len(sessions)} total sessions")
             return sessions
             
         except Exception as e:
-            print(f"[ERROR] Error getting sessions: {e}")
+            logger.error(f"Error getting sessions: {e}")
             return []
     
     def _get_session_title(self, thread_id: str) -> str:
-        """Get session title using LangGraph saver"""
+        """Get session title from the sessions index"""
         try:
-            # Use context manager to get saver
-            with SqliteSaver.from_conn_string(self.conn_string) as saver:
-                config = {"configurable": {"thread_id": thread_id}}
-                state = saver.get(config)
-                
-                if state and hasattr(state, 'values'):
-                    messages = state.values.get('messages', [])
-                    
-                    # Find first human message
-                    for msg in messages:
-                        if hasattr(msg, 'type') and msg.type == 'human':
-                            content = getattr(msg, 'content', '')
-                            if isinstance(content, str) and content.strip():
-                                return self._create_title(content)
-            
-            return "New Conversation"
+            with self._pool.connection() as conn:
+                row = conn.execute("SELECT title FROM sessions WHERE session_id = ?", (thread_id,)).fetchone()
+            return row[0] if row else "New Conversation"
             
         except Exception as e:
-            print(f"[TITLE] Error: {e}")
+            logger.error(f"Error reading session title: {e}", extra={"session_id": thread_id})
             return "Conversation"
     
     def _create_title(self, text: str) -> str:
         """Create a short title from message text"""
-        # Remove common prefixes
-        text = text.lower().strip()
-        prefixes = [
-            'plan a trip to ', 'plan a ', 'i want to ',  
-            'can you ', 'please ', 'tell me about ',
-            'what is the weather in ', 'weather in '
-        ]
-        for prefix in prefixes:
-            if text.startswith(prefix):
-                text = text[len(prefix):]
-                break
-        
-        # Take first 3-4 words and capitalize
-        words = text.strip().split()[:4]
-        title = ' '.join(word.capitalize() for word in words)
-        
-        return title if title else "New Conversation"
+        return create_title(text)
+    
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        """Get one session's index row (None if it doesn't exist)"""
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT session_id, title, message_count, created_at, updated_at FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchall()
+        sessions, _ = page_result(rows, 1)
+        return sessions[0] if sessions else None
     
     def get_session_messages(self, session_id: str) -> List[Dict]:
         """Get all messages for a specific session"""
-        print(f"[MESSAGES] Loading session {session_id[:8]}...")
         try:
-            # Use context manager to get saver
-            with SqliteSaver.from_conn_string(self.conn_string) as saver:
-                config = {"configurable": {"thread_id": session_id}}
-                state = saver.get(config)
-                
-                if not state or not hasattr(state, 'values'):
-                    print("[MESSAGES] No state found")
-                    return []
-                
-                messages = state.values.get('messages', [])
-                print(f"[MESSAGES] Found {len(messages)} messages in state")
-                
-                result = []
-                for msg in messages:
-                    if hasattr(msg, 'type') and hasattr(msg, 'content'):
-                        role = 'user' if msg.type == 'human' else 'assistant'
-                        content = msg.content
-                        
-                        # Handle Gemini list format
-                        if isinstance(content, list):
-                            text = ""
-                            for item in content:
-                                if isinstance(item, dict) and 'text' in item:
-                                    text += item['text']
-                            content = text
-                        
-                        if content and isinstance(content, str):
-                            result.append({'role': role, 'content': content})
-                            print(f"[MESSAGES] {role}: {content[:50]}...")
-                
-                print(f"[MESSAGES] Returning {len(result)} messages")
-                return result
+            with self._pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT role, content FROM session_messages WHERE session_id = ? ORDER BY position",
+                    (session_id,),
+                ).fetchall()
+            return [{'role': role, 'content': content} for role, content in rows]
             
         except Exception as e:
-            print(f"[MESSAGES ERROR] {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"Error loading session messages: {e}", extra={"session_id": session_id})
             return []
     
+    def _read_messages(self, sql: str, params: Tuple) -> List[Dict]:
+        with self._pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [{'position': position, 'role': role, 'content': content} for position, role, content in rows]
+    
+    def get_messages_page(self, session_id: str, limit: int = 50,
+                          before: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of a session's messages, newest first.
+        
+        Args:
+            limit: Page size
+            before: next_cursor from the previous page (None for the newest messages)
+        
+        Returns:
+            (messages, next_cursor) - each message carries its position in the
+            conversation; next_cursor is None on the oldest page
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        end = _position(before) if before is not None else None
+        sql = "SELECT position, role, content FROM session_messages WHERE session_id = ?"
+        params: Tuple = (session_id,)
+        if end is not None:
+            sql += " AND position < ?"
+            params += (end,)
+        messages = self._read_messages(sql + " ORDER BY position DESC LIMIT ?", params + (limit,))
+        oldest = messages[-1]['position'] if messages else 0
+        return messages, (str(oldest) if oldest > 0 else None)
+    
+    def get_messages_since(self, session_id: str, after: str, limit: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Get messages newer than a position, oldest first.
+        
+        WHY: A client that already shows a conversation only fetches what was added
+        
+        Returns:
+            (messages, cursor) - pass cursor as `after` next time (None if nothing new)
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        messages = self._read_messages(
+            "SELECT position, role, content FROM session_messages "
+            "WHERE session_id = ? AND position > ? ORDER BY position LIMIT ?",
+            (session_id, _position(after), limit),
+        )
+        return messages, (str(messages[-1]['position']) if messages else None)
+    
     def delete_session(self, session_id: str) -> bool:
-        """Delete a conversation session"""
+        """Delete a conversation session (False if it didn't exist or on error)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("DELETE FROM checkpoints WHERE thread_id = ?", (session_id,))
-            cursor.execute("DELETE FROM writes WHERE thread_id = ?", (session_id,))
-            
-            conn.commit()
-            conn.close()
-            print(f"[DELETE] Deleted session {session_id[:8]}")
-            return True
+            with self._pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("DELETE FROM checkpoints WHERE thread_id = ?", (session_id,))
+                deleted = cursor.rowcount
+                cursor.execute("DELETE FROM writes WHERE thread_id = ?", (session_id,))
+                for statement in DELETE_SESSION:
+                    cursor.execute(statement, (session_id,))
+                    deleted += cursor.rowcount
+                
+                conn.commit()
+            logger.info("Deleted session", extra={"session_id": session_id})
+            return deleted > 0
             
         except Exception as e:
-            print(f"[DELETE ERROR] {e}")
+            logger.error(f"Error deleting session: {e}", extra={"session_id": session_id})
             return False
+
+
+def _position(cursor: str) -> int:
+    """Parse a message position cursor"""
+    try:
+        return int(cursor)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
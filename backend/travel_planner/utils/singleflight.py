@@ -0,0 +1,114 @@
+"""
+Single-Flight Request Coalescing
+
+WHY: The tool cache only helps after the first call completes. When many
+users plan trips to the same trending city at once, every concurrent cache
+miss would hit Geoapify/OpenWeather independently (thundering herd, 429s).
+Single-flight lets concurrent identical calls share one in-flight call and
+its result (or exception).
+
+Usage:
+    @single_flight("geocode", key=lambda place: place.strip().lower())
+    def fetch(place): ...
+
+Works on sync functions (threads share a concurrent.futures.Future) and async
+functions (coroutines share an asyncio.Task on the running loop).
+"""
+
+import asyncio
+import functools
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "shared": 0})
+
+    def do(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn once per key at a time; concurrent callers wait for its result."""
+        namespace = key.split(":", 1)[0]
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._stats[namespace]["calls"] += 1
+            else:
+                self._stats[namespace]["shared"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return future.result()
+
+    async def ado(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Async version of do: concurrent callers await one shared task.
+
+        WHY: The call runs as its own task and callers await it through
+        asyncio.shield, so one cancelled request doesn't cancel the call
+        the others are waiting on.
+        """
+        namespace = key.split(":", 1)[0]
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._tasks.pop(key, None) if self._tasks.get(key) is t else None)
+            self._stats[namespace]["calls"] += 1
+        else:
+            self._stats[namespace]["shared"] += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-namespace count of real calls and of callers that shared one."""
+        return {namespace: dict(counts) for namespace, counts in self._stats.items()}
+
+
+# WHY: One process-wide group so sync and async helpers share metrics
+_group = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return _group
+
+
+def single_flight(namespace: str, key: Callable[..., str]):
+    """
+    Coalesce concurrent identical calls of a sync or async function.
+
+    Args:
+        namespace: Prefix for the flight key (also the metrics bucket)
+        key: Builds the flight key from the function's arguments
+    """
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                flight_key = f"{namespace}:{key(*args, **kwargs)}"
+                return await _group.ado(flight_key, func, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            flight_key = f"{namespace}:{key(*args, **kwargs)}"
+            return _group.do(flight_key, func, *args, **kwargs)
+        return wrapper
+    return decorator
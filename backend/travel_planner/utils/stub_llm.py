@@ -0,0 +1,239 @@
+"""
+Offline Stub LLM
+
+WHY: GraphBuilder could only run against live Gemini/Groq/OpenAI keys, so the
+server could not be load tested or benchmarked in CI. The "stub" provider
+(ModelLoader(provider="stub")) replays scripted tool-calling transcripts from
+config/stub_transcripts.yaml with a configurable latency distribution, so a
+turn exercises the real graph, tools and checkpointer with no network.
+
+Pair it with utils/stub_servers for the places and weather APIs.
+Settings live under "llm.stub" in config.yaml.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from travel_planner.utils.config_loader import load_config
+from travel_planner.utils.response_cache import normalize_query
+
+
+DEFAULT_STUB_SETTINGS = {
+    "transcripts": "travel_planner/config/stub_transcripts.yaml",
+    "latency": {
+        "distribution": "lognormal",  # constant | uniform | normal | lognormal
+        "mean_s": 0.8,                # Mean (normal), median (lognormal) or the constant value
+        "stdev_s": 0.2,               # normal only
+        "sigma": 0.4,                 # lognormal only: spread of log(latency)
+        "min_s": 0.05,
+        "max_s": 10.0,
+    },
+    "seed": None,                     # Fix for reproducible latency samples
+}
+
+_PLACEHOLDER = re.compile(r"\{(query|destination|days|budget|tool_output)\}")
+_BUDGET = re.compile(r"\b(?:inr|usd|eur|gbp)(\d+)\b|\bunder (\d+)\b|\bbudget (?:of )?(\d+)\b")
+_DAYS = re.compile(r"\b(\d+) day\b")
+
+
+# ------------------ LATENCY ------------------ #
+class LatencyModel:
+    """
+    Samples response latencies (seconds) from a configured distribution.
+
+    WHY: Real LLM/API latency is long-tailed; a lognormal with a clamp
+    reproduces the p95/p99 behaviour that a constant sleep hides.
+    """
+
+    DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal")
+
+    def __init__(self, settings: Dict, seed: Optional[int] = None):
+        self.distribution = settings.get("distribution", "constant")
+        if self.distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+        self.mean = float(settings.get("mean_s", 0.0))
+        self.stdev = float(settings.get("stdev_s", 0.0))
+        self.sigma = float(settings.get("sigma", 0.0))
+        self.min = float(settings.get("min_s", 0.0))
+        self.max = float(settings.get("max_s", math.inf))
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.distribution == "uniform":
+                value = self._rng.uniform(self.min, self.max)
+            elif self.distribution == "normal":
+                value = self._rng.gauss(self.mean, self.stdev)
+            elif self.distribution == "lognormal":
+                value = self._rng.lognormvariate(math.log(self.mean), self.sigma) if self.mean > 0 else 0.0
+            else:
+                value = self.mean
+        return min(max(value, self.min), self.max)
+
+
+# ------------------ TRANSCRIPTS ------------------ #
+def load_transcripts(path: str) -> List[Dict]:
+    """
+    Read and check a transcripts file.
+
+    Raises:
+        ValueError: If a transcript has no steps or doesn't end with a final answer
+    """
+    transcripts = (load_config(path) or {}).get("transcripts") or []
+    if not transcripts:
+        raise ValueError(f"No transcripts in {path}")
+    for transcript in transcripts:
+        steps = transcript.get("steps") or []
+        if not steps or steps[-1].get("tool_calls") or "content" not in steps[-1]:
+            raise ValueError(f"Transcript '{transcript.get('name')}' must end with a content step")
+    return transcripts
+
+
+def _turn(messages: List) -> tuple:
+    """(user message text, replies already given this turn, last tool output)."""
+    query, replies, tool_output = "", 0, ""
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            query, replies, tool_output = message.content if isinstance(message.content, str) else "", 0, ""
+        elif isinstance(message, AIMessage):
+            replies += 1
+        elif isinstance(message, ToolMessage):
+            tool_output = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    return query, replies, tool_output
+
+
+def _variables(query: str, tool_output: str) -> Dict[str, Any]:
+    normalized = normalize_query(query)
+    budget = _BUDGET.search(normalized.text)
+    days = _DAYS.search(normalized.text)
+    return {
+        "query": query,
+        "destination": normalized.destination.title() or "Goa",
+        "days": int(days.group(1)) if days else 3,
+        "budget": int(next(g for g in budget.groups() if g)) if budget else 20000,
+        "tool_output": tool_output,
+    }
+
+
+def _fill(value, variables: Dict[str, Any]):
+    """Substitute placeholders in a (nested) transcript value."""
+    if isinstance(value, str):
+        whole = _PLACEHOLDER.fullmatch(value)
+        if whole:
+            return variables[whole.group(1)]
+        return _PLACEHOLDER.sub(lambda m: str(variables[m.group(1)]), value)
+    if isinstance(value, list):
+        return [_fill(item, variables) for item in value]
+    if isinstance(value, dict):
+        return {key: _fill(item, variables) for key, item in value.items()}
+    return value
+
+
+# ------------------ MODEL ------------------ #
+class StubChatModel(BaseChatModel):
+    """
+    Chat model that replays scripted transcripts after a sampled latency.
+
+    The transcript is chosen from the current user message; its step is the
+    number of replies already given in this turn. Without bound tools (e.g.
+    the context manager's summary call) it answers with plain text.
+    """
+
+    transcripts: List[Dict]
+    latency: Dict = DEFAULT_STUB_SETTINGS["latency"]
+    seed: Optional[int] = None
+    tools_bound: bool = False
+
+    _latency_model: LatencyModel = PrivateAttr()
+    _patterns: List = PrivateAttr()
+
+    def model_post_init(self, __context) -> None:
+        self._latency_model = LatencyModel(self.latency, self.seed)
+        self._patterns = [re.compile(t.get("match") or "") for t in self.transcripts]
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def bind_tools(self, tools, **kwargs):
+        # WHY: A copy, so the unbound model used for summaries still answers in text
+        bound = StubChatModel(
+            transcripts=self.transcripts, latency=self.latency, seed=self.seed, tools_bound=True
+        )
+        bound._latency_model = self._latency_model
+        return bound
+
+    def _transcript(self, query: str) -> Dict:
+        text = normalize_query(query).text
+        for transcript, pattern in zip(self.transcripts, self._patterns):
+            if pattern.search(text):
+                return transcript
+        return self.transcripts[-1]
+
+    def _reply(self, messages) -> ChatResult:
+        query, replies, tool_output = _turn(messages)
+        if not self.tools_bound:
+            message = AIMessage(content=f"Summary: the user asked about {query[:80] or 'a trip'}.")
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        steps = self._transcript(query)["steps"]
+        # WHY: Extra rounds (e.g. the model retrying after a tool error) end with the final answer
+        step = steps[min(replies, len(steps) - 1)]
+        variables = _variables(query, tool_output)
+        if step.get("tool_calls"):
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": call["name"],
+                        "args": _fill(call.get("args") or {}, variables),
+                        "id": f"call_{uuid.uuid4().hex[:12]}",
+                    }
+                    for call in step["tool_calls"]
+                ],
+            )
+        else:
+            message = AIMessage(content=_fill(step["content"], variables))
+        # WHY: Approximate usage, so token metrics and budgets behave as with a real provider
+        input_tokens, output_tokens = count_tokens_approximately(messages), count_tokens_approximately([message])
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self._latency_model.sample())
+        return self._reply(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self._latency_model.sample())
+        return self._reply(messages)
+
+
+def create_stub_llm(settings: Optional[Dict] = None) -> StubChatModel:
+    """Build the stub model from llm.stub settings merged over the defaults."""
+    cfg = {**DEFAULT_STUB_SETTINGS, **(settings or {})}
+    latency = {**DEFAULT_STUB_SETTINGS["latency"], **(cfg.get("latency") or {})}
+    # WHY: Load tests vary the model latency per run without editing config.yaml
+    if os.getenv("STUB_LLM_LATENCY_S"):
+        latency["mean_s"] = float(os.getenv("STUB_LLM_LATENCY_S"))
+    return StubChatModel(
+        transcripts=load_transcripts(cfg["transcripts"]), latency=latency, seed=cfg.get("seed")
+    )
@@ -0,0 +1,189 @@
+"""
+Local Stub Servers for the Places and Weather APIs
+
+WHY: Tools call Geoapify and OpenWeather, so a load test either needs live
+keys (and burns quota) or measures nothing of the tool path. These servers
+answer the three endpoints the tools use with deterministic, realistically
+shaped JSON after a sampled latency, so the real HTTP client, cache,
+single-flight and resilience layers all run offline.
+
+    places  - GET /v1/geocode/search, GET /v2/places   (Geoapify)
+    weather - GET /data/2.5/weather                    (OpenWeather)
+
+Names starting with "unknown" are not found (empty geocode, weather 404).
+The tools read GEOAPIFY_BASE_URL / OPEN_WEATHER_BASE_URL at import time, so
+set them (stub_env() returns them) before importing travel_planner.tools.
+
+Usage (from the backend directory):
+    python -m travel_planner.utils.stub_servers --places-port 8701 --weather-port 8702
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from travel_planner.utils.stub_llm import LatencyModel
+
+
+DEFAULT_SERVER_LATENCY = {"distribution": "lognormal", "mean_s": 0.05, "sigma": 0.3, "min_s": 0.005, "max_s": 2.0}
+
+_CONDITIONS = ["clear sky", "few clouds", "scattered clouds", "light rain", "haze"]
+
+
+def _seed(text: str) -> int:
+    """Stable per-name number, so every run returns the same data."""
+    return int(hashlib.md5(text.strip().lower().encode()).hexdigest()[:8], 16)
+
+
+def _not_found(name: str) -> bool:
+    return name.strip().lower().startswith("unknown")
+
+
+# ------------------ RESPONSES ------------------ #
+def geocode_response(text: str) -> Dict:
+    if _not_found(text):
+        return {"features": []}
+    seed = _seed(text)
+    lat = -60 + (seed % 12000) / 100
+    lon = -180 + (seed // 12000 % 36000) / 100
+    return {"features": [{"properties": {"lat": lat, "lon": lon, "formatted": text.title()}}]}
+
+
+def places_response(categories: str, circle: str, limit: int) -> Dict:
+    category = categories.split(",")[0]
+    label = category.split(".")[-1].replace("_", " ").title()
+    area = _seed(circle) % 1000
+    return {
+        "features": [
+            {
+                "properties": {
+                    "name": f"{label} {area}-{i + 1}",
+                    "categories": [category],
+                    "formatted": f"{i + 1} Stub Street, Area {area}",
+                }
+            }
+            for i in range(limit)
+        ]
+    }
+
+
+def weather_response(city: str) -> Optional[Dict]:
+    if _not_found(city):
+        return None
+    seed = _seed(city)
+    return {
+        "main": {"temp": round(15 + seed % 200 / 10, 1), "humidity": 40 + seed % 50},
+        "weather": [{"description": _CONDITIONS[seed % len(_CONDITIONS)]}],
+        "name": city.title(),
+    }
+
+
+# ------------------ SERVER ------------------ #
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # WHY: Keep-alive, like the real providers
+    latency: LatencyModel = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        time.sleep(self.latency.sample())
+
+        if url.path == "/v1/geocode/search":
+            self._send(200, geocode_response(query.get("text", "")))
+        elif url.path == "/v2/places":
+            limit = int(query.get("limit", 20))
+            self._send(200, places_response(query.get("categories", ""), query.get("filter", ""), limit))
+        elif url.path == "/data/2.5/weather":
+            data = weather_response(query.get("q", ""))
+            if data is None:
+                self._send(404, {"cod": "404", "message": "city not found"})
+            else:
+                self._send(200, data)
+        else:
+            self._send(404, {"message": f"Unknown path {url.path}"})
+
+    def _send(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # WHY: Thousands of requests per run; access logs would dominate the output
+        pass
+
+
+def start_server(port: int = 0, latency: Optional[Dict] = None, seed: Optional[int] = None) -> ThreadingHTTPServer:
+    """Start a stub server on a daemon thread (port 0 picks a free port)."""
+    handler = type("StubHandler", (_StubHandler,), {
+        "latency": LatencyModel({**DEFAULT_SERVER_LATENCY, **(latency or {})}, seed),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def stub_env(places: ThreadingHTTPServer, weather: ThreadingHTTPServer) -> Dict[str, str]:
+    """Environment variables that point the tools at the stub servers."""
+    return {
+        "GEOAPIFY_BASE_URL": _url(places),
+        "OPEN_WEATHER_BASE_URL": _url(weather),
+        "GEOAPIFY_API_KEY": "stub",
+        "OPEN_WEATHER_API_KEY": "stub",
+    }
+
+
+@contextmanager
+def stub_servers(latency: Optional[Dict] = None, seed: Optional[int] = None,
+                 places_port: int = 0, weather_port: int = 0) -> Iterator[Dict[str, str]]:
+    """
+    Run the places and weather stubs for the duration of a block.
+
+    Yields:
+        The environment variables from stub_env()
+    """
+    places = start_server(places_port, latency, seed)
+    weather = start_server(weather_port, latency, seed)
+    try:
+        yield stub_env(places, weather)
+    finally:
+        for server in (places, weather):
+            server.shutdown()
+            server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run local stub servers for the places and weather APIs")
+    parser.add_argument("--places-port", type=int, default=8701)
+    parser.add_argument("--weather-port", type=int, default=8702)
+    parser.add_argument("--latency-ms", type=float, help="Median latency (default: lognormal around 50ms)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    latency = {"mean_s": args.latency_ms / 1000} if args.latency_ms is not None else None
+    with stub_servers(latency, args.seed, args.places_port, args.weather_port) as env:
+        for key, value in env.items():
+            print(f"export {key}={value}")
+        print("# Stub servers running; Ctrl+C to stop", flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+Request Tracing with a Local File Exporter
+
+WHY: Metrics (utils/metrics) say which stage is slow on average, but not why
+one 40s itinerary took 40s. Spans record each step of a request:
+
+    POST /api/chat -> graph.run -> agent -> llm.call
+                                -> tools -> tool:<name> -> http GET <host>
+                                -> checkpoint.put
+
+The current span lives in a contextvar. asyncio tasks, asyncio.to_thread
+and LangChain's executor threads inherit contextvars on their own; plain
+thread pools use wrap_context(). Finished traces are appended to a local
+file, either one JSON span per line or one OTLP/JSON export request per
+trace (which the OpenTelemetry collector's otlpjsonfile receiver reads),
+by a background writer thread, so ending a request never waits on disk.
+
+Log lines carry trace_id, span_id and session_id (see utils/logger), so a
+slow request in the logs leads straight to its trace.
+
+Waterfall of the latest trace (from the backend directory):
+    python -m travel_planner.utils.tracing --last
+Settings live under "tracing" in config.yaml.
+"""
+
+import argparse
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import math
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from travel_planner.utils.config_loader import load_config, resolve_path
+
+
+DEFAULT_TRACING_SETTINGS = {
+    "enabled": False,               # Opt-in: writes a file entry per traced request
+    "path": "logs/traces.jsonl",    # Relative paths are resolved against backend/
+    "format": "json",               # json (one span per line) | otlp (one OTLP/JSON request per trace)
+    "sample_rate": 1.0,             # Fraction of traces recorded
+    "service_name": "travel_planner",
+    "queue_size": 1000,             # Finished traces waiting for the writer; 0 = unbounded
+    "pending_ttl_s": 600,           # Drop spans of traces whose root hasn't ended after this long
+}
+
+_UNSAMPLED = object()  # Current-span marker inside a trace that is not recorded
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_session_id: contextvars.ContextVar = contextvars.ContextVar("session_id", default=None)
+
+_settings: Optional[Dict] = None
+_exporter: Optional["FileExporter"] = None
+_exporter_lock = threading.Lock()
+
+
+def get_tracing_settings() -> Dict:
+    """Return tracing settings from config.yaml merged over the defaults."""
+    global _settings
+    if _settings is None:
+        _settings = {**DEFAULT_TRACING_SETTINGS, **(load_config().get("tracing") or {})}
+    return _settings
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+# ------------------ SPANS ------------------ #
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        """Add attributes (e.g. a status code known only at the end)."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+def _reset(var: contextvars.ContextVar, token: contextvars.Token):
+    try:
+        var.reset(token)
+    except ValueError:
+        # WHY: An abandoned streaming generator can be finalized in another context
+        pass
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Time a block as a child of the current span (or as a new trace).
+
+    Yields the Span, or None when tracing is off or the trace isn't sampled.
+    """
+    cfg = get_tracing_settings()
+    parent = _current_span.get()
+    if not cfg["enabled"] or parent is _UNSAMPLED:
+        yield None
+        return
+    if parent is None and random.random() >= cfg["sample_rate"]:
+        token = _current_span.set(_UNSAMPLED)
+        try:
+            yield None
+        finally:
+            _reset(_current_span, token)
+        return
+
+    session_id = _session_id.get()
+    if parent is None and session_id:
+        attributes["session_id"] = session_id
+    current = Span(
+        name,
+        parent.trace_id if parent else _new_id(128),
+        parent.span_id if parent else None,
+        attributes,
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _reset(_current_span, token)
+        get_exporter().export(current)
+
+
+@contextmanager
+def start_trace(name: str, session_id: Optional[str] = None, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Root span for a request; also tags log lines in it with the session id.
+
+    WHY: Started even when a span is already current (e.g. a test client),
+    so each request is its own trace
+    """
+    session_token = _session_id.set(session_id)
+    span_token = _current_span.set(None)
+    try:
+        with span(name, **attributes) as root:
+            yield root
+    finally:
+        _reset(_current_span, span_token)
+        _reset(_session_id, session_token)
+
+
+def wrap_context(func: Callable) -> Callable:
+    """
+    Run `func` in a copy of the caller's context (for ThreadPoolExecutor.submit).
+
+    WHY: Unlike asyncio.to_thread, a plain thread pool doesn't carry
+    contextvars over, which would detach its spans from the request's trace
+    """
+    context = contextvars.copy_context()
+    return functools.partial(context.run, func)
+
+
+def current_ids() -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(trace_id, span_id, session_id) for log correlation."""
+    current = _current_span.get()
+    if current is None or current is _UNSAMPLED:
+        return None, None, _session_id.get()
+    return current.trace_id, current.span_id, _session_id.get()
+
+
+# ------------------ EXPORT ------------------ #
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_request(spans: List[Span], service_name: str) -> Dict:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of spans."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "travel_planner.utils.tracing"},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                        "name": s.name,
+                        "kind": 2 if s.parent_id is None else 1,  # SERVER for roots, INTERNAL otherwise
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns),
+                        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                    }
+                    for s in spans
+                ],
+            }],
+        }]
+    }
+
+
+class _TraceWriter(logging.handlers.QueueListener):
+    """Writer thread for finished traces (the QueueListener set-up of utils/logger)."""
+
+    def __init__(self, trace_queue: queue.Queue, exporter: "FileExporter"):
+        super().__init__(trace_queue)
+        self.exporter = exporter
+
+    def handle(self, spans: List[Span]):
+        try:
+            self.exporter.write(spans)
+        except Exception as e:
+            # WHY: A full disk must not kill the writer thread
+            logging.getLogger("travel_planner").warning(f"Could not write trace: {e}")
+
+
+class FileExporter:
+    """
+    Appends finished traces to a file from a background thread.
+
+    WHY: Spans are buffered per trace and handed to the writer when the root
+    span ends, so one request costs one file write, its lines stay together,
+    and the request path never blocks on open()/write(). Like log records,
+    traces are dropped (and counted) when the writer falls behind, and spans
+    of traces whose root never ends are evicted after pending_ttl_s.
+    """
+
+    def __init__(self, path: str, format: str = "json", service_name: str = "travel_planner",
+                 queue_size: int = 1000, pending_ttl_s: float = 600):
+        if format not in ("json", "otlp"):
+            raise ValueError(f"Invalid tracing.format: {format}")
+        path = resolve_path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.format = format
+        self.service_name = service_name
+        self.pending_ttl_s = pending_ttl_s
+        self.dropped = 0   # Traces not written because the queue was full
+        self.evicted = 0   # Incomplete traces given up on
+        # WHY: Insertion-ordered, so the oldest pending traces are always at the front
+        self._pending: Dict[str, Tuple[float, List[Span]]] = {}
+        self._finished: Deque[str] = deque(maxlen=1024)
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writer = _TraceWriter(self._queue, self)
+        self._writer.start()
+
+    def export(self, finished: Span):
+        now = time.monotonic()
+        with self._lock:
+            self._evict_stale(now)
+            if finished.trace_id in self._finished:
+                # WHY: A detached task outlived its request; write it on its own
+                batch = [finished]
+            else:
+                entry = self._pending.setdefault(finished.trace_id, (now, []))
+                entry[1].append(finished)
+                if finished.parent_id is not None:
+                    return
+                del self._pending[finished.trace_id]
+                self._finished.append(finished.trace_id)
+                batch = entry[1]
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            self.dropped += 1
+
+    def _evict_stale(self, now: float):
+        while self._pending:
+            trace_id, (first_seen, _) = next(iter(self._pending.items()))
+            if now - first_seen < self.pending_ttl_s:
+                return
+            del self._pending[trace_id]
+            self.evicted += 1
+
+    def write(self, spans: List[Span]):
+        """Append spans to the file (runs on the writer thread)."""
+        if self.format == "otlp":
+            lines = [json.dumps(otlp_request(spans, self.service_name))]
+        else:
+            lines = [json.dumps(s.to_dict(), default=str) for s in spans]
+        with open(self.path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        self._writer.stop()
+
+
+def _close_exporter():
+    global _exporter
+    with _exporter_lock:
+        if _exporter is not None:
+            _exporter.close()
+            _exporter = None
+
+
+def get_exporter() -> FileExporter:
+    """Return the process-wide exporter configured from config.yaml."""
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                cfg = get_tracing_settings()
+                _exporter = FileExporter(
+                    cfg["path"], cfg["format"], cfg["service_name"], cfg["queue_size"], cfg["pending_ttl_s"]
+                )
+                # WHY: Drains the queue on exit so the last traces aren't lost
+                atexit.register(_close_exporter)
+    return _exporter
+
+
+def exporter_stats() -> Dict[str, int]:
+    """Traces dropped (writer queue full) and evicted (root never ended)."""
+    if _exporter is None:
+        return {"dropped": 0, "evicted": 0}
+    return {"dropped": _exporter.dropped, "evicted": _exporter.evicted}
+
+
+# ------------------ WATERFALL ------------------ #
+def load_traces(path: str) -> Dict[str, List[Dict]]:
+    """Spans from a json-format trace file, grouped by trace id (file order)."""
+    traces: Dict[str, List[Dict]] = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                traces.setdefault(record["trace_id"], []).append(record)
+    return traces
+
+
+def _end_ms(s: Dict) -> float:
+    return s["start_ns"] / 1e6 + s["duration_ms"]
+
+
+def critical_path(spans: List[Dict]) -> set:
+    """
+    Span ids on the critical path.
+
+    Within a span, the child that ends last is critical, then the child
+    ending last before that one started, and so on; repeated in each child.
+    """
+    children: Dict[Optional[str], List[Dict]] = {}
+    for s in spans:
+        children.setdefault(s["parent_id"], []).append(s)
+    path: set = set()
+    stack = [s for s in spans if s["parent_id"] is None][:1]
+    while stack:
+        node = stack.pop()
+        path.add(node["span_id"])
+        kids = children.get(node["span_id"], [])
+        limit = math.inf
+        while True:
+            node = max((k for k in kids if _end_ms(k) <= limit), key=_end_ms, default=None)
+            if node is None:
+                break
+            stack.append(node)
+            limit = node["start_ns"] / 1e6
+    return path
+
+
+def render_waterfall(spans: List[Dict], width: int = 40) -> str:
+    """Text waterfall of one trace; * marks the critical path."""
+    root = next(s for s in spans if s["parent_id"] is None)
+    total_ms = root["duration_ms"] or 1
+    critical = critical_path(spans)
+    children: Dict[Optional[str], List[Dict]] = {}
+    for s in spans:
+        children.setdefault(s["parent_id"], []).append(s)
+
+    lines = [f"trace {root['trace_id']}  {total_ms:.0f} ms  session={root['attributes'].get('session_id', '-')}"]
+
+    def walk(node: Dict, depth: int):
+        offset_ms = (node["start_ns"] - root["start_ns"]) / 1e6
+        start = int(offset_ms / total_ms * width)
+        length = max(1, int(node["duration_ms"] / total_ms * width))
+        bar = " " * start + "█" * min(length, width - start)
+        marker = "*" if node["span_id"] in critical else " "
+        label = ("  " * depth + node["name"])[:48]
+        lines.append(f"{marker} {label:<48} {offset_ms:>9.1f} {node['duration_ms']:>9.1f} |{bar:<{width}}|"
+                     + (f" ! {node['error']}" if node["error"] else ""))
+        for child in sorted(children.get(node["span_id"], []), key=lambda s: s["start_ns"]):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print trace waterfalls from a json-format trace file")
+    parser.add_argument("--file", help="Trace file (default: tracing.path in config.yaml)")
+    parser.add_argument("--trace", help="Trace id")
+    parser.add_argument("--session", help="Show traces of a session id")
+    parser.add_argument("--last", type=int, nargs="?", const=1, help="Show the last N traces")
+    args = parser.parse_args()
+
+    path = args.file or get_tracing_settings()["path"]
+    if not os.path.exists(path):
+        path = resolve_path(path)
+    traces = load_traces(path)
+    selected = list(traces.values())
+    if args.trace:
+        selected = [traces[args.trace]] if args.trace in traces else []
+    elif args.session:
+        selected = [t for t in selected if any(s["attributes"].get("session_id") == args.session for s in t)]
+    else:
+        selected = selected[-(args.last or 1):]
+    for spans in selected:
+        print(render_waterfall(spans))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ function App() {
     const [messages, setMessages] = useState([])
     const [isLoading, setIsLoading] = useState(false)
     const [thinkingSteps, setThinkingSteps] = useState([])
+    const [draftResponse, setDraftResponse] = useState('')
     const messagesEndRef = useRef(null)
 
     const scrollToBottom = () => {
@@ -21,12 +22,13 @@ function App() {
 
     useEffect(() => {
         scrollToBottom()
-    }, [messages, isLoading, thinkingSteps])
+    }, [messages, isLoading, thinkingSteps, draftResponse])
 
     const handleSendMessage = async (userMessage) => {
         setMessages(prev => [...prev, { role: 'user', content: userMessage }])
         setIsLoading(true)
         setThinkingSteps([])
+        setDraftResponse('')
 
         try {
             const response = await fetch(`${API_URL}/api/chat/stream`, {
@@ -34,7 +36,8 @@ function App() {
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     message: userMessage,
-                    session_id: DEFAULT_SESSION_ID
+                    session_id: DEFAULT_SESSION_ID,
+                    stream_tokens: true
                 }),
             })
 
@@ -60,13 +63,18 @@ function App() {
 
                         if (data.type === 'thinking') {
                             setThinkingSteps(prev => [...prev, { type: 'thinking', message: data.message }])
+                        } else if (data.type === 'token') {
+                            setDraftResponse(prev => prev + data.content)
                         } else if (data.type === 'tool_start') {
+                            // Text streamed before a tool call is intermediate reasoning
+                            setDraftResponse('')
                             setThinkingSteps(prev => [...prev, { type: 'tool_start', message: data.message }])
                         } else if (data.type === 'tool_end') {
                             setThinkingSteps(prev => [...prev, { type: 'tool_end', message: data.message }])
                         } else if (data.type === 'complete') {
                             setMessages(prev => [...prev, { role: 'assistant', content: data.response }])
                             setThinkingSteps([])
+                            setDraftResponse('')
                         } else if (data.type === 'error') {
                             throw new Error(data.message)
                         }
@@ -80,6 +88,7 @@ function App() {
                 content: `❌ **Error**: ${err.message || 'Failed to connect'}. Please check backend.`
             }])
             setThinkingSteps([])
+            setDraftResponse('')
         } finally {
             setIsLoading(false)
         }
@@ -138,6 +147,10 @@ function App() {
                         <ThinkingSteps steps={thinkingSteps} />
                     )}
 
+                    {isLoading && draftResponse && (
+                        <ChatMessage role="assistant" content={draftResponse} />
+                    )}
+
                     <div ref={messagesEndRef} />
                 </div>
             </div>